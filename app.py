@@ -1,12 +1,22 @@
 import gradio as gr
 import pandas as pd
 import re 
-from src.graph import create_workflow
-from src.database import add_job, get_all_jobs, get_ranked_candidates_for_job
-from src.email_graph import create_email_workflow 
-from src.database import add_job, get_all_jobs, get_ranked_candidates_for_job
+from src.graph import create_extraction_workflow, create_analysis_workflow
+from src.database import init_db, add_job, get_all_jobs, get_ranked_candidates_page, count_applications_for_job, get_applicant_contacts_for_job
+from src.database import enqueue_tasks, claim_tasks, fail_task
+from src.email_graph import create_async_email_workflow
+from src.batch import aiter_batch_results, MAX_CONCURRENT_RESUMES
+from src.prescreening import prescreen_states, PRESCREEN_TOP_K
+from src.vector_index import find_matching_candidates
+from src.rescoring import arescore_candidates
+from src.tracing import pipeline_health, prometheus_metrics, stored_pipeline_health
+from src.rate_limit import BULK, INTERACTIVE, get_rate_limiter, llm_priority
+from src.worker import LeaseHeartbeat, TASK_MAX_ATTEMPTS, WORKER_LEASE_SECONDS, new_worker_id
+import asyncio
+import functools
 import logging
 import os
+import time
 
 # Import custom exceptions
 from src.schemas import PDFParsingError, ExtractionError, StandardizationError, RelevancyAnalysisError, CVScoutError
@@ -15,13 +25,69 @@ from src.schemas import PDFParsingError, ExtractionError, StandardizationError,
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Create the compiled workflow app
-graph_app = create_workflow()
-email_app = create_email_workflow()
+# The compiled workflow apps. The async variants let a single server process keep many
+# LLM calls in flight without dedicating a worker thread to each one. Resumes are
+# processed in two phases so the whole batch can be pre-screened locally before any LLM
+# relevancy analysis is started. Each graph is compiled on first use, not at import.
+@functools.lru_cache(maxsize=None)
+def get_extraction_app():
+    return create_extraction_workflow(use_async=True)
+
+@functools.lru_cache(maxsize=None)
+def get_analysis_app():
+    return create_analysis_workflow(use_async=True)
+
+@functools.lru_cache(maxsize=None)
+def get_email_app():
+    return create_async_email_workflow()
 
 # --- Functions for Tab 1: Processing ---
 
-def process_resumes_and_job(files, job_description, progress=gr.Progress()):
+def _describe_error(file_name: str, error: BaseException) -> str:
+    if isinstance(error, (PDFParsingError, ExtractionError, StandardizationError, RelevancyAnalysisError, CVScoutError)):
+        return f"- {file_name}: {error}"
+    return f"- {file_name}: An unexpected error occurred: {str(error)}"
+
+def _enqueue_and_claim(job_id, file_paths, worker_id):
+    task_ids = enqueue_tasks(job_id, file_paths, TASK_MAX_ATTEMPTS)
+    claim_tasks(worker_id, len(task_ids), WORKER_LEASE_SECONDS, task_ids=task_ids)
+    return task_ids
+
+# Seconds between live table updates while a batch is processed; every update re-sends the table.
+PROCESS_UPDATE_INTERVAL_SECONDS = float(os.getenv("PROCESS_UPDATE_INTERVAL_SECONDS", "0.5"))
+
+_RESULT_COLUMNS = ["File", "Candidate Name", "Email", "Score", "Pre-screen", "Status", "Details"]
+
+def _render_results_table(results: dict) -> pd.DataFrame:
+    """
+    The batch's per-file results, best LLM scores first. Pre-screened-out resumes follow,
+    ranked by their local score, and files without any score come last.
+    """
+    df = pd.DataFrame(list(results.values()), columns=_RESULT_COLUMNS)
+    return df.sort_values(["Score", "Pre-screen"], ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+
+def _result_row(file_name: str, state: dict = None, status: str = "Queued", details: str = "") -> dict:
+    report = (state or {}).get("final_report") or {}
+    prescreen_score = (state or {}).get("prescreen_score")
+    return {
+        "File": file_name,
+        "Candidate Name": report.get("full_name"),
+        "Email": report.get("mail"),
+        "Score": (state or {}).get("match_score"),
+        "Pre-screen": round(prescreen_score, 1) if prescreen_score is not None else None,
+        "Status": status,
+        "Details": details,
+    }
+
+async def process_resumes_and_job(files, job_description, max_in_flight=MAX_CONCURRENT_RESUMES, prescreen_top_k=PRESCREEN_TOP_K, progress=gr.Progress()):
+    """
+    Processes the uploaded resumes for a new job and streams the results.
+
+    Yields the status line, the summary and a ranked table with one row per file. A row
+    shows its extraction status and errors as soon as the file is extracted, and its score
+    as soon as its application has been saved, so the first results are visible long
+    before the whole batch has finished.
+    """
     if not files:
         raise gr.Error("Please upload at least one resume PDF.")
     if not job_description or not job_description.strip():
@@ -29,8 +95,13 @@ def process_resumes_and_job(files, job_description, progress=gr.Progress()):
 
     logger.info(f"---APP: Starting batch processing for {len(files)} resumes.---")
 
+    # The batch is recorded in the durable task queue, leased to this process. If the app
+    # dies mid-batch the leases expire and `python -m src.worker` finishes the remaining
+    # resumes; completed ones are marked done together with their application.
+    worker_id = new_worker_id()
     try:
-        job_id = add_job(job_description)
+        job_id = await asyncio.to_thread(add_job, job_description)
+        task_ids = await asyncio.to_thread(_enqueue_and_claim, job_id, [file.name for file in files], worker_id)
     except Exception as e:
         error_message = f"Error saving job description to database: {e}"
         logger.error(error_message)
@@ -38,39 +109,113 @@ def process_resumes_and_job(files, job_description, progress=gr.Progress()):
 
     processed_count = 0
     error_count = 0
+    analyzed_count = None
     error_messages = []
     total_files = len(files)
 
-    for i, file in enumerate(files):
-        progress(i / total_files, desc=f"Processing {os.path.basename(file.name)}")
-        try:
-            inputs = {
-                "file_path": file.name,
-                "job_description": job_description,
-                "job_id": job_id
-            }
-            result_state = graph_app.invoke(inputs)
-            
-            if result_state.get("candidate_id") is not None:
+    batch_inputs = [
+        {
+            "file_path": file.name,
+            "job_description": job_description,
+            "job_id": job_id,
+            "task_id": task_id
+        }
+        for file, task_id in zip(files, task_ids)
+    ]
+    # Keyed by file path; uploads with the same file name are still separate rows.
+    results = {inputs["file_path"]: _result_row(os.path.basename(inputs["file_path"])) for inputs in batch_inputs}
+
+    def render_summary(done: bool) -> str:
+        heading = "Batch Processing Complete" if done else "Processing Resumes..."
+        summary = f"## {heading}\n\n"
+        summary += f"✅ **Successfully Processed:** {processed_count} / {total_files} resume(s)\n"
+        if analyzed_count is not None:
+            summary += f"🔎 **LLM Relevancy Analysis:** {analyzed_count} resume(s); the rest were scored by the local pre-screen\n"
+        if error_count > 0:
+            summary += f"❌ **Failed:** {error_count} resume(s)\n\n"
+            summary += "**Error Details:**\n" + "\n".join(error_messages)
+        return summary
+
+    last_update = 0.0
+
+    def update(status: str, force: bool = False):
+        """The outputs to yield, or None if the last update was too recent."""
+        nonlocal last_update
+        now = time.monotonic()
+        if not force and now - last_update < PROCESS_UPDATE_INTERVAL_SECONDS:
+            return None
+        last_update = now
+        return status, render_summary(done=False), _render_results_table(results)
+
+    async def record_failure(inputs, message, state=None):
+        error_messages.append(message)
+        row = _result_row(os.path.basename(inputs["file_path"]), state, "Failed", message[2:])
+        results[inputs["file_path"]] = {**row, "Score": None}
+        await asyncio.to_thread(fail_task, inputs["task_id"], worker_id, message)
+
+    yield update(f"Extracting {total_files} resume(s)...", force=True)
+
+    # A single resume is someone waiting on the result; larger uploads go to the bulk lane so
+    # they do not hold up those calls when the Gemini quota is the bottleneck.
+    lane = INTERACTIVE if total_files == 1 else BULK
+    with llm_priority(lane), LeaseHeartbeat(worker_id):
+        # Phase 1: parse, extract and standardize every resume.
+        progress(0, desc=f"Extracting {total_files} resume(s)")
+        extracted_states = []
+        completed = 0
+        async for inputs, result_state, error in aiter_batch_results(get_extraction_app(), batch_inputs, max_in_flight=max_in_flight):
+            completed += 1
+            file_name = os.path.basename(inputs["file_path"])
+            progress(completed / (2 * total_files), desc=f"Extracted {file_name} ({completed}/{total_files})")
+
+            if error is not None:
+                error_count += 1
+                await record_failure(inputs, _describe_error(file_name, error))
+            elif not result_state.get("final_report"):
+                error_count += 1
+                await record_failure(inputs, f"- {file_name}: No data could be extracted from the resume.")
+            else:
+                extracted_states.append(result_state)
+                results[inputs["file_path"]] = _result_row(file_name, result_state, "Extracted")
+            outputs = update(f"Extracted {completed}/{total_files} resume(s)...")
+            if outputs:
+                yield outputs
+
+        # Score the whole batch locally; only the best resumes get the LLM relevancy analysis.
+        extracted_states = prescreen_states(extracted_states, job_description, top_k=int(prescreen_top_k or 0))
+        analyzed_count = sum(1 for state in extracted_states if state["run_analysis"])
+        for state in extracted_states:
+            # Resumes that skip the analysis already have their final (local) score.
+            status = "Analyzing" if state["run_analysis"] else "Saving"
+            results[state["file_path"]] = _result_row(os.path.basename(state["file_path"]), state, status)
+        yield update(f"Analyzing {analyzed_count} and saving {len(extracted_states)} resume(s)...", force=True)
+
+        # Phase 2: relevancy analysis (for the selected resumes) and saving.
+        completed = 0
+        async for inputs, result_state, error in aiter_batch_results(get_analysis_app(), extracted_states, max_in_flight=max_in_flight):
+            completed += 1
+            file_name = os.path.basename(inputs["file_path"])
+            progress(0.5 + completed / (2 * len(extracted_states)), desc=f"Finished {file_name} ({completed}/{len(extracted_states)})")
+
+            if error is not None:
+                error_count += 1
+                await record_failure(inputs, _describe_error(file_name, error), inputs)
+            elif result_state.get("candidate_id") is not None:
                 processed_count += 1
+                details = "LLM analysis" if result_state.get("run_analysis") else "Local pre-screen"
+                results[inputs["file_path"]] = _result_row(file_name, result_state, "Saved", details)
             else:
                 error_count += 1
-                error_messages.append(f"- {os.path.basename(file.name)}: Processing completed but no candidate ID was returned.")
-
-        except (PDFParsingError, ExtractionError, StandardizationError, RelevancyAnalysisError, CVScoutError) as e:
-            error_count += 1
-            error_messages.append(f"- {os.path.basename(file.name)}: {e}")
-        except Exception as e:
-            error_count += 1
-            error_messages.append(f"- {os.path.basename(file.name)}: An unexpected error occurred: {str(e)}")
-
-    summary_report = f"## Batch Processing Complete\n\n"
-    summary_report += f"✅ **Successfully Processed:** {processed_count} resume(s)\n"
-    if error_count > 0:
-        summary_report += f"❌ **Failed:** {error_count} resume(s)\n\n"
-        summary_report += "**Error Details:**\n" + "\n".join(error_messages)
-    
-    return "Batch processing finished. Results are saved to the database. Check the 'Candidate Dashboard' tab.", summary_report
+                await record_failure(inputs, f"- {file_name}: Processing completed but no candidate ID was returned.", result_state)
+            outputs = update(f"Saved {processed_count}/{total_files} resume(s)...")
+            if outputs:
+                yield outputs
+
+    yield (
+        "Batch processing finished. Results are saved to the database. Check the 'Candidate Dashboard' tab.",
+        render_summary(done=True),
+        _render_results_table(results),
+    )
 
 # --- Functions for Tab 2: Dashboard ---
 
@@ -79,106 +224,235 @@ def update_job_dropdown():
     job_choices = [job[0] for job in jobs]
     return gr.Dropdown(choices=job_choices, label="Select a Job Description", interactive=True)
 
-# *** MAJOR CHANGE HERE: This function now populates the CheckboxGroup and the DataFrame ***
-def load_candidate_dashboard(job_display_string: str):
-    """Loads ranked candidates and populates both the checkbox selector and the details table."""
-    if not job_display_string:
-        # Return empty state for all three components
-        return gr.CheckboxGroup(choices=[]), pd.DataFrame(), gr.Button(interactive=False)
-    
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+
+def _parse_job_id(job_display_string: str):
     try:
-        job_id = int(job_display_string.split('(ID:')[-1].strip()[:-1])
+        return int(job_display_string.split('(ID:')[-1].strip()[:-1])
     except (ValueError, IndexError):
         logger.error(f"Could not parse job_id from string: {job_display_string}")
-        return gr.CheckboxGroup(choices=[]), pd.DataFrame(), gr.Button(interactive=False)
+        return None
 
-    df = get_ranked_candidates_for_job(job_id)
-    
-    if not df.empty:
-        # Create choices for the CheckboxGroup. Format: "Name <email@address.com>"
-        # This format is easy to parse later to get the unique email.
-        checkbox_choices = [f"{row['full_name']} <{row['email']}>" for index, row in df.iterrows()]
-
-        # Prepare the DataFrame for display (no changes here)
-        df_display = df[['full_name', 'email', 'match_score', 'match_summary']].copy()
-        df_display.rename(columns={
-            'full_name': 'Candidate Name', 'email': 'Email',
-            'match_score': 'Score', 'match_summary': 'AI Summary'
-        }, inplace=True)
-        
-        # Return the populated components
-        return gr.CheckboxGroup(choices=checkbox_choices, label="Select Candidates to Interview"), df_display, gr.Button(interactive=True)
-    else:
-        # Return empty components if no candidates are found
-        return gr.CheckboxGroup(choices=[]), pd.DataFrame(), gr.Button(interactive=False)
-
-# *** MAJOR CHANGE HERE: This function now takes a list of strings from the CheckboxGroup ***
-def trigger_email_process(selected_candidates_list: list, job_display_string: str):
-    """Triggers the email generation workflow based on user's checkbox selections."""
-    if not selected_candidates_list:
-        raise gr.Error("No candidates were selected. Please check the boxes for candidates you wish to interview.")
+def _render_candidate_page(job_display_string: str, min_score, page_cursors: list, selected_emails: list):
+    """
+    Fetches the page that starts at page_cursors[-1] and builds the dashboard components.
 
+    Returns the checkbox selector, details table, proceed button and page info, followed by
+    the page cursor stack, the cursor of the next page and the emails shown on this page.
+    """
+    empty = (gr.CheckboxGroup(choices=[]), pd.DataFrame(), gr.Button(interactive=False), "", [None], None, [])
     if not job_display_string:
-        raise gr.Error("No job selected. Please ensure a job is active in the dropdown.")
+        return empty
+    job_id = _parse_job_id(job_display_string)
+    if job_id is None:
+        return empty
 
-    try:
-        job_id = int(job_display_string.split('(ID:')[-1].strip()[:-1])
-        job_title = job_display_string.split(' (ID:')[0]
-    except (ValueError, IndexError):
-        raise gr.Error("Could not identify the selected job. Please refresh and try again.")
-    
+    min_score = int(min_score) if min_score else None
+    rows, next_cursor = get_ranked_candidates_page(
+        job_id, page_size=DASHBOARD_PAGE_SIZE, cursor=page_cursors[-1], min_score=min_score
+    )
+    total = count_applications_for_job(job_id, min_score=min_score)
+    if not rows:
+        return empty
+
+    # Create choices for the CheckboxGroup. Format: "Name <email@address.com>"
+    # This format is easy to parse later to get the unique email.
+    checkbox_choices = [f"{row['full_name']} <{row['email']}>" for row in rows]
+    page_emails = [row['email'] for row in rows]
+    checked = [choice for choice, email in zip(checkbox_choices, page_emails) if email in set(selected_emails)]
+
+    df_display = pd.DataFrame(rows)[['full_name', 'email', 'match_score', 'prescreen_score', 'match_summary']]
+    df_display = df_display.rename(columns={
+        'full_name': 'Candidate Name', 'email': 'Email',
+        'match_score': 'Score', 'prescreen_score': 'Pre-screen', 'match_summary': 'AI Summary'
+    })
+
+    first_rank = (len(page_cursors) - 1) * DASHBOARD_PAGE_SIZE + 1
+    page_info = f"Showing candidates {first_rank}–{first_rank + len(rows) - 1} of {total}"
+    return (
+        gr.CheckboxGroup(choices=checkbox_choices, value=checked, label="Select Candidates to Interview"),
+        df_display,
+        gr.Button(interactive=True),
+        page_info,
+        page_cursors,
+        next_cursor,
+        page_emails,
+    )
+
+def load_candidate_dashboard(job_display_string: str, min_score=0, selected_emails=None):
+    """Loads the first page of ranked candidates into the checkbox selector and the details table."""
+    selected_emails = list(selected_emails or [])
+    return (*_render_candidate_page(job_display_string, min_score, [None], selected_emails), selected_emails)
+
+def load_next_candidate_page(job_display_string: str, min_score, page_cursors: list, next_cursor, selected_emails: list):
+    """Moves the dashboard one page forward, keeping the selection made on other pages."""
+    if next_cursor is not None:
+        page_cursors = page_cursors + [tuple(next_cursor)]
+    return _render_candidate_page(job_display_string, min_score, page_cursors, selected_emails)
+
+def load_previous_candidate_page(job_display_string: str, min_score, page_cursors: list, selected_emails: list):
+    """Moves the dashboard one page back, keeping the selection made on other pages."""
+    page_cursors = page_cursors[:-1] or [None]
+    return _render_candidate_page(job_display_string, min_score, page_cursors, selected_emails)
+
+def update_candidate_selection(page_selection: list, page_emails: list, selected_emails: list):
+    """Merges the checkboxes ticked on the current page into the selection kept across pages."""
     # Extract emails from the checkbox list. e.g., "John Doe <j.doe@email.com>" -> "j.doe@email.com"
-    selected_emails = set()
-    for item in selected_candidates_list:
+    page_selected = set()
+    for item in page_selection or []:
         match = re.search(r'<(.*?)>', item)
         if match:
-            selected_emails.add(match.group(1))
+            page_selected.add(match.group(1))
+    remaining = [email for email in selected_emails if email not in set(page_emails)]
+    return remaining + sorted(page_selected)
+
+async def trigger_email_process(selected_emails: list, job_display_string: str, personalize: bool = False, tone: str = "professional"):
+    """
+    Triggers the email generation workflow based on the candidates selected across all pages.
+    Streams the summary so each email's status appears as soon as it has been processed.
+    """
+    if not selected_emails:
+        raise gr.Error("No candidates were selected. Please check the boxes for candidates you wish to interview.")
 
-    all_applicants_df = get_ranked_candidates_for_job(job_id)
-    if all_applicants_df.empty:
+    if not job_display_string:
+        raise gr.Error("No job selected. Please ensure a job is active in the dropdown.")
+
+    job_id = _parse_job_id(job_display_string)
+    if job_id is None:
+        raise gr.Error("Could not identify the selected job. Please refresh and try again.")
+    job_title = job_display_string.split(' (ID:')[0]
+
+    selected_emails = set(selected_emails)
+    all_applicants = await asyncio.to_thread(get_applicant_contacts_for_job, job_id)
+    if not all_applicants:
         raise gr.Error("Could not retrieve applicant data from the database.")
 
-    positive_candidates = all_applicants_df[all_applicants_df['email'].isin(selected_emails)].to_dict('records')
-    negative_candidates = all_applicants_df[~all_applicants_df['email'].isin(selected_emails)].to_dict('records')
+    positive_candidates = [candidate for candidate in all_applicants if candidate['email'] in selected_emails]
+    negative_candidates = [candidate for candidate in all_applicants if candidate['email'] not in selected_emails]
 
     workflow_input = {
         "job_title": job_title,
         "positive_candidates": positive_candidates,
-        "negative_candidates": negative_candidates
+        "negative_candidates": negative_candidates,
+        "personalize": personalize,
+        "tone": tone
     }
     
-    result = email_app.invoke(workflow_input)
-    
-    processed_emails = result.get("processed_emails", [])
-    
-    summary = f"### Email Generation Complete\n\n"
-    summary += f"**Total Emails Generated:** {len(processed_emails)}\n"
-    summary += f"**Accepted:** {len(positive_candidates)} | **Rejected:** {len(negative_candidates)}\n\n"
-    summary += "--- \n\n"
-    summary += "\n".join(processed_emails)
-    
+    total = len(positive_candidates) + len(negative_candidates)
+    processed_emails = []
+
+    def render_summary(done: bool) -> str:
+        heading = "Email Generation Complete" if done else "Generating Emails..."
+        summary = f"### {heading}\n\n"
+        summary += f"**Total Emails Generated:** {len(processed_emails)} / {total}\n"
+        summary += f"**Accepted:** {len(positive_candidates)} | **Rejected:** {len(negative_candidates)}\n\n"
+        summary += "--- \n\n"
+        summary += "\n".join(processed_emails)
+        return summary
+
+    yield render_summary(done=False)
+
+    # Each candidate branch reports its status as soon as it finishes.
+    async for update in get_email_app().astream(workflow_input, stream_mode="updates"):
+        for node_update in update.values():
+            statuses = (node_update or {}).get("processed_emails")
+            if statuses:
+                processed_emails.extend(statuses)
+                yield render_summary(done=False)
+
+    yield render_summary(done=True)
+
+# --- Functions for Tab 3: Talent Pool ---
+
+def search_talent_pool(job_description: str, top_k=20):
+    """Finds the best matching candidates among everyone ever processed, without calling the LLM."""
+    if not job_description or not job_description.strip():
+        raise gr.Error("Please provide a job description.")
+
+    matches = find_matching_candidates(job_description, top_k=int(top_k or 20))
+    if not matches:
+        return pd.DataFrame(), "No stored candidates found."
+
+    df = pd.DataFrame(matches)[["full_name", "email", "phone_number", "similarity", "candidate_id"]]
+    df = df.rename(columns={
+        'full_name': 'Name', 'email': 'Email', 'phone_number': 'Phone',
+        'similarity': 'Similarity', 'candidate_id': 'Candidate ID'
+    })
+    return df, f"Showing the {len(df)} best matching candidate(s) from the talent pool."
+
+async def rescore_talent_pool_for_job(job_display_string: str, top_k=20, max_in_flight=MAX_CONCURRENT_RESUMES):
+    """Scores the best talent pool matches for an existing job, reusing their stored reports."""
+    job_id = _parse_job_id(job_display_string) if job_display_string else None
+    if job_id is None:
+        raise gr.Error("Please select a job.")
+
+    stats = await arescore_candidates(job_id, talent_pool_top_k=int(top_k or 20), max_in_flight=max_in_flight)
+    summary = f"### Talent Pool Scored for Job {job_id}\n\n"
+    summary += f"✅ **Saved:** {stats['saved']} candidate(s) "
+    summary += f"({stats['to_analyze']} by LLM analysis, {stats['prescreened_out']} by the local pre-screen)\n"
+    summary += f"⏭️ **Already Scored:** {stats['already_scored']}\n"
+    if stats['failed']:
+        summary += f"❌ **Failed:** {stats['failed']}\n"
+    summary += "\nThe results are available in the 'Candidate Dashboard' tab."
     return summary
 
+# --- Functions for Tab 4: Pipeline Health ---
+
+_HEALTH_COLUMNS = {
+    'workflow': 'Workflow', 'node': 'Node', 'calls': 'Runs', 'errors': 'Errors', 'retries': 'Retries',
+    'per_min': 'Runs/min', 'p50_ms': 'p50 ms', 'p95_ms': 'p95 ms', 'p99_ms': 'p99 ms',
+    'llm_p50_ms': 'LLM p50 ms', 'llm_p95_ms': 'LLM p95 ms', 'queue_p50_ms': 'Queue p50 ms',
+    'queue_p95_ms': 'Queue p95 ms', 'avg_input_chars': 'Avg In (chars)', 'avg_output_chars': 'Avg Out (chars)',
+}
+
+def refresh_pipeline_health():
+    """Live per-node latency and throughput since the server started, plus the Prometheus text."""
+    rows = pipeline_health()
+    if not rows:
+        return pd.DataFrame(), "No workflow runs recorded yet.", prometheus_metrics()
+    df = pd.DataFrame(rows).rename(columns=_HEALTH_COLUMNS)
+    slowest = max(rows, key=lambda row: row['p95_ms'])
+    limiter = get_rate_limiter().stats()
+    info = f"Slowest node (p95): **{slowest['workflow']} / {slowest['node']}** at {slowest['p95_ms']:.0f} ms.  \n"
+    info += f"LLM concurrency limit: **{limiter['limit']}** ({limiter['in_flight']} in flight, "
+    info += f"{limiter['waiting']['interactive']} interactive / {limiter['waiting']['bulk']} bulk waiting, "
+    info += f"{limiter['throttled']} throttled call(s) so far)."
+    return df, info, prometheus_metrics()
+
+def load_stored_pipeline_health(hours=24):
+    """Per-node percentiles from the node_metrics table, including runs before the last restart."""
+    rows = stored_pipeline_health(since_seconds=float(hours or 24) * 3600)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).rename(columns=_HEALTH_COLUMNS)
+
 # --- Define the Gradio Interface with Tabs (UPDATED) ---
 
 with gr.Blocks(theme=gr.themes.Glass(), title="CV-Scout") as demo:
     gr.Markdown("# CV-Scout: Multi-Agent Resume Intelligence System")
 
     with gr.Tabs():
-        # --- Tab 1: Process Resumes (No changes) ---
+        # --- Tab 1: Process Resumes ---
         with gr.TabItem("Process New Resumes"):
-            # ... (This whole tab section is unchanged)
             gr.Markdown("Upload multiple resume PDFs and provide a job description to process and rank candidates.")
             with gr.Row():
                 with gr.Column(scale=1):
                     file_input = gr.File(label="Upload Resume PDFs", file_count="multiple",file_types=[".pdf"])
                     jd_input = gr.Textbox(label="Job Description", lines=10, placeholder="Paste the job description here...")
+                    concurrency_input = gr.Slider(minimum=1, maximum=32, step=1, value=MAX_CONCURRENT_RESUMES, label="Max Resumes In Flight")
+                    prescreen_top_k_input = gr.Number(value=PRESCREEN_TOP_K, precision=0, minimum=0, label="LLM-Analyze Top K Resumes (0 = all that pass the pre-screen)")
                     process_button = gr.Button("Process and Rank Resumes", variant="primary")
                 with gr.Column(scale=2):
                     gr.Markdown("### Processing Summary")
                     status_output = gr.Textbox(label="Status", interactive=False)
                     summary_output = gr.Markdown()
-            process_button.click(fn=process_resumes_and_job, inputs=[file_input, jd_input], outputs=[status_output, summary_output])
+                    results_output = gr.DataFrame(
+                        headers=_RESULT_COLUMNS,
+                        datatype=["str", "str", "str", "number", "number", "str", "str"],
+                        interactive=False,
+                        label="Ranked Results (updated as resumes finish)"
+                    )
+            process_button.click(fn=process_resumes_and_job, inputs=[file_input, jd_input, concurrency_input, prescreen_top_k_input], outputs=[status_output, summary_output, results_output])
 
         # --- Tab 2: Candidate Dashboard (UPDATED UI COMPONENTS) ---
         with gr.TabItem("Candidate Dashboard") as dashboard_tab:
@@ -186,18 +460,33 @@ with gr.Blocks(theme=gr.themes.Glass(), title="CV-Scout") as demo:
             with gr.Row():
                 job_dropdown = gr.Dropdown(label="Select a Job Description", interactive=False)
                 refresh_button = gr.Button("Refresh Jobs")
+            min_score_input = gr.Slider(minimum=0, maximum=100, step=1, value=0, label="Minimum Score")
             
             # *** NEW COMPONENT for explicit selection ***
             candidate_selector = gr.CheckboxGroup(label="Select Candidates to Interview")
             
             # *** UPDATED COMPONENT: Now for viewing only (interactive=False) and using modern name gr.DataFrame ***
             candidate_dataframe = gr.DataFrame(
-                headers=["Candidate Name", "Email", "Score", "AI Summary"],
-                datatype=["str", "str", "number", "str"],
+                headers=["Candidate Name", "Email", "Score", "Pre-screen", "AI Summary"],
+                datatype=["str", "str", "number", "number", "str"],
                 interactive=False, 
                 label="Ranked Candidate Details"
             )
+
+            with gr.Row():
+                previous_page_button = gr.Button("◀ Previous Page")
+                page_info_output = gr.Markdown()
+                next_page_button = gr.Button("Next Page ▶")
+
+            # Pagination and selection state kept per browser session
+            page_cursors_state = gr.State([None])
+            next_cursor_state = gr.State(None)
+            page_emails_state = gr.State([])
+            selected_emails_state = gr.State([])
             
+            with gr.Row():
+                tone_input = gr.Dropdown(choices=["professional", "warm", "concise", "formal"], value="professional", label="Email Tone")
+                personalize_input = gr.Checkbox(value=False, label="Personalize each email with the LLM (one call per candidate, slower)")
             proceed_button = gr.Button("Generate Emails for Selected Candidates", variant="primary", interactive=False)
             
             action_summary_output = gr.Markdown()
@@ -206,19 +495,98 @@ with gr.Blocks(theme=gr.themes.Glass(), title="CV-Scout") as demo:
             dashboard_tab.select(fn=update_job_dropdown, inputs=None, outputs=job_dropdown)
             refresh_button.click(fn=update_job_dropdown, inputs=None, outputs=job_dropdown)
             
-            # *** UPDATED: load_candidate_dashboard now populates three components ***
+            page_outputs = [
+                candidate_selector, candidate_dataframe, proceed_button, page_info_output,
+                page_cursors_state, next_cursor_state, page_emails_state
+            ]
+
+            # Changing the job starts over with an empty selection; changing the score
+            # filter keeps the selection made so far.
             job_dropdown.change(
                 fn=load_candidate_dashboard, 
-                inputs=job_dropdown, 
-                outputs=[candidate_selector, candidate_dataframe, proceed_button]
+                inputs=[job_dropdown, min_score_input], 
+                outputs=page_outputs + [selected_emails_state]
+            )
+            min_score_input.release(
+                fn=load_candidate_dashboard,
+                inputs=[job_dropdown, min_score_input, selected_emails_state],
+                outputs=page_outputs + [selected_emails_state]
+            )
+            next_page_button.click(
+                fn=load_next_candidate_page,
+                inputs=[job_dropdown, min_score_input, page_cursors_state, next_cursor_state, selected_emails_state],
+                outputs=page_outputs
+            )
+            previous_page_button.click(
+                fn=load_previous_candidate_page,
+                inputs=[job_dropdown, min_score_input, page_cursors_state, selected_emails_state],
+                outputs=page_outputs
+            )
+            candidate_selector.input(
+                fn=update_candidate_selection,
+                inputs=[candidate_selector, page_emails_state, selected_emails_state],
+                outputs=selected_emails_state
             )
 
-            # *** UPDATED: proceed_button now takes input from the new candidate_selector ***
             proceed_button.click(
                 fn=trigger_email_process,
-                inputs=[candidate_selector, job_dropdown], 
+                inputs=[selected_emails_state, job_dropdown, personalize_input, tone_input], 
                 outputs=action_summary_output
             )
 
+        # --- Tab 3: Talent Pool ---
+        with gr.TabItem("Talent Pool") as talent_pool_tab:
+            gr.Markdown("Search every previously processed candidate for a new job description. No resumes are re-parsed and no LLM calls are made.")
+            with gr.Row():
+                with gr.Column(scale=1):
+                    pool_jd_input = gr.Textbox(label="Job Description", lines=10, placeholder="Paste the job description here...")
+                    pool_top_k_input = gr.Slider(minimum=5, maximum=200, step=5, value=20, label="Number of Candidates")
+                    pool_search_button = gr.Button("Find Matching Candidates", variant="primary")
+                with gr.Column(scale=2):
+                    pool_info_output = gr.Markdown()
+                    pool_results_output = gr.DataFrame(label="Best Matches", interactive=False)
+            pool_search_button.click(
+                fn=search_talent_pool,
+                inputs=[pool_jd_input, pool_top_k_input],
+                outputs=[pool_results_output, pool_info_output]
+            )
+
+            gr.Markdown("### Score Matches for an Existing Job\nRuns the relevancy analysis for the best matches of a job's description using their stored reports; candidates already scored for the job are skipped.")
+            with gr.Row():
+                pool_job_dropdown = gr.Dropdown(label="Select a Job Description", interactive=True)
+                pool_rescore_button = gr.Button("Score Top Matches for Job")
+            pool_rescore_output = gr.Markdown()
+            talent_pool_tab.select(fn=update_job_dropdown, inputs=None, outputs=pool_job_dropdown)
+            pool_rescore_button.click(
+                fn=rescore_talent_pool_for_job,
+                inputs=[pool_job_dropdown, pool_top_k_input],
+                outputs=pool_rescore_output
+            )
+
+        # --- Tab 4: Pipeline Health ---
+        with gr.TabItem("Pipeline Health"):
+            gr.Markdown("Per-node latency of the resume and email workflows. Wall time includes LLM time and queue wait; the table refreshes every 5 seconds.")
+            health_info_output = gr.Markdown()
+            health_table_output = gr.DataFrame(label="Live (since server start)", interactive=False)
+            with gr.Accordion("Prometheus metrics", open=False):
+                health_prometheus_output = gr.Code(label="Text exposition format", language=None)
+            health_timer = gr.Timer(5)
+            health_timer.tick(
+                fn=refresh_pipeline_health,
+                inputs=None,
+                outputs=[health_table_output, health_info_output, health_prometheus_output]
+            )
+
+            with gr.Row():
+                health_hours_input = gr.Slider(minimum=1, maximum=168, step=1, value=24, label="History (hours)")
+                health_history_button = gr.Button("Load Stored Metrics")
+            health_history_output = gr.DataFrame(label="Stored (node_metrics table)", interactive=False)
+            health_history_button.click(
+                fn=load_stored_pipeline_health,
+                inputs=health_hours_input,
+                outputs=health_history_output
+            )
+
 if __name__ == "__main__":
+    init_db()
     demo.launch(server_name="0.0.0.0", server_port=7860)
\ No newline at end of file
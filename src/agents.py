@@ -1,24 +1,95 @@
-import os
+import re
+import asyncio
+import hashlib
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv
 
 import logging
+from typing import Any, Dict, Optional
 
-from src.schemas import Resume
-from src.utils import parse_pdf_to_text
-from src.database import add_or_update_candidate, add_application
+from src.llm import EXTRACTION_MODEL, get_structured_llm
+from src.pdf_parsing import submit_pdf_parse
+from src.serialization import serialize_resume
+from src.standardization import standardize_report
+from src.rate_limit import ainvoke_llm, invoke_llm
+from src.tracing import record_queue_wait
+from src.compaction import compact_resume_text, compaction_fingerprint, estimate_tokens
+from src.database import get_cached_extraction, save_extraction_to_cache
+from src.database import get_cached_relevancy, save_relevancy_to_cache
+from src.database import get_candidate_reports
+from src.db_writer import get_candidate_writer
+from src.vector_index import index_candidate
+from src.dedup import DEDUP_ENABLED, find_duplicate, index_entry
+from src.prescreening import score_resumes, prescreen_updates, PRESCREEN_MIN_SCORE
 from src.schemas import Resume, RelevancyAnalysis, PDFParsingError, ExtractionError, StandardizationError, RelevancyAnalysisError
 
 
-load_dotenv(override=True)
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
 logger = logging.getLogger(__name__)
 
-# Initialize the LLM with structured output capabilities
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash-001", google_api_key=GEMINI_API_KEY)
-structured_llm = llm.with_structured_output(Resume)
+EXTRACTION_SYSTEM_PROMPT = "You are an expert resume parser. Your task is to extract information from the provided resume text and structure it according to the 'Resume' schema."
+# Bump when the extraction pipeline changes in a way that invalidates cached results.
+EXTRACTION_CACHE_VERSION = "1"
+
+RELEVANCY_MODEL = EXTRACTION_MODEL
+RELEVANCY_SYSTEM_PROMPT = "You are an expert tech recruiter..."
+RELEVANCY_HUMAN_PROMPT = (
+    "Please analyze the following resume and job description...\n"
+    "---CANDIDATE RESUME---\n"
+    "{resume}\n\n"
+    "---JOB DESCRIPTION---\n"
+    "{job_description}"
+)
+# Bump when the relevancy prompt or scoring logic changes in a way that invalidates cached results.
+RELEVANCY_CACHE_VERSION = "2"
+
+def extraction_cache_key(pdf_hash: str, compaction: str = "") -> str:
+    """
+    Builds the content-addressed extraction cache key for a PDF.
+
+    The key combines the hash of the PDF bytes with the extraction model, prompt and
+    cache version, so changing any of them naturally invalidates previous entries.
+
+    Args:
+        pdf_hash (str): SHA-256 digest of the PDF bytes.
+        compaction (str): Fingerprint of the compaction settings the LLM input was
+                          produced with, or "" for uncompacted text.
+
+    Returns:
+        str: The hexadecimal cache key.
+    """
+    fingerprint = "\x1f".join([pdf_hash, EXTRACTION_MODEL, EXTRACTION_SYSTEM_PROMPT, EXTRACTION_CACHE_VERSION, compaction])
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+def _normalize_text(text: str) -> str:
+    """Collapses whitespace and case so cosmetic edits do not change a fingerprint."""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+def relevancy_cache_key(final_report: Dict[str, Any], job_description: str) -> str:
+    """
+    Builds the relevancy cache key for a (resume, job description) pair.
+
+    The key is built from the compact serialization that is actually sent to the LLM,
+    and the job description is whitespace/case normalized before hashing, so re-running
+    the same candidate against a re-posted job maps to the same key. The model, prompt
+    and cache version are part of the key as well.
+
+    Args:
+        final_report (dict): The standardized resume report.
+        job_description (str): The job description text.
+
+    Returns:
+        str: The hexadecimal cache key.
+    """
+    resume_fingerprint = hashlib.sha256(serialize_resume(final_report).encode("utf-8")).hexdigest()
+    job_fingerprint = hashlib.sha256(_normalize_text(job_description).encode("utf-8")).hexdigest()
+    fingerprint = "\x1f".join([
+        resume_fingerprint,
+        job_fingerprint,
+        RELEVANCY_MODEL,
+        RELEVANCY_SYSTEM_PROMPT,
+        RELEVANCY_HUMAN_PROMPT,
+        RELEVANCY_CACHE_VERSION,
+    ])
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
 
 # 1. Ingestion Agent
 def ingestion_agent(state):
@@ -29,7 +100,8 @@ def ingestion_agent(state):
         state (AgentState): The current state of the agent workflow, expected to contain 'file_path'.
 
     Returns:
-        dict: A dictionary containing the raw text extracted from the PDF under the key 'raw_text'.
+        dict: A dictionary containing the raw text extracted from the PDF under the key 'raw_text'
+              and the SHA-256 digest of the file under the key 'pdf_hash'.
 
     Raises:
         ValueError: If 'file_path' is not provided in the state.
@@ -42,20 +114,90 @@ def ingestion_agent(state):
         raise ValueError("File path must be provided in the state.")
     
     try:
-        raw_text = parse_pdf_to_text(file_path)
+        raw_text, pdf_hash = submit_pdf_parse(file_path).result()
         logger.info("---AGENT: PDF PARSED SUCCESSFULLY---")
-        return {"raw_text": raw_text}
+        return {"raw_text": raw_text, "pdf_hash": pdf_hash}
     except Exception as e:
         logger.error(f"---AGENT: ERROR during PDF parsing: {e}---")
         raise PDFParsingError(f"Error parsing PDF: {e}") from e
 
+# 1a. Dedup Agent
+def dedup_agent(state):
+    """
+    Dedup Agent: Looks the resume up among the resumes processed before (see `src.dedup`).
+
+    A resume whose text is nearly identical to a stored one reuses that candidate's
+    report, so extraction and standardization are skipped. The signature is kept in the
+    state and saved to the duplicate index together with the application.
+
+    Args:
+        state (AgentState): The current state of the agent workflow, expected to contain 'raw_text'.
+
+    Returns:
+        dict: 'minhash_signature', 'contact_email' and 'contact_phone'; for a duplicate also
+              'duplicate_of', 'duplicate_similarity', the stored 'final_report' and its
+              'candidate_id'. Empty if dedup is disabled or the lookup failed.
+    """
+    if not DEDUP_ENABLED:
+        return {}
+    try:
+        result = find_duplicate(state.get("raw_text"))
+        duplicate_of = result.get("duplicate_of")
+        if duplicate_of is None:
+            return result
+        report = get_candidate_reports([duplicate_of]).get(duplicate_of)
+    except Exception as e:
+        # The lookup only saves work; the resume is processed normally without it.
+        logger.warning(f"---AGENT: Duplicate lookup failed: {e}---")
+        return {}
+    if not report:
+        result.pop("duplicate_of")
+        result.pop("duplicate_similarity")
+        return result
+    logger.info(f"---AGENT: DUPLICATE of candidate {duplicate_of} (similarity {result['duplicate_similarity']:.2f}); reusing its report---")
+    return {**result, "final_report": report, "candidate_id": duplicate_of}
+
+# 1b. Compaction Agent
+def compaction_agent(state):
+    """
+    Compaction Agent: Shrinks the raw text to the extraction token budget.
+
+    Removes layout noise (whitespace runs, bullet glyphs, repeated page headers/footers,
+    page numbers) and, for long documents, truncates by section. See `src.compaction`.
+
+    Args:
+        state (AgentState): The current state of the agent workflow, expected to contain 'raw_text'.
+
+    Returns:
+        dict: 'compacted_text', the 'compaction_fingerprint' used for the extraction cache key,
+              and the estimated 'raw_token_count' and 'compacted_token_count'.
+    """
+    raw_text = state.get("raw_text")
+    if not raw_text:
+        return {}
+
+    compacted_text = compact_resume_text(raw_text)
+    raw_tokens, compacted_tokens = estimate_tokens(raw_text), estimate_tokens(compacted_text)
+    logger.info(f"---AGENT: COMPACTED RESUME TEXT FROM ~{raw_tokens} TO ~{compacted_tokens} TOKENS---")
+    return {
+        "compacted_text": compacted_text,
+        "compaction_fingerprint": compaction_fingerprint(),
+        "raw_token_count": raw_tokens,
+        "compacted_token_count": compacted_tokens,
+    }
+
 # 2. Core Extraction Agent
 def extraction_agent(state):
     """
     Core Extraction Agent: Extracts structured information from the raw text using the LLM.
 
+    The compacted text is used when the compaction agent has run, the raw text otherwise.
+    If the state carries a 'pdf_hash', the extraction cache is consulted first and the
+    LLM call is skipped entirely on a hit. Fresh results are written back to the cache.
+
     Args:
-        state (AgentState): The current state of the agent workflow, expected to contain 'raw_text'.
+        state (AgentState): The current state of the agent workflow, expected to contain 'raw_text'
+                            (or 'compacted_text') and optionally 'pdf_hash'.
 
     Returns:
         dict: A dictionary containing the extracted structured data as a Pydantic model under the key 'extracted_json'.
@@ -65,34 +207,76 @@ def extraction_agent(state):
         ExtractionError: If an error occurs during the LLM-based extraction process.
     """
     logger.info("---AGENT: EXTRACTING INFORMATION---")
-    raw_text = state.get("raw_text")
+    raw_text = _extraction_input(state)
     if not raw_text:
         logger.info("---AGENT: No raw text provided for extraction.---")
         return {"extracted_json": None}
 
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", "You are an expert resume parser. Your task is to extract information from the provided resume text and structure it according to the 'Resume' schema."),
-            ("human", "{resume_text}"),
-        ]
-    )
-    
-    chain = prompt | structured_llm
+    cache_key = _extraction_cache_key_for_state(state)
+    cached_resume = _load_cached_extraction(cache_key)
+    if cached_resume is not None:
+        return {"extracted_json": cached_resume}
+
     try:
-        extracted_data = chain.invoke({"resume_text": raw_text})
+        chain = _build_extraction_chain()
+        extracted_data = invoke_llm(chain, {"resume_text": raw_text})
         logger.info("---AGENT: INFORMATION EXTRACTED---")
-        return {"extracted_json": extracted_data}
     except Exception as e:
         logger.error(f"---AGENT: ERROR during extraction: {e}---")
         raise ExtractionError(f"Error extracting information: {e}") from e
+
+    _store_extraction(cache_key, extracted_data)
+    return {"extracted_json": extracted_data}
+
+def _extraction_input(state) -> Optional[str]:
+    # Prefer the compacted text; fall back to the raw text when compaction did not run.
+    return state.get("compacted_text") or state.get("raw_text")
+
+def _extraction_cache_key_for_state(state) -> Optional[str]:
+    pdf_hash = state.get("pdf_hash")
+    if not pdf_hash:
+        return None
+    compaction = state.get("compaction_fingerprint") if state.get("compacted_text") else ""
+    return extraction_cache_key(pdf_hash, compaction or "")
+
+def _load_cached_extraction(cache_key: Optional[str]) -> Optional[Resume]:
+    if not cache_key:
+        return None
+    try:
+        cached_data = get_cached_extraction(cache_key)
+    except Exception as e:
+        logger.warning(f"---AGENT: Extraction cache lookup failed, falling back to LLM: {e}---")
+        return None
+    if cached_data is None:
+        return None
+    logger.info("---AGENT: INFORMATION LOADED FROM EXTRACTION CACHE---")
+    return Resume(**cached_data)
+
+def _store_extraction(cache_key: Optional[str], extracted_data: Resume):
+    if not cache_key:
+        return
+    try:
+        save_extraction_to_cache(cache_key, extracted_data.dict())
+    except Exception as e:
+        logger.warning(f"---AGENT: Could not store extraction result in cache: {e}---")
+
+def _build_extraction_chain():
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", EXTRACTION_SYSTEM_PROMPT),
+            ("human", "{resume_text}"),
+        ]
+    )
+    return prompt | get_structured_llm(Resume)
     
-# 3. Standardization Agent (could be expanded later)
+# 3. Standardization Agent
 def standardization_agent(state):
     """
     Standardization Agent: Standardizes the extracted JSON data.
 
-    Currently, this agent primarily converts the Pydantic model to a dictionary.
-    Future enhancements could include date formatting, skill normalization, etc.
+    Dates are parsed into ISO year-month fields next to the original strings, the
+    total years of experience are computed, and skills and languages are mapped to
+    canonical names (see `standardization.standardize_reports`).
 
     Args:
         state (AgentState): The current state of the agent workflow, expected to contain 'extracted_json'.
@@ -110,19 +294,48 @@ def standardization_agent(state):
         logger.info("---AGENT: No extracted JSON provided for standardization.---")
         return {"final_report": None}
 
-    # Here you could add more complex logic, e.g., date formatting
     try:
-        final_report = extracted_json.dict()
-        logger.info("---AGENT: DATA STANDARDIZED---")
+        final_report = standardize_report(extracted_json.model_dump())
+        logger.info(f"---AGENT: DATA STANDARDIZED ({final_report['total_experience_years']} years of experience)---")
         return {"final_report": final_report}
     except Exception as e:
         logger.error(f"---AGENT: ERROR during standardization: {e}---")
         raise StandardizationError(f"Error standardizing data: {e}") from e
 
+# 3b. Pre-screening Agent
+def prescreening_agent(state):
+    """
+    Pre-screening Agent: Scores the resume locally (BM25 keyword match) before the LLM analysis.
+
+    When a batch has already been pre-screened as a whole (see `prescreening.prescreen_states`),
+    the decision is in the state and this agent does nothing. Otherwise the single resume is
+    scored on its own and compared against PRESCREEN_MIN_SCORE.
+
+    Args:
+        state (AgentState): The current state, expected to contain 'final_report' and 'job_description'.
+
+    Returns:
+        dict: 'prescreen_score' and 'run_analysis', plus an empty 'match_score' and the
+              'match_summary' when the LLM analysis will be skipped. Empty if there is
+              nothing to score or the decision was already made.
+    """
+    if state.get("run_analysis") is not None:
+        return {}
+    job_description = state.get("job_description")
+    final_report = state.get("final_report")
+    if not final_report or not job_description or not job_description.strip():
+        return {}
+
+    score = float(score_resumes([final_report], job_description)[0])
+    selected = score >= PRESCREEN_MIN_SCORE
+    logger.info(f"---AGENT: PRE-SCREEN SCORE {score:.1f} ({'analyze' if selected else 'skip'})---")
+    return prescreen_updates(score, selected)
+
 # 4. Job Match & Relevancy Agent
 def relevancy_analysis_agent(state):
     """
     Job Match & Relevancy Agent: Analyzes the resume against the job description.
+    Results are memoized per (resume, job description) pair, so re-runs skip the LLM.
     """
     logger.info("---AGENT: ANALYZING RELEVANCY---")
     job_description = state.get("job_description")
@@ -133,64 +346,240 @@ def relevancy_analysis_agent(state):
         # Return default values that match the expected state keys
         return {"match_score": 0, "match_summary": "Not applicable (no job description provided)."}
 
-    relevancy_llm = llm.with_structured_output(RelevancyAnalysis)
+    cache_key = relevancy_cache_key(final_report, job_description)
+    cached_result = _load_cached_relevancy(cache_key)
+    if cached_result is not None:
+        return cached_result
 
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", 
-             "You are an expert tech recruiter..."), # No changes to prompt
-            ("human", 
-             "Please analyze the following resume and job description...\n"
-             "---CANDIDATE RESUME---\n"
-             "{resume_json}\n\n"
-             "---JOB DESCRIPTION---\n"
-             "{job_description}"
-            ),
-        ]
-    )
-    chain = prompt | relevancy_llm
     try:
-        analysis_result = chain.invoke({
-            "resume_json": final_report,
+        chain = _build_relevancy_chain()
+        analysis_result = invoke_llm(chain, {
+            "resume": serialize_resume(final_report),
             "job_description": job_description
         })
         logger.info("---AGENT: RELEVANCY ANALYSIS COMPLETE---")
-        return {
-            "match_score": analysis_result.score,
-            "match_summary": analysis_result.summary
-        }
     except Exception as e:
         logger.error(f"---AGENT: ERROR during relevancy analysis: {e}---")
         raise RelevancyAnalysisError(f"Error during relevancy analysis: {e}") from e
+
+    _store_relevancy(cache_key, analysis_result)
+    return {
+        "match_score": analysis_result.score,
+        "match_summary": analysis_result.summary
+    }
+
+def _load_cached_relevancy(cache_key: str) -> Optional[Dict[str, Any]]:
+    try:
+        cached_result = get_cached_relevancy(cache_key)
+    except Exception as e:
+        logger.warning(f"---AGENT: Relevancy cache lookup failed, falling back to LLM: {e}---")
+        return None
+    if cached_result is not None:
+        logger.info("---AGENT: RELEVANCY ANALYSIS LOADED FROM CACHE---")
+    return cached_result
+
+def _store_relevancy(cache_key: str, analysis_result: RelevancyAnalysis):
+    try:
+        save_relevancy_to_cache(cache_key, analysis_result.score, analysis_result.summary)
+    except Exception as e:
+        logger.warning(f"---AGENT: Could not store relevancy result in cache: {e}---")
+
+def _build_relevancy_chain():
+    relevancy_llm = get_structured_llm(RelevancyAnalysis)
+
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", RELEVANCY_SYSTEM_PROMPT),
+            ("human", RELEVANCY_HUMAN_PROMPT),
+        ]
+    )
+    return prompt | relevancy_llm
     
     
 def database_agent(state):
     """
     Database Agent: Saves the final results to the SQLite database.
+
+    The candidate and application upserts are handed to the shared group-commit
+    writer; the agent waits until the batch containing them has been committed and
+    then adds the candidate to the vector index used for talent pool searches.
     """
     logger.info("---AGENT: SAVING TO DATABASE---")
+    write = _submit_database_write(state)
+    if write is None:
+        return {}
+
+    try:
+        candidate_id = write.result()
+        record_queue_wait(write.queue_wait)
+        logger.info(f"---AGENT: SUCCESSFULLY SAVED application for candidate {candidate_id} to job {state.get('job_id')}---")
+        _update_vector_index(candidate_id, state)
+        return {"candidate_id": candidate_id}
+
+    except Exception as e:
+        logger.error(f"---AGENT: ERROR during database operation: {e}---")
+        # We can choose to raise an error or just log it. For now, let's log.
+        return {}
+
+def _update_vector_index(candidate_id, state):
+    # The candidate is already saved; a failure here must not fail the run. The index can
+    # always be rebuilt from the database with `vector_index.rebuild_vector_index()`.
+    if state.get("candidate_id") is not None:
+        # An existing candidate whose report did not change is already indexed.
+        return
+    try:
+        index_candidate(candidate_id, state.get("final_report"))
+    except Exception as e:
+        logger.warning(f"---AGENT: Could not update the candidate vector index: {e}---")
+
+def _submit_database_write(state):
     final_report = state.get("final_report")
     job_id = state.get("job_id")
-    match_score = state.get("match_score")
-    match_summary = state.get("match_summary")
 
     if not final_report or job_id is None:
         logger.error("---AGENT: Cannot save to DB. Missing final report or job_id.")
         # This should not happen in a normal flow, but it's good practice to check.
-        return {}
+        return None
+
+    # A known candidate_id (e.g. when re-scoring stored candidates) only links the
+    # application; the stored report is not rewritten.
+    return get_candidate_writer().submit(
+        job_id,
+        final_report,
+        state.get("match_score"),
+        state.get("match_summary"),
+        prescreen_score=state.get("prescreen_score"),
+        candidate_id=state.get("candidate_id"),
+        task_id=state.get("task_id"),
+        signature=index_entry(state),
+    )
+
+# --- Async Agents ---
+# Async counterparts of the agents above, used by create_async_workflow(). LLM calls use
+# `ainvoke`, while blocking PDF and SQLite work is offloaded to a worker thread so the
+# event loop is never blocked. The compaction, standardization and pre-screening agents
+# are pure, fast CPU work and are shared as-is between both workflows.
+
+async def aingestion_agent(state):
+    """
+    Async Ingestion Agent: Same behaviour as `ingestion_agent`, awaiting the parsing
+    process pool without blocking the event loop.
+
+    Args:
+        state (AgentState): The current state of the agent workflow, expected to contain 'file_path'.
+
+    Returns:
+        dict: Same as `ingestion_agent`.
+    """
+    logger.info("---AGENT: INGESTING AND PARSING PDF (ASYNC)---")
+    file_path = state.get("file_path")
+    if not file_path:
+        logger.error("File path must be provided in the state.")
+        raise ValueError("File path must be provided in the state.")
 
     try:
-        # Add candidate to DB and get their ID
-        candidate_id = add_or_update_candidate(final_report)
+        # Parsing runs in a worker process; when the pool is disabled it runs in a thread.
+        raw_text, pdf_hash = await asyncio.wrap_future(
+            await asyncio.to_thread(submit_pdf_parse, file_path)
+        )
+        logger.info("---AGENT: PDF PARSED SUCCESSFULLY---")
+        return {"raw_text": raw_text, "pdf_hash": pdf_hash}
+    except Exception as e:
+        logger.error(f"---AGENT: ERROR during PDF parsing: {e}---")
+        raise PDFParsingError(f"Error parsing PDF: {e}") from e
 
-        # Link the candidate to the job via an application record
-        add_application(job_id, candidate_id, match_score, match_summary)
-        
-        logger.info(f"---AGENT: SUCCESSFULLY SAVED application for candidate {candidate_id} to job {job_id}---")
-        return {"candidate_id": candidate_id}
+async def adedup_agent(state):
+    """
+    Async Dedup Agent: Same behaviour as `dedup_agent`, with the index lookup in a worker thread.
+    """
+    return await asyncio.to_thread(dedup_agent, state)
+
+async def aextraction_agent(state):
+    """
+    Async Core Extraction Agent: Same behaviour as `extraction_agent`, using `ainvoke`.
 
+    Args:
+        state (AgentState): The current state of the agent workflow, expected to contain 'raw_text'
+                            and optionally 'pdf_hash'.
+
+    Returns:
+        dict: Same as `extraction_agent`.
+
+    Raises:
+        ExtractionError: If an error occurs during the LLM-based extraction process.
+    """
+    logger.info("---AGENT: EXTRACTING INFORMATION (ASYNC)---")
+    raw_text = _extraction_input(state)
+    if not raw_text:
+        logger.info("---AGENT: No raw text provided for extraction.---")
+        return {"extracted_json": None}
+
+    cache_key = _extraction_cache_key_for_state(state)
+    cached_resume = await asyncio.to_thread(_load_cached_extraction, cache_key)
+    if cached_resume is not None:
+        return {"extracted_json": cached_resume}
+
+    try:
+        chain = _build_extraction_chain()
+        extracted_data = await ainvoke_llm(chain, {"resume_text": raw_text})
+        logger.info("---AGENT: INFORMATION EXTRACTED---")
+    except Exception as e:
+        logger.error(f"---AGENT: ERROR during extraction: {e}---")
+        raise ExtractionError(f"Error extracting information: {e}") from e
+
+    await asyncio.to_thread(_store_extraction, cache_key, extracted_data)
+    return {"extracted_json": extracted_data}
+
+async def arelevancy_analysis_agent(state):
+    """
+    Async Job Match & Relevancy Agent: Same behaviour as `relevancy_analysis_agent`, using `ainvoke`.
+    """
+    logger.info("---AGENT: ANALYZING RELEVANCY (ASYNC)---")
+    job_description = state.get("job_description")
+    final_report = state.get("final_report")
+
+    if not job_description or not final_report:
+        logger.info("---AGENT: SKIPPING RELEVANCY ANALYSIS (missing job description or report)---")
+        return {"match_score": 0, "match_summary": "Not applicable (no job description provided)."}
+
+    cache_key = relevancy_cache_key(final_report, job_description)
+    cached_result = await asyncio.to_thread(_load_cached_relevancy, cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    try:
+        chain = _build_relevancy_chain()
+        analysis_result = await ainvoke_llm(chain, {
+            "resume": serialize_resume(final_report),
+            "job_description": job_description
+        })
+        logger.info("---AGENT: RELEVANCY ANALYSIS COMPLETE---")
+    except Exception as e:
+        logger.error(f"---AGENT: ERROR during relevancy analysis: {e}---")
+        raise RelevancyAnalysisError(f"Error during relevancy analysis: {e}") from e
+
+    await asyncio.to_thread(_store_relevancy, cache_key, analysis_result)
+    return {
+        "match_score": analysis_result.score,
+        "match_summary": analysis_result.summary
+    }
+
+async def adatabase_agent(state):
+    """
+    Async Database Agent: Same behaviour as `database_agent`, awaiting the writer's
+    commit acknowledgement without blocking a thread.
+    """
+    logger.info("---AGENT: SAVING TO DATABASE (ASYNC)---")
+    write = _submit_database_write(state)
+    if write is None:
+        return {}
+
+    try:
+        candidate_id = await asyncio.wrap_future(write)
+        record_queue_wait(write.queue_wait)
+        logger.info(f"---AGENT: SUCCESSFULLY SAVED application for candidate {candidate_id} to job {state.get('job_id')}---")
+        await asyncio.to_thread(_update_vector_index, candidate_id, state)
+        return {"candidate_id": candidate_id}
     except Exception as e:
         logger.error(f"---AGENT: ERROR during database operation: {e}---")
-        # We can choose to raise an error or just log it. For now, let's log.
         return {}
-    
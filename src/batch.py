@@ -0,0 +1,122 @@
+import os
+import asyncio
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default number of resumes processed concurrently. Nearly all of the time is spent
+# waiting on the Gemini API, so this can be well above the number of CPU cores.
+MAX_CONCURRENT_RESUMES = int(os.getenv("MAX_CONCURRENT_RESUMES", "8"))
+
+def iter_batch_results(
+    graph_app,
+    inputs: Iterable[Dict[str, Any]],
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[BaseException]]]:
+    """
+    Runs a compiled workflow over many inputs with bounded concurrency.
+
+    Inputs are consumed lazily, so at most `max_in_flight` runs are pending at any
+    time regardless of how many inputs there are. Results are yielded in completion
+    order, and an exception raised by one run never affects the others.
+
+    Args:
+        graph_app (CompiledGraph): The compiled LangGraph application to invoke.
+        inputs (Iterable[dict]): The input state for each run.
+        max_in_flight (Optional[int]): Maximum number of concurrent runs.
+                                       Defaults to MAX_CONCURRENT_RESUMES.
+
+    Yields:
+        tuple: (inputs, result_state, error) for each run. Exactly one of
+               `result_state` and `error` is None.
+    """
+    if max_in_flight is None:
+        max_in_flight = MAX_CONCURRENT_RESUMES
+    max_in_flight = max(1, int(max_in_flight))
+
+    inputs_iter = iter(inputs)
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="cv-scout-batch") as executor:
+        pending = {}
+
+        def submit_next() -> bool:
+            try:
+                item = next(inputs_iter)
+            except StopIteration:
+                return False
+            # Each run gets a copy of the caller's context, e.g. its LLM priority lane.
+            pending[executor.submit(contextvars.copy_context().run, graph_app.invoke, item)] = item
+            return True
+
+        for _ in range(max_in_flight):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    logger.error(f"---BATCH: Run failed for {item.get('file_path')}: {error}---")
+                    yield item, None, error
+                else:
+                    yield item, future.result(), None
+                submit_next()
+
+async def aiter_batch_results(
+    graph_app,
+    inputs: Iterable[Dict[str, Any]],
+    max_in_flight: Optional[int] = None,
+) -> AsyncIterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[BaseException]]]:
+    """
+    Async counterpart of `iter_batch_results` for workflows built with async nodes.
+
+    Runs are scheduled as tasks on the current event loop via `graph_app.ainvoke`,
+    so no thread is tied up per in-flight resume.
+
+    Args:
+        graph_app (CompiledGraph): The compiled LangGraph application to invoke.
+        inputs (Iterable[dict]): The input state for each run.
+        max_in_flight (Optional[int]): Maximum number of concurrent runs.
+                                       Defaults to MAX_CONCURRENT_RESUMES.
+
+    Yields:
+        tuple: (inputs, result_state, error) for each run, in completion order.
+    """
+    if max_in_flight is None:
+        max_in_flight = MAX_CONCURRENT_RESUMES
+    max_in_flight = max(1, int(max_in_flight))
+
+    inputs_iter = iter(inputs)
+    pending = {}
+
+    def submit_next() -> bool:
+        try:
+            item = next(inputs_iter)
+        except StopIteration:
+            return False
+        pending[asyncio.ensure_future(graph_app.ainvoke(item))] = item
+        return True
+
+    for _ in range(max_in_flight):
+        if not submit_next():
+            break
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = pending.pop(task)
+                error = task.exception()
+                if error is not None:
+                    logger.error(f"---BATCH: Run failed for {item.get('file_path')}: {error}---")
+                    yield item, None, error
+                else:
+                    yield item, task.result(), None
+                submit_next()
+    finally:
+        for task in pending:
+            task.cancel()
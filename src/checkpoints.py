@@ -0,0 +1,451 @@
+"""
+Persistent LangGraph checkpoints, so a failed resume run resumes from the last
+completed node instead of starting over at ingestion.
+
+`SQLiteCheckpointSaver` stores checkpoints in their own SQLite file (CHECKPOINT_DB_PATH),
+apart from cv_scout.db, so checkpoint writes after every node never compete with the
+candidate writer for the database lock. Runs are keyed by a stable thread ID: the PDF's
+SHA-256, the job ID and the file path. `ResumableWorkflow` wraps a workflow compiled with the saver:
+it resumes an unfinished run of the same thread, deletes the checkpoints of runs that
+succeed, and prunes those of runs abandoned for longer than CHECKPOINT_RETENTION_HOURS.
+"""
+import os
+import time
+import json
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "cv_scout_checkpoints.db")
+CHECKPOINT_RETENTION_HOURS = float(os.getenv("CHECKPOINT_RETENTION_HOURS", "72"))
+# Pruning runs at most this often, from whichever run finishes next.
+CHECKPOINT_PRUNE_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_PRUNE_INTERVAL_SECONDS", "600"))
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        parent_checkpoint_id TEXT,
+        type TEXT,
+        checkpoint BLOB,
+        metadata TEXT,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS checkpoint_writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        idx INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        type TEXT,
+        value BLOB,
+        task_path TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS checkpoint_runs (
+        thread_id TEXT PRIMARY KEY,
+        file_path TEXT,
+        job_id INTEGER,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_checkpoint_runs_updated ON checkpoint_runs (updated_at)",
+]
+
+# Pydantic models that appear in the workflow state and may be restored from a checkpoint.
+_STATE_MODELS = [
+    ("src.schemas", "Resume"),
+    ("src.schemas", "Education"),
+    ("src.schemas", "Experience"),
+    ("src.schemas", "RelevancyAnalysis"),
+]
+
+def run_thread_id(pdf_hash: str, job_id: Optional[int], file_path: str) -> str:
+    """
+    The checkpoint thread of a resume run: the same file for the same job is the same run.
+
+    The path is part of the ID because byte-identical PDFs at different paths (common in
+    bulk imports) may run concurrently and must not adopt each other's checkpoints, which
+    carry their own 'file_path' and 'task_id'. Their repeated work is absorbed by the
+    extraction and relevancy caches. The hash comes first; `src.cli` reads it back.
+    """
+    path_digest = hashlib.sha256(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    return f"{pdf_hash}:{job_id if job_id is not None else '-'}:{path_digest}"
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 of a file, the same digest the ingestion agent stores as 'pdf_hash'."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpoint saver backed by a SQLite file, safe to share across threads and
+    processes. Each checkpoint is stored whole (serialized with the saver's serde), with
+    the pending writes of its tasks, which is what a failed run needs to resume.
+
+    Args:
+        path (Optional[str]): The database file. Defaults to CHECKPOINT_DB_PATH.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__(serde=JsonPlusSerializer(allowed_msgpack_modules=_STATE_MODELS))
+        self.path = path or CHECKPOINT_DB_PATH
+        self._local = threading.local()
+        with self._connection() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _tuple(self, thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, blob, metadata, config=None) -> CheckpointTuple:
+        writes = self._connection().execute(
+            """SELECT task_id, channel, type, value FROM checkpoint_writes
+               WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+               ORDER BY task_id, idx""",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        return CheckpointTuple(
+            config=config or {"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint=self.serde.loads_typed((type_, blob)),
+            metadata=json.loads(metadata),
+            parent_config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id,
+            }} if parent_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+        )
+
+    def get_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata"
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            row = self._connection().execute(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id)
+            ).fetchone()
+            return self._tuple(*row, config=config) if row else None
+        row = self._connection().execute(
+            f"""SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+                ORDER BY checkpoint_id DESC LIMIT 1""",
+            (thread_id, checkpoint_ns)
+        ).fetchone()
+        return self._tuple(*row) if row else None
+
+    def list(
+        self,
+        config: Optional[Dict[str, Any]],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        conditions, params = [], []
+        if config is not None:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_id)
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM checkpoints"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+        remaining = limit
+        for row in self._connection().execute(query, params).fetchall():
+            if filter and any(json.loads(row[6]).get(key) != value for key, value in filter.items()):
+                continue
+            yield self._tuple(*row)
+            if remaining is not None:
+                remaining -= 1
+                if remaining <= 0:
+                    return
+
+    def put(
+        self,
+        config: Dict[str, Any],
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> Dict[str, Any]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, blob = self.serde.dumps_typed(checkpoint)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO checkpoints(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+                                                      type, checkpoint, metadata, created_at)
+                   VALUES(?,?,?,?,?,?,?,?)""",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, blob, json.dumps(get_checkpoint_metadata(config, metadata), default=str), time.time())
+            )
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        configurable = config["configurable"]
+        # Special channels (errors, interrupts) replace an earlier write of the same task;
+        # regular writes are kept from the first attempt.
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((
+                configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"],
+                task_id, WRITES_IDX_MAP.get(channel, idx), channel, type_, blob, task_path,
+            ))
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                f"""{verb} INTO checkpoint_writes(thread_id, checkpoint_ns, checkpoint_id, task_id, idx,
+                                                  channel, type, value, task_path)
+                    VALUES(?,?,?,?,?,?,?,?,?)""",
+                rows
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            conn.execute("DELETE FROM checkpoint_writes WHERE thread_id = ?", (thread_id,))
+
+    async def aget_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[CheckpointTuple]:
+        for item in await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit))):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # --- Run bookkeeping ---
+
+    def record_run(self, thread_id: str, status: str, file_path: Optional[str] = None, job_id: Optional[int] = None, error: Optional[str] = None):
+        """Records a run's status ('running', 'failed' or 'done') for `list_incomplete_runs`."""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """INSERT INTO checkpoint_runs(thread_id, file_path, job_id, status, attempts, last_error, updated_at)
+                   VALUES(?,?,?,?,?,?,?)
+                   ON CONFLICT(thread_id) DO UPDATE SET
+                       status = excluded.status,
+                       attempts = checkpoint_runs.attempts + (excluded.status = 'running'),
+                       last_error = excluded.last_error,
+                       file_path = COALESCE(excluded.file_path, checkpoint_runs.file_path),
+                       job_id = COALESCE(excluded.job_id, checkpoint_runs.job_id),
+                       updated_at = excluded.updated_at""",
+                (thread_id, file_path, job_id, status, int(status == "running"), error, time.time())
+            )
+
+    def list_incomplete_runs(self) -> List[Dict[str, Any]]:
+        """Runs that failed or never finished (e.g. the process died), most recent first."""
+        rows = self._connection().execute(
+            """SELECT thread_id, file_path, job_id, status, attempts, last_error, updated_at
+               FROM checkpoint_runs WHERE status != 'done' ORDER BY updated_at DESC"""
+        ).fetchall()
+        keys = ("thread_id", "file_path", "job_id", "status", "attempts", "last_error", "updated_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Deletes the checkpoints and run records not updated for `older_than_seconds`. Returns the runs removed."""
+        cutoff = time.time() - older_than_seconds
+        conn = self._connection()
+        with conn:
+            stale = [row[0] for row in conn.execute(
+                "SELECT thread_id FROM checkpoint_runs WHERE updated_at < ?", (cutoff,)
+            )]
+            # Checkpoints of threads without a run record (e.g. written by direct invokes)
+            stale += [row[0] for row in conn.execute(
+                """SELECT thread_id FROM checkpoints GROUP BY thread_id
+                   HAVING MAX(created_at) < ? AND thread_id NOT IN (SELECT thread_id FROM checkpoint_runs)""",
+                (cutoff,)
+            )]
+            for chunk_start in range(0, len(stale), 500):
+                chunk = stale[chunk_start:chunk_start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for table in ("checkpoints", "checkpoint_writes", "checkpoint_runs"):
+                    conn.execute(f"DELETE FROM {table} WHERE thread_id IN ({placeholders})", chunk)
+        if stale:
+            logger.info(f"---CHECKPOINTS: Pruned {len(stale)} run(s) older than {older_than_seconds / 3600:.1f} h---")
+        return len(stale)
+
+
+_saver: Optional[SQLiteCheckpointSaver] = None
+_saver_lock = threading.Lock()
+
+def get_checkpointer() -> SQLiteCheckpointSaver:
+    """Returns the process-wide checkpoint saver for CHECKPOINT_DB_PATH, creating it on first use."""
+    global _saver
+    with _saver_lock:
+        if _saver is None or _saver.path != CHECKPOINT_DB_PATH:
+            _saver = SQLiteCheckpointSaver(CHECKPOINT_DB_PATH)
+        return _saver
+
+def set_checkpoint_db(path: str):
+    """Uses another checkpoint database, e.g. in benchmarks."""
+    global CHECKPOINT_DB_PATH
+    CHECKPOINT_DB_PATH = path
+
+
+class ResumableWorkflow:
+    """
+    Runs a workflow compiled with a SQLiteCheckpointSaver, one checkpoint thread per
+    file and job (see `run_thread_id`).
+
+    If the thread has an unfinished run (a node raised, or the process died), `invoke`
+    resumes it from the last completed node, so e.g. a failed relevancy analysis does
+    not repeat the extraction. Otherwise a new run starts. When a run succeeds its
+    checkpoints are deleted; failed runs are kept for CHECKPOINT_RETENTION_HOURS.
+
+    Has the same `invoke`/`ainvoke` signature as the compiled graph, so it can be passed
+    to `batch.iter_batch_results` and `batch.aiter_batch_results`.
+    """
+
+    def __init__(self, graph_app, checkpointer: SQLiteCheckpointSaver, retention_hours: float = CHECKPOINT_RETENTION_HOURS):
+        self.graph_app = graph_app
+        self.checkpointer = checkpointer
+        self.retention_seconds = retention_hours * 3600
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def _config(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        pdf_hash = inputs.get("pdf_hash") or file_sha256(inputs["file_path"])
+        return {"configurable": {"thread_id": run_thread_id(pdf_hash, inputs.get("job_id"), inputs["file_path"])}}
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        with self._prune_lock:
+            if now - self._last_prune < CHECKPOINT_PRUNE_INTERVAL_SECONDS:
+                return
+            self._last_prune = now
+        try:
+            self.checkpointer.prune(self.retention_seconds)
+        except sqlite3.Error as e:
+            logger.warning(f"---CHECKPOINTS: Pruning failed: {e}---")
+
+    def _start(self, inputs, config, pending_nodes) -> Optional[Dict[str, Any]]:
+        """Records the run; returns the graph input (None resumes the pending nodes)."""
+        thread_id = config["configurable"]["thread_id"]
+        self.checkpointer.record_run(thread_id, "running", inputs.get("file_path"), inputs.get("job_id"))
+        if pending_nodes:
+            logger.info(f"---CHECKPOINTS: Resuming {inputs.get('file_path')} at {', '.join(pending_nodes)}---")
+            return None
+        # A finished run of the same thread is replaced by the new one.
+        self.checkpointer.delete_thread(thread_id)
+        return inputs
+
+    def _finish(self, config, error: Optional[BaseException]):
+        thread_id = config["configurable"]["thread_id"]
+        if error is None:
+            self.checkpointer.delete_thread(thread_id)
+            self.checkpointer.record_run(thread_id, "done")
+        else:
+            self.checkpointer.record_run(thread_id, "failed", error=f"{type(error).__name__}: {error}")
+        self._maybe_prune()
+
+    def invoke(self, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None):
+        config = {**(config or {}), **self._config(inputs)}
+        graph_input = self._start(inputs, config, self.graph_app.get_state(config).next)
+        try:
+            result = self.graph_app.invoke(graph_input, config)
+        except Exception as e:
+            self._finish(config, e)
+            raise
+        self._finish(config, None)
+        return result
+
+    async def ainvoke(self, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None):
+        config = {**(config or {}), **await asyncio.to_thread(self._config, inputs)}
+        state = await self.graph_app.aget_state(config)
+        graph_input = await asyncio.to_thread(self._start, inputs, config, state.next)
+        try:
+            result = await self.graph_app.ainvoke(graph_input, config)
+        except Exception as e:
+            await asyncio.to_thread(self._finish, config, e)
+            raise
+        await asyncio.to_thread(self._finish, config, None)
+        return result
+
+    def resume(self, thread_id: str):
+        """Resumes an incomplete run listed by `list_incomplete_runs`."""
+        config = {"configurable": {"thread_id": thread_id}}
+        if not self.graph_app.get_state(config).next:
+            raise ValueError(f"Run {thread_id} has no checkpoint to resume from.")
+        self.checkpointer.record_run(thread_id, "running")
+        try:
+            result = self.graph_app.invoke(None, config)
+        except Exception as e:
+            self._finish(config, e)
+            raise
+        self._finish(config, None)
+        return result
+
+def create_resumable_workflow(use_async: bool = False) -> ResumableWorkflow:
+    """The full resume workflow, checkpointed to CHECKPOINT_DB_PATH and wrapped in a ResumableWorkflow."""
+    from src.graph import create_async_workflow, create_workflow
+
+    checkpointer = get_checkpointer()
+    graph_app = create_async_workflow(checkpointer) if use_async else create_workflow(checkpointer)
+    return ResumableWorkflow(graph_app, checkpointer)
+
+def list_incomplete_runs() -> List[Dict[str, Any]]:
+    """Runs in CHECKPOINT_DB_PATH that failed or never finished, most recent first."""
+    return get_checkpointer().list_incomplete_runs()
@@ -0,0 +1,395 @@
+"""
+Headless batch processing of resume PDFs, for bulk imports without the Gradio UI.
+
+Streams the PDFs through the resume workflow (`create_workflow`) with bounded
+concurrency and appends one record per resume to a JSONL or Parquet file as soon as it
+completes. Inputs are listed lazily and results are never collected, so memory use does
+not grow with the number of resumes. Progress, throughput and ETA go to stderr.
+
+Run from the repository root:
+    python -m src.cli resumes/ --job-description job.txt --output results.jsonl
+    python -m src.cli "imports/2024-*/*.pdf" --job-id 3 --output results.parquet --max-in-flight 16
+    python -m src.cli --manifest files.txt --job-description job.txt --output - > results.jsonl
+    python -m src.cli resumes/ --job-description job.txt --enqueue    # for src.worker processes
+    python -m src.cli --list-incomplete
+    python -m src.cli --resume-incomplete --output resumed.jsonl
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from src import database
+from src.batch import iter_batch_results, MAX_CONCURRENT_RESUMES
+
+logger = logging.getLogger(__name__)
+
+# Rows buffered per Parquet row group; the only results held in memory at once.
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("CLI_PARQUET_ROW_GROUP_SIZE", "1000"))
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("CLI_PROGRESS_INTERVAL_SECONDS", "2"))
+
+# Columns of every output record, in order.
+RESULT_FIELDS = (
+    "file_path", "status", "error", "job_id", "candidate_id", "full_name", "email", "phone_number",
+    "total_experience_years", "technical_skills", "prescreen_score", "run_analysis", "match_score",
+    "match_summary", "raw_token_count", "compacted_token_count", "report",
+)
+
+def iter_pdf_paths(sources: List[str]) -> Iterator[str]:
+    """
+    Yields the PDF files named by `sources`, lazily.
+
+    Each source is a PDF file, a directory (searched recursively) or a glob pattern.
+    """
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(source):
+            yield source
+        else:
+            matched = False
+            for path in glob.iglob(source, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(".pdf"):
+                    matched = True
+                    yield path
+            if not matched:
+                logger.warning(f"---CLI: No PDF files match {source}---")
+
+def iter_manifest_paths(manifest_path: str) -> Iterator[str]:
+    """
+    Yields the PDF paths listed in a manifest, lazily.
+
+    The manifest has one path per line, or one JSON object with a "file_path" key per
+    line. Blank lines and lines starting with '#' are skipped. Relative paths are
+    resolved against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["file_path"] if line.startswith("{") else line
+            yield path if os.path.isabs(path) else os.path.join(base, path)
+
+def result_record(inputs: Dict[str, Any], result_state: Optional[Dict[str, Any]], error: Optional[BaseException], include_report: bool = False) -> Dict[str, Any]:
+    """Flattens one workflow run into an output record with the RESULT_FIELDS columns."""
+    record = dict.fromkeys(RESULT_FIELDS)
+    record["file_path"] = inputs["file_path"]
+    record["job_id"] = inputs.get("job_id")
+    if error is not None:
+        record["status"] = "error"
+        record["error"] = f"{type(error).__name__}: {error}"
+        return record
+
+    report = result_state.get("final_report") or {}
+    if not report:
+        record["status"] = "error"
+        record["error"] = "No data could be extracted from the resume."
+    elif result_state.get("candidate_id") is None and inputs.get("job_id") is not None:
+        record["status"] = "error"
+        record["error"] = "Processing completed but no candidate ID was returned."
+    else:
+        record["status"] = "ok"
+    for key in ("candidate_id", "prescreen_score", "run_analysis", "match_score", "match_summary",
+                "raw_token_count", "compacted_token_count"):
+        record[key] = result_state.get(key)
+    record["full_name"] = report.get("full_name")
+    record["email"] = report.get("mail")
+    record["phone_number"] = report.get("phone_number")
+    record["total_experience_years"] = report.get("total_experience_years")
+    record["technical_skills"] = report.get("technical_skills")
+    if include_report and report:
+        record["report"] = json.dumps(report, ensure_ascii=False)
+    return record
+
+
+class JsonlResultWriter:
+    """Appends each record as one JSON line and flushes it, so a crash loses nothing written."""
+
+    def __init__(self, path: str):
+        self._file = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class ParquetResultWriter:
+    """Writes records to a Parquet file, one row group per `row_group_size` records."""
+
+    def __init__(self, path: str, row_group_size: int = PARQUET_ROW_GROUP_SIZE):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Writing Parquet requires pyarrow (pip install pyarrow); use a .jsonl output instead.") from e
+        self._pa = pa
+        self._schema = pa.schema([
+            ("file_path", pa.string()), ("status", pa.string()), ("error", pa.string()),
+            ("job_id", pa.int64()), ("candidate_id", pa.int64()), ("full_name", pa.string()),
+            ("email", pa.string()), ("phone_number", pa.string()), ("total_experience_years", pa.float64()),
+            ("technical_skills", pa.list_(pa.string())), ("prescreen_score", pa.float64()),
+            ("run_analysis", pa.bool_()), ("match_score", pa.int64()), ("match_summary", pa.string()),
+            ("raw_token_count", pa.int64()), ("compacted_token_count", pa.int64()), ("report", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._row_group_size = max(1, row_group_size)
+        self._rows: List[Dict[str, Any]] = []
+
+    def write(self, record: Dict[str, Any]):
+        self._rows.append(record)
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+def open_result_writer(path: str, output_format: Optional[str] = None):
+    """Returns a JSONL or Parquet writer for `path`; the format defaults to the file extension."""
+    if output_format is None:
+        output_format = "parquet" if path.lower().endswith(".parquet") else "jsonl"
+    if output_format == "parquet":
+        return ParquetResultWriter(path)
+    return JsonlResultWriter(path)
+
+
+class ProgressReporter:
+    """Prints done/total, throughput and ETA to stderr at most every `interval` seconds."""
+
+    def __init__(self, total: Optional[int], interval: float = PROGRESS_INTERVAL_SECONDS, stream=None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.done = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self._last_report = 0.0
+        self._reported_done = -1
+
+    def update(self, ok: bool):
+        self.done += 1
+        self.failed += not ok
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def line(self) -> str:
+        elapsed = time.monotonic() - self.started_at
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        done = f"{self.done}/{self.total}" if self.total is not None else str(self.done)
+        text = f"[{done}] {rate:.2f} resumes/s, {self.failed} failed, elapsed {_format_seconds(elapsed)}"
+        if self.total is not None and rate > 0:
+            text += f", ETA {_format_seconds((self.total - self.done) / rate)}"
+        return text
+
+    def report(self):
+        self._reported_done = self.done
+        print(self.line(), file=self.stream, flush=True)
+
+    def finish(self):
+        """Prints the final line, unless the last one printed is already up to date."""
+        if self._reported_done != self.done:
+            self.report()
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def run_batch(
+    inputs,
+    writer,
+    max_in_flight: int = MAX_CONCURRENT_RESUMES,
+    total: Optional[int] = None,
+    include_report: bool = False,
+    progress_interval: float = PROGRESS_INTERVAL_SECONDS,
+) -> Dict[str, int]:
+    """
+    Runs the resume workflow over `inputs` and writes one record per resume as it completes.
+
+    Runs are checkpointed (see `checkpoints.ResumableWorkflow`): running the same PDF for
+    the same job again after a failure resumes from the last completed node.
+
+    Args:
+        inputs (Iterable[dict]): Input states ('file_path', 'job_description', 'job_id'), consumed lazily.
+        writer: A JsonlResultWriter or ParquetResultWriter.
+        max_in_flight (int): Resumes processed concurrently.
+        total (Optional[int]): Number of inputs, for the ETA.
+        include_report (bool): Also write the full standardized report as JSON.
+        progress_interval (float): Seconds between progress lines.
+
+    Returns:
+        dict: Counts of processed, succeeded and failed resumes.
+    """
+    # Imported here so `--help` and argument errors do not wait for LangGraph.
+    from src.checkpoints import create_resumable_workflow
+    from src.db_writer import get_candidate_writer
+    from src.tracing import get_registry
+
+    progress = ProgressReporter(total, progress_interval)
+    try:
+        for run_inputs, result_state, error in iter_batch_results(create_resumable_workflow(), inputs, max_in_flight=max_in_flight):
+            record = result_record(run_inputs, result_state, error, include_report)
+            writer.write(record)
+            progress.update(record["status"] == "ok")
+    finally:
+        get_candidate_writer().close()
+        get_registry().flush()
+        progress.finish()
+    return {"processed": progress.done, "succeeded": progress.done - progress.failed, "failed": progress.failed}
+
+def incomplete_run_inputs(runs: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Input states that resume the given incomplete runs (see `checkpoints.list_incomplete_runs`)."""
+    job_descriptions: Dict[int, Optional[str]] = {}
+    for run in runs:
+        job_id = run["job_id"]
+        if job_id is not None and job_id not in job_descriptions:
+            job_descriptions[job_id] = database.get_job_description(job_id)
+        yield {
+            "file_path": run["file_path"],
+            "job_description": job_descriptions.get(job_id),
+            "job_id": job_id,
+            # The run's thread is derived from the hash, so the PDF is not read again.
+            "pdf_hash": run["thread_id"].split(":", 1)[0],
+        }
+
+def enqueue_paths(paths, job_id: int, chunk_size: int = 1000) -> int:
+    """Adds the PDFs to the task queue in chunks, for `src.worker`. Returns how many were listed."""
+    from src.worker import TASK_MAX_ATTEMPTS
+
+    count, chunk = 0, []
+    for path in paths:
+        chunk.append(os.path.abspath(path))
+        if len(chunk) >= chunk_size:
+            database.enqueue_tasks(job_id, chunk, TASK_MAX_ATTEMPTS)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        database.enqueue_tasks(job_id, chunk, TASK_MAX_ATTEMPTS)
+        count += len(chunk)
+    return count
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("sources", nargs="*", help="PDF files, directories (searched recursively) or glob patterns")
+    parser.add_argument("--manifest", help="file listing one PDF path (or JSON object with file_path) per line")
+    job = parser.add_mutually_exclusive_group()
+    job.add_argument("--job-description", help="text file with the job description; a new job is created")
+    job.add_argument("--job-id", type=int, help="score against an existing job")
+    parser.add_argument("--output", help="output file (.jsonl or .parquet), or '-' for JSONL on stdout")
+    parser.add_argument("--enqueue", action="store_true", help="add the resumes to the task queue for src.worker instead")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), help="output format (default: from the extension)")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_CONCURRENT_RESUMES, help="resumes processed concurrently")
+    parser.add_argument("--db", help="SQLite database file (default: DB_PATH)")
+    parser.add_argument("--include-report", action="store_true", help="add the full standardized report to each record")
+    parser.add_argument("--no-count", action="store_true", help="do not list the inputs up front (no ETA)")
+    parser.add_argument("--progress-interval", type=float, default=PROGRESS_INTERVAL_SECONDS, help="seconds between progress lines")
+    parser.add_argument("--checkpoint-db", help="SQLite file for run checkpoints (default: CHECKPOINT_DB_PATH)")
+    parser.add_argument("--list-incomplete", action="store_true", help="print the runs that failed or never finished and exit")
+    parser.add_argument("--resume-incomplete", action="store_true", help="resume every incomplete run instead of reading inputs")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    reads_inputs = not (args.list_incomplete or args.resume_incomplete)
+    if reads_inputs and not args.sources and not args.manifest:
+        parser.error("give PDF files, directories or glob patterns, or --manifest")
+    if args.enqueue:
+        if args.job_description is None and args.job_id is None:
+            parser.error("--enqueue needs --job-description or --job-id")
+    elif args.output is None and not args.list_incomplete:
+        parser.error("give --output, or --enqueue to hand the resumes to src.worker")
+    if args.output == "-" and args.format == "parquet":
+        parser.error("Parquet output needs a file path")
+    if args.checkpoint_db:
+        from src.checkpoints import set_checkpoint_db
+        set_checkpoint_db(args.checkpoint_db)
+
+    if args.list_incomplete or args.resume_incomplete:
+        from src.checkpoints import list_incomplete_runs
+        runs = list_incomplete_runs()
+        if args.list_incomplete:
+            for run in runs:
+                print(json.dumps(run))
+            return 0
+
+    def list_paths():
+        if args.manifest:
+            yield from iter_manifest_paths(args.manifest)
+        yield from iter_pdf_paths(args.sources)
+
+    # Counting walks the inputs once more but holds no paths; it makes the ETA possible.
+    if not reads_inputs:
+        total = len(runs)
+    elif args.no_count or args.enqueue:
+        total = None
+    else:
+        total = sum(1 for _ in list_paths())
+
+    writer = None
+    if not args.enqueue:
+        try:
+            writer = open_result_writer(args.output, args.format)
+        except RuntimeError as e:
+            parser.error(str(e))
+    database.init_db(args.db)
+    job_description, job_id = None, args.job_id
+    if reads_inputs and args.job_description:
+        with open(args.job_description, encoding="utf-8") as f:
+            job_description = f.read().strip()
+        job_id = database.add_job(job_description)
+        print(f"Created job {job_id}", file=sys.stderr)
+    elif reads_inputs and job_id is not None:
+        job_description = database.get_job_description(job_id)
+        if job_description is None:
+            parser.error(f"job {job_id} does not exist")
+
+    if args.enqueue:
+        try:
+            queued = enqueue_paths(list_paths(), job_id)
+        finally:
+            database.close_connection()
+        print(json.dumps({"job_id": job_id, "queued": queued}), file=sys.stderr)
+        return 0
+
+    if reads_inputs:
+        inputs = ({"file_path": path, "job_description": job_description, "job_id": job_id} for path in list_paths())
+    else:
+        inputs = incomplete_run_inputs(runs)
+    try:
+        stats = run_batch(
+            inputs, writer,
+            max_in_flight=args.max_in_flight, total=total,
+            include_report=args.include_report, progress_interval=args.progress_interval,
+        )
+    finally:
+        writer.close()
+        database.close_connection()
+    print(json.dumps(stats), file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"), stream=sys.stderr)
+    sys.exit(main())
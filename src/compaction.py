@@ -0,0 +1,199 @@
+import os
+import re
+import math
+import logging
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from src.pdf_parsing import PAGE_SEPARATOR
+
+logger = logging.getLogger(__name__)
+
+# Maximum size of the text sent to the extraction LLM, in (estimated) tokens.
+COMPACTION_TOKEN_BUDGET = int(os.getenv("COMPACTION_TOKEN_BUDGET", "3000"))
+# Bump when the compaction rules change, so cached extractions of differently compacted
+# text are not reused.
+COMPACTION_VERSION = "1"
+
+# Rough average for English text and Gemini's tokenizer.
+CHARS_PER_TOKEN = 4
+
+# Sections the Resume schema does not ask for. They are dropped first when the text is
+# over budget.
+LOW_PRIORITY_SECTIONS = frozenset({
+    "publications", "references", "interests", "hobbies", "conferences", "talks",
+    "awards", "honors", "honours", "activities", "volunteering", "courses",
+})
+
+_SECTION_HEADING = re.compile(
+    r"^(?:work |professional |technical |relevant |academic )?"
+    r"(experience|employment(?: history)?|education|skills|languages|projects|publications|"
+    r"references|certifications?|awards|honou?rs|interests|hobbies|summary|profile|objective|"
+    r"volunteer(?:ing)?|conferences|talks|courses|activities|contact)"
+    r"(?: (?:and|&) [a-z]+)?:?$"
+)
+_BULLET = re.compile(r"^[•●▪■◦‣∙·–—➢➔*>-]+\s*")
+_WHITESPACE = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u205f\u3000]+")
+# "Page 2", "Page 2 of 3", "2/3", "- 2 -" or a bare 1-3 digit number (never a year)
+_PAGE_NUMBER = re.compile(
+    r"^(?:page\s+\d+(?:\s*(?:/|of)\s*\d+)?|\d{1,3}\s*(?:/|of)\s*\d{1,3}|-\s*\d{1,3}\s*-|\d{1,3})$",
+    re.IGNORECASE,
+)
+_BOILERPLATE = re.compile(
+    r"^(?:references (?:are )?available (?:up)?on request\.?|curriculum vitae|resume|r[eé]sum[eé]|cv)$",
+    re.IGNORECASE,
+)
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimates the number of LLM tokens in `text` (about four characters per token)."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+def compaction_fingerprint(token_budget: Optional[int] = None) -> str:
+    """Identifies the compaction settings; part of the extraction cache key."""
+    return f"compaction-v{COMPACTION_VERSION}-{token_budget or COMPACTION_TOKEN_BUDGET}"
+
+def _normalize_line(line: str) -> str:
+    # NFKC folds ligatures and full-width forms (e.g. "ﬀ" -> "ff") into plain characters
+    line = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", line)).strip()
+    bullet = _BULLET.match(line)
+    if bullet:
+        rest = line[bullet.end():]
+        line = f"- {rest}" if rest else ""
+    return line
+
+def _line_key(line: str) -> str:
+    # Page numbers inside headers/footers differ from page to page
+    return re.sub(r"\d+", "#", line.lower())
+
+def _repeated_lines(pages: List[List[str]]) -> set:
+    """Finds header/footer lines: lines that start or end at least half of the pages."""
+    if len(pages) < 2:
+        return set()
+    counts: Dict[str, int] = {}
+    for lines in pages:
+        edges = set(lines[:3] + lines[-3:])
+        for line in edges:
+            key = _line_key(line)
+            counts[key] = counts.get(key, 0) + 1
+    threshold = max(2, math.ceil(len(pages) / 2))
+    return {key for key, count in counts.items() if count >= threshold}
+
+def _clean(raw_text: str) -> List[str]:
+    pages = [
+        [_normalize_line(line) for line in page.splitlines()]
+        for page in raw_text.split(PAGE_SEPARATOR)
+    ]
+    repeated = _repeated_lines([[line for line in page if line] for page in pages])
+
+    cleaned: List[str] = []
+    seen_repeated = set()
+    for page in pages:
+        for line in page:
+            if line and (_PAGE_NUMBER.match(line) or _BOILERPLATE.match(line)):
+                continue
+            if line and _line_key(line) in repeated:
+                # Keep the first occurrence: a running header is often the candidate's name.
+                key = _line_key(line)
+                if key in seen_repeated:
+                    continue
+                seen_repeated.add(key)
+            # Keep at most one blank line in a row
+            if not line and (not cleaned or not cleaned[-1]):
+                continue
+            cleaned.append(line)
+    while cleaned and not cleaned[-1]:
+        cleaned.pop()
+    return cleaned
+
+def _section_name(line: str) -> Optional[str]:
+    if not line or len(line) > 40:
+        return None
+    match = _SECTION_HEADING.match(line.lower())
+    return match.group(1) if match else None
+
+def _split_sections(lines: List[str]) -> List[Tuple[Optional[str], List[str]]]:
+    """Splits lines into (section name, lines) blocks; the preamble has no name."""
+    sections: List[Tuple[Optional[str], List[str]]] = [(None, [])]
+    for line in lines:
+        name = _section_name(line)
+        if name is not None:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+def _size(lines: List[str]) -> int:
+    return sum(len(line) + 1 for line in lines)
+
+def _truncate_sections(sections: List[Tuple[Optional[str], List[str]]], max_chars: int) -> List[Tuple[Optional[str], List[str]]]:
+    # 1. Drop sections the schema does not need, largest first.
+    total = sum(_size(body) for _, body in sections)
+    droppable = sorted(
+        (i for i, (name, _) in enumerate(sections) if name in LOW_PRIORITY_SECTIONS),
+        key=lambda i: -_size(sections[i][1]),
+    )
+    dropped = set()
+    for i in droppable:
+        if total <= max_chars:
+            break
+        dropped.add(i)
+        total -= _size(sections[i][1])
+    sections = [section for i, section in enumerate(sections) if i not in dropped]
+    if total <= max_chars:
+        return sections
+
+    # 2. Give every remaining section the same cap (small sections keep everything and
+    #    their unused share goes to the others), keeping the first lines of each section,
+    #    which is where the most recent experience usually is.
+    sizes = sorted(_size(body) for _, body in sections)
+    remaining, cap = max_chars, 0
+    for n_left, size in zip(range(len(sizes), 0, -1), sizes):
+        share = remaining // n_left
+        if size > share:
+            cap = share
+            break
+        remaining -= size
+    else:
+        cap = sizes[-1]
+
+    truncated = []
+    for name, body in sections:
+        kept, used = [], 0
+        for line in body:
+            if used + len(line) + 1 > cap:
+                break
+            kept.append(line)
+            used += len(line) + 1
+        if kept:
+            truncated.append((name, kept))
+    return truncated
+
+def compact_resume_text(raw_text: str, token_budget: Optional[int] = None) -> str:
+    """
+    Compacts raw resume text before it is sent to the extraction LLM.
+
+    Unicode and whitespace are normalized, bullet glyphs become "- ", page numbers, boilerplate and
+    headers/footers repeated across pages are removed, and blank lines are collapsed.
+    If the result is still over `token_budget`, sections the Resume schema does not
+    use (publications, references, ...) are dropped first, then every section is cut
+    to a fair share of the budget.
+
+    Args:
+        raw_text (str): Text from the ingestion agent; pages separated by PAGE_SEPARATOR.
+        token_budget (Optional[int]): Maximum estimated tokens. Defaults to COMPACTION_TOKEN_BUDGET.
+
+    Returns:
+        str: The compacted text.
+    """
+    if not raw_text:
+        return ""
+    token_budget = token_budget or COMPACTION_TOKEN_BUDGET
+    max_chars = token_budget * CHARS_PER_TOKEN
+
+    lines = _clean(raw_text)
+    if _size(lines) <= max_chars:
+        return "\n".join(lines)
+
+    sections = _truncate_sections(_split_sections(lines), max_chars)
+    text = "\n".join(line for _, body in sections for line in body)
+    return text[:max_chars]
@@ -1,29 +1,133 @@
+import os
 import sqlite3
 import json
 import logging
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 DB_PATH = "cv_scout.db"
 
+# Upper bound on cached extraction results; least recently used entries are evicted first.
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "5000"))
+
+# Relevancy results older than this are treated as stale; least recently used entries
+# beyond the size bound are evicted first.
+RELEVANCY_CACHE_TTL_SECONDS = int(os.getenv("RELEVANCY_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+RELEVANCY_CACHE_MAX_ENTRIES = int(os.getenv("RELEVANCY_CACHE_MAX_ENTRIES", "50000"))
+
+# A cache hit is a plain read. Its last_accessed_at (used for LRU eviction) is only
+# refreshed once it is older than this, together with the hits counted since, so cache
+# lookups do not compete with the candidate writer for the write lock.
+CACHE_TOUCH_INTERVAL_SECONDS = float(os.getenv("CACHE_TOUCH_INTERVAL_SECONDS", "3600"))
+
+# Process-local hit/miss counters for the result caches
+_cache_stats = {
+    "extraction": {"hits": 0, "misses": 0},
+    "relevancy": {"hits": 0, "misses": 0},
+}
+# Hits per cache key not yet added to the table's hit_count
+_pending_cache_hits: Dict[str, Dict[str, int]] = {"extraction": {}, "relevancy": {}}
+_cache_stats_lock = threading.Lock()
+
+# Pragmas applied to every connection. WAL lets readers proceed while a writer commits,
+# synchronous=NORMAL is durable under WAL except on power loss, and busy_timeout makes
+# concurrent writers wait for the lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,          # negative value = KiB, i.e. ~64 MB page cache
+    "busy_timeout": 30000,         # milliseconds
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Number of compiled statements each connection keeps for reuse
+SQLITE_STATEMENT_CACHE_SIZE = 256
+
+# One long-lived connection per thread; see get_connection()
+_local = threading.local()
+
+# Databases whose schema has been created/verified by this process
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
 def create_connection():
-    """Create a database connection to the SQLite database."""
-    conn = None
+    """Create a new, tuned database connection to the SQLite database."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        logger.info(f"--- DATABASE: Successful connection to SQLite DB at {DB_PATH} ---")
+        conn = sqlite3.connect(
+            DB_PATH,
+            timeout=SQLITE_PRAGMAS["busy_timeout"] / 1000,
+            cached_statements=SQLITE_STATEMENT_CACHE_SIZE,
+        )
+        for pragma, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        logger.debug(f"--- DATABASE: Opened connection to SQLite DB at {DB_PATH} ---")
     except sqlite3.Error as e:
         logger.error(f"--- DATABASE: Error connecting to SQLite DB: {e} ---")
         raise
     return conn
 
+def get_connection():
+    """
+    Return this thread's shared connection, opening it on first use.
+
+    Connections are reused across calls (together with their prepared statement cache)
+    instead of being opened and closed per query. Callers must not close it; use
+    close_connection() to release it explicitly.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DB_PATH:
+        return conn
+    if conn is not None:
+        # DB_PATH was changed (e.g. by a benchmark); drop the stale connection
+        conn.close()
+    _local.conn = create_connection()
+    _local.path = DB_PATH
+    if DB_PATH not in _initialized_paths:
+        # First connection to this database in the process: make sure the schema exists
+        _create_schema(_local.conn, DB_PATH)
+    return _local.conn
+
+def close_connection():
+    """Close this thread's shared connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+def init_db(path: Optional[str] = None) -> str:
+    """
+    Initializes the database explicitly: selects it and creates or migrates the tables.
+
+    Nothing is created when this module is imported. Entry points call init_db() at
+    startup; if one does not, the schema is still verified on the first connection to
+    each database.
+
+    Args:
+        path (Optional[str]): Database file to use instead of DB_PATH.
+
+    Returns:
+        str: The database path in use.
+    """
+    global DB_PATH
+    if path is not None:
+        DB_PATH = path
+    create_tables()
+    return DB_PATH
+
 def create_tables():
     """Create the necessary tables if they don't exist."""
-    conn = create_connection()
-    if not conn:
-        return
+    _create_schema(get_connection(), DB_PATH)
+
+def _create_schema(conn: sqlite3.Connection, path: str):
+    with _init_lock:
+        if path in _initialized_paths:
+            return
+        _initialized_paths.add(path)
 
     # Use a set of queries to ensure tables are created correctly
     create_table_queries = [
@@ -41,10 +145,23 @@ def create_tables():
             email TEXT UNIQUE,
             phone_number TEXT,
             full_report_json TEXT,
+            total_experience_years REAL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """,
         """
+        CREATE TABLE IF NOT EXISTS candidate_skills (
+            candidate_id INTEGER NOT NULL,
+            skill TEXT NOT NULL COLLATE NOCASE,
+            PRIMARY KEY (candidate_id, skill),
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        ) WITHOUT ROWID;
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_candidate_skills_skill
+        ON candidate_skills (skill, candidate_id);
+        """,
+        """
         CREATE TABLE IF NOT EXISTS applications (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             job_id INTEGER NOT NULL,
@@ -57,93 +174,291 @@ def create_tables():
             FOREIGN KEY (candidate_id) REFERENCES candidates (id),
             UNIQUE(job_id, candidate_id)
         );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_applications_job_score
+        ON applications (job_id, match_score DESC, candidate_id DESC);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS extraction_cache (
+            cache_key TEXT PRIMARY KEY,
+            resume_json TEXT NOT NULL,
+            hit_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_accessed_at REAL NOT NULL
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_extraction_cache_last_accessed
+        ON extraction_cache (last_accessed_at);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS relevancy_cache (
+            cache_key TEXT PRIMARY KEY,
+            match_score INTEGER,
+            match_summary TEXT,
+            hit_count INTEGER DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_accessed_at REAL NOT NULL
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_relevancy_cache_last_accessed
+        ON relevancy_cache (last_accessed_at);
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_relevancy_cache_created
+        ON relevancy_cache (created_at);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS node_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            workflow TEXT NOT NULL,
+            node TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            wall_ms REAL NOT NULL,
+            llm_ms REAL NOT NULL,
+            queue_ms REAL NOT NULL,
+            retries INTEGER NOT NULL,
+            input_chars INTEGER,
+            output_chars INTEGER,
+            error TEXT
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_node_metrics_started
+        ON node_metrics (started_at);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL,
+            file_path TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            available_at REAL NOT NULL,
+            worker_id TEXT,
+            lease_expires_at REAL,
+            heartbeat_at REAL,
+            candidate_id INTEGER,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            UNIQUE (job_id, file_path),
+            FOREIGN KEY (job_id) REFERENCES jobs (id)
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_tasks_status
+        ON tasks (status, available_at);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS resume_signatures (
+            candidate_id INTEGER PRIMARY KEY,
+            email TEXT,
+            phone TEXT,
+            minhash BLOB NOT NULL,
+            updated_at REAL NOT NULL,
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        );
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_resume_signatures_email
+        ON resume_signatures (email);
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_resume_signatures_phone
+        ON resume_signatures (phone);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS resume_lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, candidate_id)
+        ) WITHOUT ROWID;
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_resume_lsh_buckets_candidate
+        ON resume_lsh_buckets (candidate_id);
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS email_templates (
+            cache_key TEXT PRIMARY KEY,
+            job_title TEXT,
+            disposition TEXT,
+            tone TEXT,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
         """
     ]
     
+    # Columns added after the first release; CREATE TABLE IF NOT EXISTS does not add them
+    # to an existing database.
+    added_columns = [
+        ("candidates", "total_experience_years", "REAL"),
+        ("applications", "prescreen_score", "REAL"),
+    ]
+
     try:
-        cursor = conn.cursor()
-        for query in create_table_queries:
-            cursor.execute(query)
-        conn.commit()
+        with conn:
+            for query in create_table_queries:
+                conn.execute(query)
+            for table, column, column_type in added_columns:
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                    logger.info(f"--- DATABASE: Added column {table}.{column} ---")
         logger.info("--- DATABASE: Tables verified/created successfully. ---")
     except sqlite3.Error as e:
         logger.error(f"--- DATABASE: Error creating tables: {e} ---")
-    finally:
-        if conn:
-            conn.close()
 
 def add_job(description: str) -> int:
     """Add a new job description to the database and return its ID."""
-    conn = create_connection()
+    conn = get_connection()
     sql = ''' INSERT INTO jobs(description)
               VALUES(?) '''
-    cursor = conn.cursor()
-    cursor.execute(sql, (description,))
-    conn.commit()
+    with conn:
+        cursor = conn.execute(sql, (description,))
     job_id = cursor.lastrowid
-    conn.close()
     logger.info(f"--- DATABASE: Added new job with ID: {job_id} ---")
     return job_id
 
+# Upserts keyed on the UNIQUE constraints, so concurrent writers can never create
+# duplicate candidates or race between a SELECT and the following INSERT.
+UPSERT_CANDIDATE_SQL = ''' INSERT INTO candidates(full_name, email, phone_number, full_report_json, total_experience_years)
+                           VALUES(?,?,?,?,?)
+                           ON CONFLICT(email) DO UPDATE SET
+                               full_name = excluded.full_name,
+                               phone_number = excluded.phone_number,
+                               full_report_json = excluded.full_report_json,
+                               total_experience_years = excluded.total_experience_years '''
+
+UPSERT_APPLICATION_SQL = ''' INSERT INTO applications(job_id, candidate_id, match_score, match_summary, prescreen_score)
+                             VALUES(?,?,?,?,?)
+                             ON CONFLICT(job_id, candidate_id) DO UPDATE SET
+                                 match_score = excluded.match_score,
+                                 match_summary = excluded.match_summary,
+                                 prescreen_score = excluded.prescreen_score '''
+
+def _candidate_row(report: Dict[str, Any]):
+    return (
+        report.get("full_name"),
+        report.get("mail"),
+        report.get("phone_number"),
+        json.dumps(report),
+        report.get("total_experience_years"),
+    )
+
+def _replace_candidate_skills(cursor: sqlite3.Cursor, reports_by_id: Dict[int, Dict[str, Any]]):
+    """Rewrites the candidate_skills rows of the given candidates from their reports."""
+    ids = list(reports_by_id)
+    for chunk_start in range(0, len(ids), 500):
+        chunk = ids[chunk_start:chunk_start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(f"DELETE FROM candidate_skills WHERE candidate_id IN ({placeholders})", chunk)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO candidate_skills(candidate_id, skill) VALUES(?,?)",
+        [
+            (candidate_id, skill)
+            for candidate_id, report in reports_by_id.items()
+            for skill in report.get("technical_skills") or []
+            if skill
+        ]
+    )
+
 def add_or_update_candidate(report: Dict[str, Any]) -> int:
     """
     Add a new candidate or update existing one based on email.
     Returns the candidate's ID.
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    email = report.get("mail")
-    full_name = report.get("full_name")
-    phone_number = report.get("phone_number")
-    full_report_json = json.dumps(report)
-
-    # Check if candidate exists
-    cursor.execute("SELECT id FROM candidates WHERE email = ?", (email,))
-    data = cursor.fetchone()
-    
-    if data:
-        # Update existing candidate
-        candidate_id = data[0]
-        sql = ''' UPDATE candidates
-                  SET full_name = ?, phone_number = ?, full_report_json = ?
-                  WHERE id = ? '''
-        cursor.execute(sql, (full_name, phone_number, full_report_json, candidate_id))
-        logger.info(f"--- DATABASE: Updated existing candidate with ID: {candidate_id} ---")
-    else:
-        # Insert new candidate
-        sql = ''' INSERT INTO candidates(full_name, email, phone_number, full_report_json)
-                  VALUES(?,?,?,?) '''
-        cursor.execute(sql, (full_name, email, phone_number, full_report_json))
-        candidate_id = cursor.lastrowid
-        logger.info(f"--- DATABASE: Added new candidate with ID: {candidate_id} ---")
-        
-    conn.commit()
-    conn.close()
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        candidate_id = cursor.execute(UPSERT_CANDIDATE_SQL + " RETURNING id", _candidate_row(report)).fetchone()[0]
+        _replace_candidate_skills(cursor, {candidate_id: report})
+    logger.info(f"--- DATABASE: Upserted candidate with ID: {candidate_id} ---")
     return candidate_id
 
 def add_application(job_id: int, candidate_id: int, score: int, summary: str):
-    """Link a candidate to a job by creating an application record."""
-    conn = create_connection()
-    sql = ''' INSERT OR REPLACE INTO applications(job_id, candidate_id, match_score, match_summary)
-              VALUES(?,?,?,?) '''
-    cursor = conn.cursor()
+    """Link a candidate to a job by creating or updating an application record."""
+    conn = get_connection()
     try:
-        cursor.execute(sql, (job_id, candidate_id, score, summary))
-        conn.commit()
+        with conn:
+            conn.execute(UPSERT_APPLICATION_SQL, (job_id, candidate_id, score, summary, None))
         logger.info(f"--- DATABASE: Linked candidate {candidate_id} to job {job_id} with score {score} ---")
     except sqlite3.Error as e:
         logger.error(f"--- DATABASE: Error adding application: {e} ---")
-    finally:
-        conn.close()
 
-# Initialize the database and tables when this module is first imported
-create_tables()
+def save_applications_batch(items: List[Dict[str, Any]]) -> List[int]:
+    """
+    Upsert candidates and their applications for many results in a single transaction.
+
+    Each item holds 'job_id', 'match_score', 'match_summary', an optional
+    'prescreen_score', and either a 'report' (the standardized resume, upserted by
+    email) or an existing 'candidate_id'. An optional 'task_id' marks that queue task
+    as done in the same transaction, and an optional 'signature' (see
+    `dedup.index_entry`) is saved to the duplicate index.
+    Returns the candidate ID for each item, in order.
+    """
+    conn = get_connection()
+    candidate_ids: List[Optional[int]] = [item.get("candidate_id") for item in items]
+
+    with conn:
+        cursor = conn.cursor()
+        pending = [i for i, item in enumerate(items) if candidate_ids[i] is None]
+
+        # Candidates with an email are upserted in one executemany and resolved by email.
+        # NULL emails never conflict, so those rows are inserted one by one.
+        with_email = [i for i in pending if items[i]["report"].get("mail") is not None]
+        without_email = [i for i in pending if items[i]["report"].get("mail") is None]
+
+        if with_email:
+            cursor.executemany(UPSERT_CANDIDATE_SQL, [_candidate_row(items[i]["report"]) for i in with_email])
+            emails = list({items[i]["report"]["mail"] for i in with_email})
+            id_by_email = {}
+            for chunk_start in range(0, len(emails), 500):
+                chunk = emails[chunk_start:chunk_start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT email, id FROM candidates WHERE email IN ({placeholders})", chunk)
+                id_by_email.update(cursor.fetchall())
+            for i in with_email:
+                candidate_ids[i] = id_by_email[items[i]["report"]["mail"]]
+
+        for i in without_email:
+            cursor.execute(UPSERT_CANDIDATE_SQL, _candidate_row(items[i]["report"]))
+            candidate_ids[i] = cursor.lastrowid
+
+        _replace_candidate_skills(cursor, {candidate_ids[i]: items[i]["report"] for i in pending})
+
+        cursor.executemany(
+            UPSERT_APPLICATION_SQL,
+            [
+                (item["job_id"], candidate_ids[i], item.get("match_score"), item.get("match_summary"), item.get("prescreen_score"))
+                for i, item in enumerate(items)
+            ]
+        )
+
+        # Queue tasks are completed in the same transaction as their application, so a
+        # crash can never leave a saved result whose task would be processed again.
+        _complete_tasks(cursor, [
+            (candidate_ids[i], item["task_id"]) for i, item in enumerate(items) if item.get("task_id") is not None
+        ])
+        _save_resume_signatures(cursor, [
+            (candidate_ids[i], item["signature"]) for i, item in enumerate(items) if item.get("signature")
+        ])
+
+    logger.info(f"--- DATABASE: Saved batch of {len(items)} application(s) in one transaction ---")
+    return candidate_ids
+
 
 
 def get_all_jobs():
     """Retrieves all jobs from the database."""
-    conn = create_connection()
+    conn = get_connection()
     try:
         # The query selects the description and the id, creating a user-friendly string
         query = "SELECT description || ' (ID: ' || id || ')' as job_display, id FROM jobs ORDER BY created_at DESC"
@@ -154,15 +469,50 @@ def get_all_jobs():
     except sqlite3.Error as e:
         logger.error(f"--- DATABASE: Error retrieving jobs: {e} ---")
         return []
-    finally:
-        if conn:
-            conn.close()
+
+def get_job_description(job_id: int) -> Optional[str]:
+    """Retrieves the description of a job, or None if the job does not exist."""
+    row = get_connection().execute("SELECT description FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return row[0] if row else None
+
+# An application the LLM has scored. Older databases stored the pre-screen score of a
+# pre-screened out resume as its match score; those rows are recognized by their summary.
+_LLM_SCORED_CONDITION = """a.match_score IS NOT NULL
+    AND (a.match_summary IS NULL OR a.match_summary NOT LIKE 'Pre-screened out%')"""
+# An application whose outcome is known: scored by the LLM or pre-screened out.
+_DECIDED_CONDITION = "(a.match_score IS NOT NULL OR a.prescreen_score IS NOT NULL)"
+
+def get_scored_candidate_ids(job_id: int) -> set:
+    """
+    Retrieves the IDs of candidates the LLM has already scored for a job.
+
+    Pre-screened out candidates are not included, so they can still be sent to the LLM.
+    """
+    rows = get_connection().execute(
+        f"SELECT a.candidate_id FROM applications a WHERE a.job_id = ? AND {_LLM_SCORED_CONDITION}",
+        (job_id,),
+    ).fetchall()
+    return {candidate_id for (candidate_id,) in rows}
+
+def count_decided_candidates(job_id: int) -> Tuple[int, int]:
+    """
+    Counts the candidates whose outcome for a job is already known.
+
+    Returns:
+        tuple: (scored by the LLM, pre-screened out).
+    """
+    scored, decided = get_connection().execute(
+        f"""SELECT COALESCE(SUM({_LLM_SCORED_CONDITION}), 0), COUNT(*)
+            FROM applications a WHERE a.job_id = ? AND {_DECIDED_CONDITION}""",
+        (job_id,),
+    ).fetchone()
+    return scored, decided - scored
 
 def get_ranked_candidates_for_job(job_id: int):
     """
     Retrieves and ranks candidates for a specific job ID from the database.
     """
-    conn = create_connection()
+    conn = get_connection()
     query = """
         SELECT
             c.full_name,
@@ -187,6 +537,631 @@ def get_ranked_candidates_for_job(job_id: int):
         # Return an empty DataFrame on error
         import pandas as pd
         return pd.DataFrame()
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+
+# Keyset cursor for ranking pages: the (match_score, candidate_id) of the last row returned
+RankingCursor = Tuple[Optional[int], int]
+
+def get_ranked_candidates_page(
+    job_id: int,
+    page_size: int = 50,
+    cursor: Optional[RankingCursor] = None,
+    min_score: Optional[int] = None,
+    status: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[RankingCursor]]:
+    """
+    Retrieves one page of ranked candidates for a job using keyset pagination.
+
+    Rows are ordered by score (highest first, unscored last) and candidate ID, which
+    matches idx_applications_job_score, so each page is a single index range seek no
+    matter how deep into the ranking it is.
+    Returns the page rows and the cursor for the next page (None on the last page).
+    """
+    filters = []
+    filter_params: List[Any] = []
+    if min_score is not None:
+        filters.append("a.match_score >= ?")
+        filter_params.append(min_score)
+    if status:
+        filters.append("a.status = ?")
+        filter_params.append(status)
+
+    limit = page_size + 1
+    if cursor is None:
+        rows = _select_ranked_rows(job_id, None, [], filters, filter_params, limit)
+    elif cursor[0] is None:
+        rows = _select_ranked_rows(job_id, "a.match_score IS NULL AND a.candidate_id < ?", [cursor[1]], filters, filter_params, limit)
+    else:
+        # Row-value comparison lets SQLite seek straight to the cursor position in the index.
+        rows = _select_ranked_rows(job_id, "(a.match_score, a.candidate_id) < (?, ?)", list(cursor), filters, filter_params, limit)
+        if len(rows) < limit and min_score is None:
+            # Unscored applications sort after every scored one
+            rows += _select_ranked_rows(job_id, "a.match_score IS NULL", [], filters, filter_params, limit - len(rows))
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]["match_score"], rows[-1]["candidate_id"])
+    logger.info(f"--- DATABASE: Retrieved page of {len(rows)} candidates for job ID {job_id}. ---")
+    return rows, next_cursor
+
+def _select_ranked_rows(job_id, keyset_condition, keyset_params, filters, filter_params, limit) -> List[Dict[str, Any]]:
+    conditions = ["a.job_id = ?"] + ([keyset_condition] if keyset_condition else []) + filters
+    query = f"""
+        SELECT
+            c.full_name,
+            c.email,
+            a.match_score,
+            a.prescreen_score,
+            a.match_summary,
+            a.status,
+            a.candidate_id
+        FROM applications a
+        JOIN candidates c ON a.candidate_id = c.id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY a.match_score DESC, a.candidate_id DESC
+        LIMIT ?
+    """
+    result = get_connection().execute(query, [job_id, *keyset_params, *filter_params, limit])
+    columns = [column[0] for column in result.description]
+    return [dict(zip(columns, row)) for row in result.fetchall()]
+
+def count_applications_for_job(job_id: int, min_score: Optional[int] = None, status: Optional[str] = None) -> int:
+    """Counts applications for a job, with the same optional filters as get_ranked_candidates_page()."""
+    query = "SELECT COUNT(*) FROM applications WHERE job_id = ?"
+    params: List[Any] = [job_id]
+    if min_score is not None:
+        query += " AND match_score >= ?"
+        params.append(min_score)
+    if status:
+        query += " AND status = ?"
+        params.append(status)
+    return get_connection().execute(query, params).fetchone()[0]
+
+def get_applicant_contacts_for_job(job_id: int) -> List[Dict[str, Any]]:
+    """Retrieves the name and email of every applicant for a job, in ranking order."""
+    query = """
+        SELECT c.full_name, c.email, a.candidate_id
+        FROM applications a
+        JOIN candidates c ON a.candidate_id = c.id
+        WHERE a.job_id = ?
+        ORDER BY a.match_score DESC, a.candidate_id DESC
+    """
+    rows = get_connection().execute(query, (job_id,)).fetchall()
+    return [{"full_name": name, "email": email, "candidate_id": candidate_id} for name, email, candidate_id in rows]
+
+def iter_candidate_reports(
+    batch_size: int = 500,
+    undecided_for_job: Optional[int] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yields (candidate_id, report) for every stored candidate, reading `batch_size` rows at a time.
+
+    With `undecided_for_job`, candidates already scored or pre-screened out for that job
+    are left out. Each batch is read on the calling thread's connection, so the iterator
+    may be advanced from different threads (one at a time).
+    """
+    query = "SELECT id, full_report_json FROM candidates WHERE id > ?"
+    params: List[Any] = []
+    if undecided_for_job is not None:
+        query += f""" AND NOT EXISTS (
+                          SELECT 1 FROM applications a
+                          WHERE a.job_id = ? AND a.candidate_id = candidates.id AND {_DECIDED_CONDITION})"""
+        params.append(undecided_for_job)
+    query += " ORDER BY id LIMIT ?"
+    last_id = 0
+    while True:
+        rows = get_connection().execute(query, [last_id, *params, batch_size]).fetchall()
+        if not rows:
+            return
+        for candidate_id, report_json in rows:
+            if report_json:
+                yield candidate_id, json.loads(report_json)
+        last_id = rows[-1][0]
+
+def get_candidate_reports(candidate_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Loads the stored standardized reports of the given candidates, keyed by id."""
+    conn = get_connection()
+    reports = {}
+    for chunk_start in range(0, len(candidate_ids), 500):
+        chunk = list(candidate_ids[chunk_start:chunk_start + 500])
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT id, full_report_json FROM candidates WHERE id IN ({placeholders})", chunk
+        ).fetchall()
+        for candidate_id, report_json in rows:
+            if report_json:
+                reports[candidate_id] = json.loads(report_json)
+    return reports
+
+def find_candidate_ids(skills: Optional[List[str]] = None, min_years: Optional[float] = None) -> List[int]:
+    """
+    Finds candidates by canonical skill and experience, without loading their reports.
+
+    Args:
+        skills (Optional[List[str]]): Canonical skill names (see `standardization`); a
+                                      candidate must have all of them. Case-insensitive.
+        min_years (Optional[float]): Minimum total years of experience.
+
+    Returns:
+        List[int]: Matching candidate IDs, in ascending order.
+    """
+    conditions, params = [], []
+    for skill in dict.fromkeys(skills or []):
+        conditions.append("id IN (SELECT candidate_id FROM candidate_skills WHERE skill = ?)")
+        params.append(skill)
+    if min_years is not None:
+        conditions.append("total_experience_years >= ?")
+        params.append(min_years)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = get_connection().execute(f"SELECT id FROM candidates {where} ORDER BY id", params).fetchall()
+    return [row[0] for row in rows]
+
+def count_candidates() -> int:
+    """Returns the number of stored candidates."""
+    return get_connection().execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+def get_candidates_by_ids(candidate_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Retrieves the id, name, email and phone number of the given candidates, keyed by id."""
+    conn = get_connection()
+    candidates = {}
+    for chunk_start in range(0, len(candidate_ids), 500):
+        chunk = list(candidate_ids[chunk_start:chunk_start + 500])
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT id, full_name, email, phone_number FROM candidates WHERE id IN ({placeholders})", chunk
+        ).fetchall()
+        for candidate_id, full_name, email, phone_number in rows:
+            candidates[candidate_id] = {
+                "candidate_id": candidate_id,
+                "full_name": full_name,
+                "email": email,
+                "phone_number": phone_number,
+            }
+    return candidates
+
+
+# --- Extraction Cache ---
+
+def _record_cache_lookup(cache_name: str, hit: bool):
+    with _cache_stats_lock:
+        _cache_stats[cache_name]["hits" if hit else "misses"] += 1
+
+def _record_cache_hit(table: str, cache_name: str, cache_key: str, last_accessed_at: float):
+    """Counts a hit in memory and writes it out with a refreshed `last_accessed_at` once that is stale."""
+    now = time.time()
+    with _cache_stats_lock:
+        _cache_stats[cache_name]["hits"] += 1
+        pending = _pending_cache_hits[cache_name]
+        pending[cache_key] = pending.get(cache_key, 0) + 1
+        if now - last_accessed_at < CACHE_TOUCH_INTERVAL_SECONDS:
+            return
+        hits = pending.pop(cache_key)
+
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            f"UPDATE {table} SET hit_count = hit_count + ?, last_accessed_at = ? WHERE cache_key = ?",
+            (hits, now, cache_key)
+        )
+
+def _pending_hit_count(cache_name: str) -> int:
+    with _cache_stats_lock:
+        return sum(_pending_cache_hits[cache_name].values())
+
+def _cache_counters(cache_name: str) -> Dict[str, Any]:
+    with _cache_stats_lock:
+        hits = _cache_stats[cache_name]["hits"]
+        misses = _cache_stats[cache_name]["misses"]
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
+
+def get_cached_extraction(cache_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached extraction result by its content-addressed key.
+    Returns the cached resume data as a dict, or None on a miss.
+    """
+    data = get_connection().execute(
+        "SELECT resume_json, last_accessed_at FROM extraction_cache WHERE cache_key = ?", (cache_key,)
+    ).fetchone()
+    if not data:
+        _record_cache_lookup("extraction", hit=False)
+        logger.info("--- DATABASE: Extraction cache miss ---")
+        return None
+
+    _record_cache_hit("extraction_cache", "extraction", cache_key, data[1])
+    logger.info("--- DATABASE: Extraction cache hit ---")
+    return json.loads(data[0])
+
+def save_extraction_to_cache(cache_key: str, resume_data: Dict[str, Any], max_entries: Optional[int] = None):
+    """
+    Store an extraction result in the cache and evict the least recently used
+    entries once the cache grows beyond `max_entries`.
+    """
+    if max_entries is None:
+        max_entries = EXTRACTION_CACHE_MAX_ENTRIES
+
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """ INSERT OR REPLACE INTO extraction_cache(cache_key, resume_json, last_accessed_at)
+                VALUES(?,?,?) """,
+            (cache_key, json.dumps(resume_data), time.time())
+        )
+        cursor.execute(
+            """ DELETE FROM extraction_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM extraction_cache
+                    ORDER BY last_accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                ) """,
+            (max_entries,)
+        )
+        if cursor.rowcount > 0:
+            logger.info(f"--- DATABASE: Evicted {cursor.rowcount} entries from the extraction cache ---")
+
+def get_extraction_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for this process along with the current cache size."""
+    entries, total_hits = get_connection().execute(
+        "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM extraction_cache"
+    ).fetchone()
+
+    return {
+        **_cache_counters("extraction"),
+        "entries": entries,
+        "lifetime_hits": total_hits + _pending_hit_count("extraction"),
+        "max_entries": EXTRACTION_CACHE_MAX_ENTRIES,
+    }
+
+
+# --- Relevancy Cache ---
+
+def get_cached_relevancy(cache_key: str, ttl_seconds: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached relevancy analysis. Entries older than `ttl_seconds` are ignored.
+    Returns a dict with 'match_score' and 'match_summary', or None on a miss.
+    """
+    if ttl_seconds is None:
+        ttl_seconds = RELEVANCY_CACHE_TTL_SECONDS
+
+    data = get_connection().execute(
+        """SELECT match_score, match_summary, last_accessed_at FROM relevancy_cache
+           WHERE cache_key = ? AND created_at >= ?""",
+        (cache_key, time.time() - ttl_seconds)
+    ).fetchone()
+    if not data:
+        _record_cache_lookup("relevancy", hit=False)
+        logger.info("--- DATABASE: Relevancy cache miss ---")
+        return None
+
+    _record_cache_hit("relevancy_cache", "relevancy", cache_key, data[2])
+    logger.info("--- DATABASE: Relevancy cache hit ---")
+    return {"match_score": data[0], "match_summary": data[1]}
+
+def save_relevancy_to_cache(
+    cache_key: str,
+    score: int,
+    summary: str,
+    ttl_seconds: Optional[int] = None,
+    max_entries: Optional[int] = None,
+):
+    """
+    Store a relevancy analysis in the cache, dropping expired entries and evicting the
+    least recently used ones once the cache grows beyond `max_entries`.
+    """
+    if ttl_seconds is None:
+        ttl_seconds = RELEVANCY_CACHE_TTL_SECONDS
+    if max_entries is None:
+        max_entries = RELEVANCY_CACHE_MAX_ENTRIES
+
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """ INSERT OR REPLACE INTO relevancy_cache(cache_key, match_score, match_summary, created_at, last_accessed_at)
+                VALUES(?,?,?,?,?) """,
+            (cache_key, score, summary, now, now)
+        )
+        cursor.execute("DELETE FROM relevancy_cache WHERE created_at < ?", (now - ttl_seconds,))
+        evicted = cursor.rowcount
+        cursor.execute(
+            """ DELETE FROM relevancy_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM relevancy_cache
+                    ORDER BY last_accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                ) """,
+            (max_entries,)
+        )
+        evicted += cursor.rowcount
+        if evicted > 0:
+            logger.info(f"--- DATABASE: Evicted {evicted} entries from the relevancy cache ---")
+
+
+def get_relevancy_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for this process along with the current cache size."""
+    entries, total_hits = get_connection().execute(
+        "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM relevancy_cache"
+    ).fetchone()
+
+    return {
+        **_cache_counters("relevancy"),
+        "entries": entries,
+        "lifetime_hits": total_hits + _pending_hit_count("relevancy"),
+        "max_entries": RELEVANCY_CACHE_MAX_ENTRIES,
+        "ttl_seconds": RELEVANCY_CACHE_TTL_SECONDS,
+    }
+
+
+# --- Email Templates ---
+
+def get_email_template(cache_key: str) -> Optional[Dict[str, str]]:
+    """Look up a generated email template. Returns a dict with 'subject' and 'body', or None."""
+    data = get_connection().execute(
+        "SELECT subject, body FROM email_templates WHERE cache_key = ?", (cache_key,)
+    ).fetchone()
+    if not data:
+        return None
+    logger.info("--- DATABASE: Email template loaded from cache ---")
+    return {"subject": data[0], "body": data[1]}
+
+def save_email_template(cache_key: str, job_title: str, disposition: str, tone: str, subject: str, body: str):
+    """Store a generated email template for reuse across runs."""
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            """ INSERT OR REPLACE INTO email_templates(cache_key, job_title, disposition, tone, subject, body)
+                VALUES(?,?,?,?,?,?) """,
+            (cache_key, job_title, disposition, tone, subject, body)
+        )
+    logger.info(f"--- DATABASE: Saved {disposition} email template for '{job_title}' ---")
+
+
+# --- Task Queue ---
+# Durable work queue of resumes to process, shared by all worker processes (src.worker).
+# A task is 'queued' until a worker claims it, 'running' while the worker holds its lease,
+# then 'done' (completed with its application, see save_applications_batch) or 'failed'
+# once it has run out of attempts. Leases that expire, e.g. because the worker process
+# died, are put back in the queue by requeue_expired_tasks().
+
+def enqueue_tasks(job_id: int, file_paths: Iterable[str], max_attempts: int = 3) -> List[int]:
+    """
+    Adds a task per file for `job_id`. A file already queued for the job is not added again.
+
+    Returns:
+        list: The task ID for each file, in order (existing tasks included).
+    """
+    now = time.time()
+    file_paths = list(file_paths)
+    conn = get_connection()
+    with conn:
+        conn.executemany(
+            """INSERT INTO tasks(job_id, file_path, max_attempts, available_at, created_at, updated_at)
+               VALUES(?,?,?,?,?,?)
+               ON CONFLICT(job_id, file_path) DO NOTHING""",
+            [(job_id, path, max_attempts, now, now, now) for path in file_paths]
+        )
+        id_by_path = {}
+        for chunk_start in range(0, len(file_paths), 500):
+            chunk = file_paths[chunk_start:chunk_start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            id_by_path.update(conn.execute(
+                f"SELECT file_path, id FROM tasks WHERE job_id = ? AND file_path IN ({placeholders})",
+                [job_id, *chunk]
+            ).fetchall())
+    logger.info(f"--- DATABASE: Enqueued {len(file_paths)} task(s) for job {job_id} ---")
+    return [id_by_path[path] for path in file_paths]
+
+def claim_tasks(worker_id: str, limit: int, lease_seconds: float, task_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Atomically leases up to `limit` queued tasks to `worker_id`, oldest first.
+
+    Args:
+        worker_id (str): The claiming worker.
+        limit (int): Maximum number of tasks to claim.
+        lease_seconds (float): How long the worker owns the tasks without a heartbeat.
+        task_ids (Optional[list]): Only claim among these tasks.
+
+    Returns:
+        list: Dicts with 'id', 'job_id', 'file_path' and 'attempts' (including this one).
+    """
+    now = time.time()
+    id_filter, params = "", []
+    if task_ids is not None:
+        if not task_ids:
+            return []
+        id_filter = f"AND id IN ({','.join('?' * len(task_ids))})"
+        params = list(task_ids)
+    conn = get_connection()
+    with conn:
+        rows = conn.execute(
+            f"""UPDATE tasks
+                SET status = 'running', worker_id = ?, attempts = attempts + 1,
+                    lease_expires_at = ?, heartbeat_at = ?, updated_at = ?
+                WHERE id IN (
+                    SELECT id FROM tasks
+                    WHERE status = 'queued' AND available_at <= ? {id_filter}
+                    ORDER BY available_at, id
+                    LIMIT ?
+                )
+                RETURNING id, job_id, file_path, attempts""",
+            [worker_id, now + lease_seconds, now, now, now, *params, limit]
+        ).fetchall()
+    return [dict(zip(("id", "job_id", "file_path", "attempts"), row)) for row in sorted(rows)]
+
+def heartbeat_tasks(worker_id: str, lease_seconds: float) -> int:
+    """Extends the lease of every task `worker_id` is running. Returns the number of tasks."""
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute(
+            """UPDATE tasks SET lease_expires_at = ?, heartbeat_at = ?
+               WHERE worker_id = ? AND status = 'running'""",
+            (now + lease_seconds, now, worker_id)
+        )
+    return cursor.rowcount
+
+def requeue_expired_tasks() -> Tuple[int, int]:
+    """
+    Puts running tasks whose lease has expired back in the queue, or fails them if they
+    have used all their attempts.
+
+    Returns:
+        tuple: (requeued, failed) task counts.
+    """
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        requeued = conn.execute(
+            """UPDATE tasks SET status = 'queued', worker_id = NULL, available_at = ?, updated_at = ?,
+                                last_error = 'Lease expired'
+               WHERE status = 'running' AND lease_expires_at < ? AND attempts < max_attempts""",
+            (now, now, now)
+        ).rowcount
+        failed = conn.execute(
+            """UPDATE tasks SET status = 'failed', updated_at = ?,
+                                last_error = 'Lease expired on the last attempt'
+               WHERE status = 'running' AND lease_expires_at < ? AND attempts >= max_attempts""",
+            (now, now)
+        ).rowcount
+    if requeued or failed:
+        logger.warning(f"--- DATABASE: Expired task leases: {requeued} requeued, {failed} failed ---")
+    return requeued, failed
+
+def fail_task(task_id: int, worker_id: str, error: str, retry_delay: Optional[float] = None) -> str:
+    """
+    Records a failed attempt of a task held by `worker_id`.
+
+    Args:
+        task_id (int): The task.
+        worker_id (str): The worker holding it; a task leased to another worker is left alone.
+        error (str): The error message.
+        retry_delay (Optional[float]): Requeue the task after this many seconds if it has
+                                       attempts left. None fails it for good.
+
+    Returns:
+        str: The task's new status ('queued' or 'failed'), or '' if the worker no longer held it.
+    """
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        row = conn.execute(
+            """UPDATE tasks
+               SET status = CASE WHEN ? IS NOT NULL AND attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                   available_at = ? + COALESCE(?, 0), worker_id = NULL, last_error = ?, updated_at = ?
+               WHERE id = ? AND worker_id = ? AND status = 'running'
+               RETURNING status""",
+            (retry_delay, now, retry_delay, error, now, task_id, worker_id)
+        ).fetchone()
+    return row[0] if row else ""
+
+def _complete_tasks(cursor: sqlite3.Cursor, completed: List[Tuple[int, int]]):
+    """Marks tasks done; `completed` holds (candidate_id, task_id) pairs."""
+    if completed:
+        now = time.time()
+        cursor.executemany(
+            """UPDATE tasks SET status = 'done', candidate_id = ?, worker_id = NULL, last_error = NULL, updated_at = ?
+               WHERE id = ? AND status != 'done'""",
+            [(candidate_id, now, task_id) for candidate_id, task_id in completed]
+        )
+
+def get_task_counts(job_id: Optional[int] = None) -> Dict[str, int]:
+    """Number of tasks per status, for one job or for all."""
+    query = "SELECT status, COUNT(*) FROM tasks"
+    params: Tuple = ()
+    if job_id is not None:
+        query += " WHERE job_id = ?"
+        params = (job_id,)
+    counts = dict.fromkeys(("queued", "running", "done", "failed"), 0)
+    counts.update(get_connection().execute(query + " GROUP BY status", params).fetchall())
+    return counts
+
+def retry_failed_tasks(job_id: Optional[int] = None) -> int:
+    """Puts failed tasks back in the queue with fresh attempts. Returns the number requeued."""
+    now = time.time()
+    query = """UPDATE tasks SET status = 'queued', attempts = 0, available_at = ?, updated_at = ?
+               WHERE status = 'failed'"""
+    params: Tuple = (now, now)
+    if job_id is not None:
+        query += " AND job_id = ?"
+        params += (job_id,)
+    conn = get_connection()
+    with conn:
+        return conn.execute(query, params).rowcount
+
+
+# --- Resume Deduplication ---
+
+def _save_resume_signatures(cursor: sqlite3.Cursor, entries: List[Tuple[int, Dict[str, Any]]]):
+    """Replaces the duplicate index entries of the given candidates; `entries` holds (candidate_id, entry) pairs."""
+    if not entries:
+        return
+    now = time.time()
+    cursor.executemany(
+        """INSERT INTO resume_signatures(candidate_id, email, phone, minhash, updated_at) VALUES(?,?,?,?,?)
+           ON CONFLICT(candidate_id) DO UPDATE SET
+               email = excluded.email, phone = excluded.phone, minhash = excluded.minhash, updated_at = excluded.updated_at""",
+        [(candidate_id, entry["email"], entry["phone"], entry["minhash"], now) for candidate_id, entry in entries]
+    )
+    cursor.executemany("DELETE FROM resume_lsh_buckets WHERE candidate_id = ?", [(candidate_id,) for candidate_id, _ in entries])
+    cursor.executemany(
+        "INSERT OR IGNORE INTO resume_lsh_buckets(band, bucket, candidate_id) VALUES(?,?,?)",
+        [(band, bucket, candidate_id) for candidate_id, entry in entries for band, bucket in entry["buckets"]]
+    )
+
+def find_resume_signatures(
+    buckets: List[Tuple[int, int]],
+    email: Optional[str] = None,
+    phone: Optional[str] = None,
+    limit: int = 100,
+) -> List[Tuple[int, Optional[str], Optional[str], bytes]]:
+    """
+    Stored resume signatures that share an LSH bucket, the email or the phone number.
+
+    Returns:
+        List[tuple]: (candidate_id, email, phone, minhash) rows, at most `limit`.
+    """
+    conditions = ["candidate_id IN (SELECT candidate_id FROM resume_lsh_buckets WHERE "
+                  + " OR ".join(["(band = ? AND bucket = ?)"] * len(buckets)) + ")"] if buckets else []
+    params: List[Any] = [value for pair in buckets for value in pair]
+    if email:
+        conditions.append("email = ?")
+        params.append(email)
+    if phone:
+        conditions.append("phone = ?")
+        params.append(phone)
+    if not conditions:
+        return []
+    return get_connection().execute(
+        f"SELECT candidate_id, email, phone, minhash FROM resume_signatures WHERE {' OR '.join(conditions)} LIMIT ?",
+        params + [limit]
+    ).fetchall()
+
+
+# --- Pipeline Metrics ---
+
+def save_node_metrics(rows: List[Tuple], prune_before: Optional[float] = None):
+    """
+    Stores node runs recorded by `tracing` and optionally deletes runs started before `prune_before`.
+
+    Each row is (workflow, node, started_at, wall_ms, llm_ms, queue_ms, retries,
+    input_chars, output_chars, error).
+    """
+    conn = get_connection()
+    with conn:
+        conn.executemany(
+            """INSERT INTO node_metrics(workflow, node, started_at, wall_ms, llm_ms, queue_ms, retries,
+                                        input_chars, output_chars, error)
+               VALUES(?,?,?,?,?,?,?,?,?,?)""",
+            rows
+        )
+        if prune_before is not None:
+            conn.execute("DELETE FROM node_metrics WHERE started_at < ?", (prune_before,))
+
+def get_node_metrics(since: float) -> List[Tuple]:
+    """Returns (workflow, node, wall_ms, llm_ms, retries, error) for the node runs started since `since`."""
+    return get_connection().execute(
+        "SELECT workflow, node, wall_ms, llm_ms, retries, error FROM node_metrics WHERE started_at >= ?",
+        (since,)
+    ).fetchall()
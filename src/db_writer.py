@@ -0,0 +1,163 @@
+import os
+import queue
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import database
+
+logger = logging.getLogger(__name__)
+
+# A batch is flushed as soon as it holds this many results...
+DB_WRITER_BATCH_SIZE = int(os.getenv("DB_WRITER_BATCH_SIZE", "64"))
+# ...or once its oldest result has waited this long. With the default of 0 the writer
+# flushes whatever is queued as soon as it is free, so batches grow naturally under load
+# while a lone result is never delayed.
+DB_WRITER_MAX_DELAY_MS = float(os.getenv("DB_WRITER_MAX_DELAY_MS", "0"))
+
+_STOP = object()
+
+class WriteFuture(Future):
+    """Future returned by `CandidateWriter.submit`; also tells how long the write was queued."""
+
+    def __init__(self):
+        super().__init__()
+        self.submitted_at = time.monotonic()
+        self.queue_wait = 0.0 # seconds between submit() and the start of its transaction
+
+class CandidateWriter:
+    """
+    Single-writer, group-commit path for candidate and application upserts.
+
+    Pipelines submit their results and receive a Future. A background thread drains the
+    queue, writes up to `batch_size` results per transaction via
+    `database.save_applications_batch`, and resolves each Future with the candidate ID
+    only after the transaction has committed. If a batch fails, its items are retried
+    one by one so a single bad row cannot fail the rest of the batch.
+    """
+
+    def __init__(self, batch_size: int = DB_WRITER_BATCH_SIZE, max_delay_ms: float = DB_WRITER_MAX_DELAY_MS):
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay_ms / 1000
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        job_id: int,
+        report: Optional[Dict[str, Any]],
+        match_score: Optional[int],
+        match_summary: Optional[str],
+        prescreen_score: Optional[float] = None,
+        candidate_id: Optional[int] = None,
+        task_id: Optional[int] = None,
+        signature: Optional[Dict[str, Any]] = None,
+    ) -> WriteFuture:
+        """
+        Queue a candidate + application upsert.
+
+        Args:
+            job_id (int): The job the candidate applied to.
+            report (Optional[dict]): The standardized resume. May be None when `candidate_id` is given.
+            match_score (Optional[int]): The relevancy score.
+            match_summary (Optional[str]): The relevancy summary.
+            prescreen_score (Optional[float]): The local pre-screen score, if the resume was pre-screened.
+            candidate_id (Optional[int]): An existing candidate to link without re-upserting the report.
+            task_id (Optional[int]): A queue task to mark as done in the same transaction.
+            signature (Optional[dict]): The resume's duplicate index entry (see `dedup.index_entry`).
+
+        Returns:
+            WriteFuture: Resolves to the candidate ID once the write is committed.
+        """
+        future = WriteFuture()
+        item = {
+            "job_id": job_id,
+            "report": report,
+            "match_score": match_score,
+            "match_summary": match_summary,
+            "prescreen_score": prescreen_score,
+            "candidate_id": candidate_id,
+            "task_id": task_id,
+            "signature": signature,
+        }
+        self._ensure_started()
+        self._queue.put((item, future))
+        return future
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush everything queued so far and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="cv-scout-db-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    return
+                batch: List[Tuple[Dict[str, Any], WriteFuture]] = [first]
+                deadline = time.monotonic() + self.max_delay
+                stop = False
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        if remaining > 0:
+                            entry = self._queue.get(timeout=remaining)
+                        else:
+                            entry = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if entry is _STOP:
+                        stop = True
+                        break
+                    batch.append(entry)
+                self._flush(batch)
+                if stop:
+                    return
+        finally:
+            database.close_connection()
+
+    def _flush(self, batch: List[Tuple[Dict[str, Any], WriteFuture]]):
+        started_at = time.monotonic()
+        for _, future in batch:
+            future.queue_wait = started_at - future.submitted_at
+        items = [item for item, _ in batch]
+        try:
+            candidate_ids = database.save_applications_batch(items)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            logger.warning(f"--- DB WRITER: Batch of {len(batch)} failed ({e}); retrying items individually ---")
+            for entry in batch:
+                self._flush([entry])
+            return
+        for (_, future), candidate_id in zip(batch, candidate_ids):
+            future.set_result(candidate_id)
+
+
+_writer: Optional[CandidateWriter] = None
+_writer_lock = threading.Lock()
+
+def get_candidate_writer() -> CandidateWriter:
+    """Return the process-wide CandidateWriter, creating it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = CandidateWriter()
+            atexit.register(_writer.close)
+        return _writer
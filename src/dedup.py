@@ -0,0 +1,183 @@
+"""
+Exact and near-duplicate resume detection, run right after ingestion.
+
+Applicants often resubmit the same resume, or a slightly edited one. Before the LLM
+extraction is paid for, the raw text is compared against the resumes processed before:
+
+1. Contact details: emails and phone numbers found with a regex are looked up directly.
+2. Near-duplicates: a MinHash signature over word shingles of the text is looked up in
+   an LSH index (`resume_lsh_buckets`), which finds resumes with a similar signature
+   without comparing against every stored one.
+
+Every resume found either way is verified by the similarity estimated from the two
+signatures; at DEDUP_SIMILARITY_THRESHOLD or above, the stored candidate's report is
+reused and extraction and standardization are skipped. Two resumes with different email
+addresses are never treated as duplicates, however similar their text (templates).
+
+Signatures are saved together with the candidate's application (see
+`database.save_applications_batch`), so the index fills as resumes are processed. A
+lookup is one indexed query and a NumPy comparison, independent of the index size.
+"""
+import os
+import re
+import zlib
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src import database
+from src.prescreening import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") != "0"
+# Estimated Jaccard similarity of the shingle sets from which a resume counts as a duplicate.
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.9"))
+# Words per shingle.
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+# The signature has DEDUP_LSH_BANDS * DEDUP_LSH_ROWS hashes. Two resumes with similarity s
+# share at least one band with probability 1 - (1 - s**rows)**bands: ~0.95 at 0.8 and
+# ~0.9999 at 0.9 with the defaults. Lower thresholds need fewer rows per band. Changing
+# either value invalidates the stored index; old entries then simply stop matching.
+DEDUP_LSH_BANDS = int(os.getenv("DEDUP_LSH_BANDS", "16"))
+DEDUP_LSH_ROWS = int(os.getenv("DEDUP_LSH_ROWS", "8"))
+# Most stored signatures compared per lookup; guards against crowded buckets.
+DEDUP_MAX_CANDIDATES = int(os.getenv("DEDUP_MAX_CANDIDATES", "100"))
+
+# Hash functions h(x) = (a * x + b) mod p over 32-bit shingle hashes. With p < 2**32 the
+# products fit in uint64. The coefficients are fixed so signatures are comparable across
+# processes and restarts.
+_PRIME = np.uint64(4294967291)  # largest prime below 2**32
+_SHINGLE_CHUNK = 4096
+
+_EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+_PHONE_PATTERN = re.compile(r"\+?\d[\d ().-]{7,}\d")
+
+_coefficients: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+def _hash_coefficients(num_hashes: int) -> Tuple[np.ndarray, np.ndarray]:
+    if num_hashes not in _coefficients:
+        rng = np.random.default_rng(20240601)
+        a = rng.integers(1, int(_PRIME), size=num_hashes, dtype=np.uint64)
+        b = rng.integers(0, int(_PRIME), size=num_hashes, dtype=np.uint64)
+        _coefficients[num_hashes] = (a, b)
+    return _coefficients[num_hashes]
+
+def detect_contacts(text: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Finds the first email address and phone number in a resume's raw text.
+
+    Returns:
+        tuple: The lower-cased email and the phone number's last 10 digits (so '+1 555...'
+               and '555...' match); None for what was not found.
+    """
+    if not text:
+        return None, None
+    email_match = _EMAIL_PATTERN.search(text)
+    email = email_match.group(0).lower() if email_match else None
+    phone = None
+    for match in _PHONE_PATTERN.finditer(text):
+        digits = re.sub(r"\D", "", match.group(0))
+        # Fewer digits is a date range or an ID; more is several numbers in a row.
+        if 9 <= len(digits) <= 15:
+            phone = digits[-10:]
+            break
+    return email, phone
+
+def shingle_hashes(text: Optional[str], size: int = DEDUP_SHINGLE_SIZE) -> np.ndarray:
+    """The distinct crc32 hashes of the text's word shingles; layout and case do not matter."""
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return np.unique(hashes)
+
+def minhash_signature(text: Optional[str], num_hashes: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    The MinHash signature of the text's shingle set, as uint32 values.
+
+    The fraction of positions where two signatures agree estimates the Jaccard similarity
+    of the two shingle sets. Returns None for text without any words.
+    """
+    num_hashes = num_hashes or DEDUP_LSH_BANDS * DEDUP_LSH_ROWS
+    hashes = shingle_hashes(text)
+    if hashes.size == 0:
+        return None
+    a, b = _hash_coefficients(num_hashes)
+    signature = np.full(num_hashes, _PRIME, dtype=np.uint64)
+    # Chunked so a very long document does not allocate a huge (shingles x hashes) matrix.
+    for start in range(0, hashes.size, _SHINGLE_CHUNK):
+        chunk = hashes[start:start + _SHINGLE_CHUNK, None]
+        np.minimum(signature, ((chunk * a + b) % _PRIME).min(axis=0), out=signature)
+    return signature.astype(np.uint32)
+
+def lsh_buckets(signature: np.ndarray, bands: int = DEDUP_LSH_BANDS) -> List[Tuple[int, int]]:
+    """The (band, bucket) pairs of a signature; similar signatures share at least one."""
+    rows = len(signature) // bands
+    buckets = []
+    for band in range(bands):
+        digest = hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest()
+        # Signed, so that it fits an SQLite INTEGER.
+        buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+    return buckets
+
+def similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of one signature to each row of `others`."""
+    return (others == signature).mean(axis=1)
+
+def find_duplicate(
+    raw_text: Optional[str],
+    threshold: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Looks a resume up among the resumes processed before.
+
+    Args:
+        raw_text (Optional[str]): The resume's raw text.
+        threshold (Optional[float]): Minimum estimated similarity. Defaults to DEDUP_SIMILARITY_THRESHOLD.
+
+    Returns:
+        dict: 'minhash_signature' (bytes), 'contact_email' and 'contact_phone' for the index,
+              plus 'duplicate_of' (candidate ID) and 'duplicate_similarity' when a stored
+              resume is similar enough. Empty for text without any words.
+    """
+    if threshold is None:
+        threshold = DEDUP_SIMILARITY_THRESHOLD
+    signature = minhash_signature(raw_text)
+    if signature is None:
+        return {}
+    email, phone = detect_contacts(raw_text)
+    result: Dict[str, Any] = {"minhash_signature": signature.tobytes(), "contact_email": email, "contact_phone": phone}
+
+    rows = database.find_resume_signatures(lsh_buckets(signature), email, phone, limit=DEDUP_MAX_CANDIDATES)
+    # Signatures of another length were made with other LSH settings and are not comparable.
+    rows = [row for row in rows if len(row[3]) == signature.nbytes]
+    if not rows:
+        return result
+    stored = np.frombuffer(b"".join(row[3] for row in rows), dtype=np.uint32).reshape(len(rows), -1)
+    scores = similarity(signature, stored)
+    for i in np.argsort(-scores, kind="stable"):
+        candidate_id, stored_email = rows[i][0], rows[i][1]
+        if scores[i] < threshold:
+            break
+        if email and stored_email and email != stored_email:
+            continue
+        result.update({"duplicate_of": candidate_id, "duplicate_similarity": float(scores[i])})
+        break
+    return result
+
+def index_entry(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The `resume_signatures` entry to save with a result, or None if the state has no signature."""
+    signature = state.get("minhash_signature")
+    if not signature:
+        return None
+    return {
+        "minhash": signature,
+        "email": state.get("contact_email"),
+        "phone": state.get("contact_phone"),
+        "buckets": lsh_buckets(np.frombuffer(signature, dtype=np.uint32)),
+    }
@@ -1,19 +1,28 @@
-import os
+import asyncio
+import hashlib
 import logging
+from typing import Optional
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv
 
-from src.schemas import GeneratedEmail
+from src.llm import EMAIL_MODEL, get_structured_llm
+from src.schemas import GeneratedEmail, EmailGenerationError
+from src.database import get_email_template, save_email_template
+from src.rate_limit import ainvoke_llm, invoke_llm
 
-# Configure logging and load environment variables
-load_dotenv()
+# Configure logging
 logger = logging.getLogger(__name__)
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Initialize a specific LLM for this task
-email_llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=GEMINI_API_KEY)
-structured_email_llm = email_llm.with_structured_output(GeneratedEmail)
+# Template mode: the LLM writes one email per (job title, disposition, tone) using this
+# placeholder for the name, and every candidate's copy is rendered locally.
+CANDIDATE_NAME_PLACEHOLDER = "[[CANDIDATE_NAME]]"
+DEFAULT_EMAIL_TONE = "professional"
+TEMPLATE_INSTRUCTIONS = (
+    "This email is a reusable template that will be sent to many candidates. "
+    "Wherever the candidate's name belongs, write exactly " + CANDIDATE_NAME_PLACEHOLDER + " and do not "
+    "invent any other candidate-specific details. Use a {tone} tone."
+)
+# Bump when the template prompts change in a way that invalidates stored templates.
+EMAIL_TEMPLATE_VERSION = "1"
 
 def get_positive_prompt():
     """Returns the prompt template for a positive/acceptance email."""
@@ -50,6 +59,21 @@ def get_negative_prompt():
         ]
     )
 
+def get_disposition_prompt(disposition: str) -> Optional[ChatPromptTemplate]:
+    """Returns the prompt template for the given disposition, or None if it is unknown."""
+    if disposition == "positive":
+        return get_positive_prompt()
+    if disposition == "negative":
+        return get_negative_prompt()
+    return None
+
+def get_template_prompt(disposition: str) -> Optional[ChatPromptTemplate]:
+    """Returns the disposition prompt extended with the reusable-template instructions."""
+    prompt = get_disposition_prompt(disposition)
+    if prompt is None:
+        return None
+    return prompt + ChatPromptTemplate.from_messages([("human", TEMPLATE_INSTRUCTIONS)])
+
 def email_content_generator_agent(candidate_info: dict) -> dict:
     """
     Generates the email content (subject and body) for a single candidate.
@@ -60,6 +84,9 @@ def email_content_generator_agent(candidate_info: dict) -> dict:
     
     Returns:
         dict: A dictionary with the generated 'subject' and 'body'.
+
+    Raises:
+        EmailGenerationError: If the disposition is unknown or the LLM call fails.
     """
     disposition = candidate_info.get("disposition")
     
@@ -71,19 +98,193 @@ def email_content_generator_agent(candidate_info: dict) -> dict:
         logger.info(f"---AGENT: Generating NEGATIVE email content for {candidate_info['candidate_name']}---")
     else:
         # Should not happen in normal flow
-        return {"subject": "Error", "body": "Invalid disposition."}
+        raise EmailGenerationError(f"Invalid disposition: {disposition}")
+
+    chain = prompt | get_structured_llm(GeneratedEmail, role="email")
+    
+    try:
+        response = invoke_llm(chain, {
+            "job_title": candidate_info["job_title"],
+            "candidate_name": candidate_info["candidate_name"]
+        })
+        return {"subject": response.subject, "body": response.body}
+    except Exception as e:
+        logger.error(f"Error generating email content: {e}")
+        raise EmailGenerationError(f"Could not generate email content: {e}") from e
+
+async def aemail_content_generator_agent(candidate_info: dict) -> dict:
+    """
+    Async variant of `email_content_generator_agent` using `ainvoke`.
+    
+    Args:
+        candidate_info (dict): A dictionary containing 'candidate_name', 'job_title', 
+                               and 'disposition' ('positive' or 'negative').
+    
+    Returns:
+        dict: A dictionary with the generated 'subject' and 'body'.
+
+    Raises:
+        EmailGenerationError: If the disposition is unknown or the LLM call fails.
+    """
+    disposition = candidate_info.get("disposition")
+    
+    if disposition == "positive":
+        prompt = get_positive_prompt()
+        logger.info(f"---AGENT: Generating POSITIVE email content for {candidate_info['candidate_name']}---")
+    elif disposition == "negative":
+        prompt = get_negative_prompt()
+        logger.info(f"---AGENT: Generating NEGATIVE email content for {candidate_info['candidate_name']}---")
+    else:
+        raise EmailGenerationError(f"Invalid disposition: {disposition}")
 
-    chain = prompt | structured_email_llm
+    chain = prompt | get_structured_llm(GeneratedEmail, role="email")
     
     try:
-        response = chain.invoke({
+        response = await ainvoke_llm(chain, {
             "job_title": candidate_info["job_title"],
             "candidate_name": candidate_info["candidate_name"]
         })
         return {"subject": response.subject, "body": response.body}
     except Exception as e:
         logger.error(f"Error generating email content: {e}")
-        return {"subject": "Generation Error", "body": f"Could not generate email content. Error: {e}"}
+        raise EmailGenerationError(f"Could not generate email content: {e}") from e
+
+def email_template_cache_key(job_title: str, disposition: str, tone: str) -> str:
+    """Builds the cache key of an email template from its inputs and the prompt/model version."""
+    fingerprint = "\x1f".join([
+        job_title.strip(), disposition, tone.strip().lower(), EMAIL_MODEL, EMAIL_TEMPLATE_VERSION
+    ])
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+def _prepare_template_request(template_info: dict):
+    """Resolves the prompt, tone and cache key for a template request."""
+    disposition = template_info.get("disposition")
+    tone = template_info.get("tone") or DEFAULT_EMAIL_TONE
+    prompt = get_template_prompt(disposition)
+    cache_key = email_template_cache_key(template_info["job_title"], disposition, tone)
+    return prompt, tone, cache_key
+
+def _load_cached_template(cache_key: str) -> Optional[dict]:
+    try:
+        return get_email_template(cache_key)
+    except Exception as e:
+        logger.warning(f"Email template cache lookup failed: {e}")
+        return None
+
+def _store_template(cache_key: str, template_info: dict, tone: str, template: dict):
+    try:
+        save_email_template(
+            cache_key, template_info["job_title"], template_info["disposition"], tone,
+            template["subject"], template["body"]
+        )
+    except Exception as e:
+        logger.warning(f"Could not store email template: {e}")
+
+def _validated_template(response: GeneratedEmail) -> dict:
+    """
+    The generated template, if its body addresses the candidate through the placeholder.
+
+    A template without it would greet every candidate without their name, and would be
+    cached and reused, so it is rejected instead of stored.
+    """
+    if CANDIDATE_NAME_PLACEHOLDER not in response.body:
+        logger.error(f"---AGENT: Generated email template has no {CANDIDATE_NAME_PLACEHOLDER} placeholder---")
+        raise EmailGenerationError(f"The generated email template does not contain {CANDIDATE_NAME_PLACEHOLDER}.")
+    return {"subject": response.subject, "body": response.body}
+
+def email_template_generator_agent(template_info: dict) -> dict:
+    """
+    Generates (or loads from the cache) a reusable email template for a job and disposition.
+    
+    Args:
+        template_info (dict): A dictionary containing 'job_title', 'disposition'
+                              ('positive' or 'negative') and optionally 'tone'.
+    
+    Returns:
+        dict: A dictionary with the template 'subject' and 'body', containing
+              CANDIDATE_NAME_PLACEHOLDER where the candidate's name belongs.
+
+    Raises:
+        EmailGenerationError: If the disposition is unknown, the LLM call fails or the
+                              template has no placeholder. Nothing is cached then.
+    """
+    prompt, tone, cache_key = _prepare_template_request(template_info)
+    if prompt is None:
+        raise EmailGenerationError(f"Invalid disposition: {template_info.get('disposition')}")
+
+    cached_template = _load_cached_template(cache_key)
+    if cached_template is not None:
+        return cached_template
+
+    logger.info(f"---AGENT: Generating {template_info['disposition'].upper()} email template for '{template_info['job_title']}'---")
+    chain = prompt | get_structured_llm(GeneratedEmail, role="email")
+    try:
+        response = invoke_llm(chain, {
+            "job_title": template_info["job_title"],
+            "candidate_name": CANDIDATE_NAME_PLACEHOLDER,
+            "tone": tone
+        })
+    except Exception as e:
+        logger.error(f"Error generating email template: {e}")
+        raise EmailGenerationError(f"Could not generate the email template: {e}") from e
+
+    template = _validated_template(response)
+    _store_template(cache_key, template_info, tone, template)
+    return template
+
+async def aemail_template_generator_agent(template_info: dict) -> dict:
+    """
+    Async variant of `email_template_generator_agent` using `ainvoke`.
+    
+    Args:
+        template_info (dict): A dictionary containing 'job_title', 'disposition'
+                              ('positive' or 'negative') and optionally 'tone'.
+    
+    Returns:
+        dict: A dictionary with the template 'subject' and 'body'.
+
+    Raises:
+        EmailGenerationError: See `email_template_generator_agent`.
+    """
+    prompt, tone, cache_key = _prepare_template_request(template_info)
+    if prompt is None:
+        raise EmailGenerationError(f"Invalid disposition: {template_info.get('disposition')}")
+
+    cached_template = await asyncio.to_thread(_load_cached_template, cache_key)
+    if cached_template is not None:
+        return cached_template
+
+    logger.info(f"---AGENT: Generating {template_info['disposition'].upper()} email template for '{template_info['job_title']}'---")
+    chain = prompt | get_structured_llm(GeneratedEmail, role="email")
+    try:
+        response = await ainvoke_llm(chain, {
+            "job_title": template_info["job_title"],
+            "candidate_name": CANDIDATE_NAME_PLACEHOLDER,
+            "tone": tone
+        })
+    except Exception as e:
+        logger.error(f"Error generating email template: {e}")
+        raise EmailGenerationError(f"Could not generate the email template: {e}") from e
+
+    template = _validated_template(response)
+    await asyncio.to_thread(_store_template, cache_key, template_info, tone, template)
+    return template
+
+def render_email_template(template: dict, candidate_name: str) -> dict:
+    """
+    Renders a template for one candidate by substituting the name placeholder locally.
+    
+    Args:
+        template (dict): A dictionary with the template 'subject' and 'body'.
+        candidate_name (str): The candidate's name.
+    
+    Returns:
+        dict: A dictionary with the rendered 'subject' and 'body'.
+    """
+    return {
+        "subject": template["subject"].replace(CANDIDATE_NAME_PLACEHOLDER, candidate_name),
+        "body": template["body"].replace(CANDIDATE_NAME_PLACEHOLDER, candidate_name),
+    }
 
 def mock_dispatch_agent(email_details: dict) -> str:
     """
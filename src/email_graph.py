@@ -1,74 +1,200 @@
-from typing import TypedDict, List, Dict, Any
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
+import asyncio
 import logging
+import operator
+import os
+import time
 
-from src.email_agents import email_content_generator_agent, mock_dispatch_agent
+from src.email_agents import email_content_generator_agent, aemail_content_generator_agent, mock_dispatch_agent
+from src.email_agents import email_template_generator_agent, aemail_template_generator_agent, render_email_template
+from src.schemas import EmailGenerationError
+from src.tracing import traced_node
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of candidate email branches running at the same time
+MAX_CONCURRENT_EMAILS = int(os.getenv("MAX_CONCURRENT_EMAILS", "8"))
+
 class EmailAgentState(TypedDict):
     """Defines the state for the email generation workflow."""
     job_title: str
     positive_candidates: List[Dict[str, Any]]
     negative_candidates: List[Dict[str, Any]]
-    processed_emails: List[str] # To store status messages from the dispatch agent
+    personalize: bool # Opt-in: one LLM call per candidate instead of one template per disposition
+    tone: str # Tone used for generated templates, e.g. "professional" or "warm"
+    templates: Dict[str, Dict[str, str]] # Generated templates keyed by disposition; {"error": ...} if generation failed
+    processed_emails: Annotated[List[str], operator.add] # Status messages, appended by each candidate branch
+
+class CandidateEmailState(TypedDict):
+    """Defines the payload sent to each parallel candidate email branch."""
+    job_title: str
+    candidate: Dict[str, Any]
+    disposition: str
+    template: Optional[Dict[str, str]] # None means the email is personalized by the LLM; {"error": ...} fails the email
+    queued_at: float # time.monotonic() when the branch was scheduled; the tracing layer reports the wait
+
+def _dispositions_needed(state: EmailAgentState) -> List[str]:
+    return [
+        disposition
+        for disposition in ("positive", "negative")
+        if state.get(f"{disposition}_candidates")
+    ]
+
+def _template_or_error(result) -> Dict[str, str]:
+    """A generated template, or the error marker that fails every email of its disposition."""
+    if isinstance(result, EmailGenerationError):
+        return {"error": str(result)}
+    if isinstance(result, BaseException):
+        return {"error": f"Could not generate the email template: {result}"}
+    return result
+
+def email_template_agent(state: EmailAgentState) -> Dict[str, Any]:
+    """
+    Generates one template per disposition that has candidates (or loads it from the cache).
+    Does nothing when per-candidate personalization is requested. A template that could not
+    be generated is recorded as an error, and each of its candidates is reported as failed.
+    """
+    if state.get('personalize'):
+        return {"templates": {}}
+
+    logger.info("---ORCHESTRATOR: Preparing email templates---")
+    templates = {}
+    for disposition in _dispositions_needed(state):
+        try:
+            templates[disposition] = email_template_generator_agent({
+                "job_title": state['job_title'],
+                "disposition": disposition,
+                "tone": state.get('tone')
+            })
+        except Exception as e:
+            templates[disposition] = _template_or_error(e)
+    return {"templates": templates}
+
+async def aemail_template_agent(state: EmailAgentState) -> Dict[str, Any]:
+    """Async variant of `email_template_agent`; both templates are generated concurrently."""
+    if state.get('personalize'):
+        return {"templates": {}}
+
+    logger.info("---ORCHESTRATOR: Preparing email templates---")
+    dispositions = _dispositions_needed(state)
+    templates = await asyncio.gather(*(
+        aemail_template_generator_agent({
+            "job_title": state['job_title'],
+            "disposition": disposition,
+            "tone": state.get('tone')
+        })
+        for disposition in dispositions
+    ), return_exceptions=True)
+    return {"templates": {disposition: _template_or_error(result) for disposition, result in zip(dispositions, templates)}}
+
+def fan_out_candidates(state: EmailAgentState):
+    """
+    Conditional Edge Function: Maps every candidate to its own `candidate_email_agent` branch.
+
+    LangGraph runs the branches in parallel, bounded by the `max_concurrency` setting of
+    the run config, and merges their status messages through the `processed_emails` reducer.
+    """
+    templates = state.get('templates') or {}
+    queued_at = time.monotonic()
+    sends = [
+        Send("candidate_email_agent", {
+            "job_title": state['job_title'],
+            "candidate": candidate,
+            "disposition": disposition,
+            "template": templates.get(disposition),
+            "queued_at": queued_at,
+        })
+        for disposition in ("positive", "negative")
+        for candidate in state.get(f"{disposition}_candidates", [])
+    ]
+    logger.info(f"---ORCHESTRATOR: Fanning out {len(sends)} candidate email(s)---")
+    return sends or END
+
+def _render(state: CandidateEmailState) -> Dict[str, str]:
+    """Renders the shared template for the branch's candidate; fails if the template could not be generated."""
+    template = state['template']
+    if "error" in template:
+        raise EmailGenerationError(template["error"])
+    return render_email_template(template, state['candidate']['full_name'])
+
+def _dispatch(candidate: Dict[str, Any], content: Dict[str, str]) -> str:
+    dispatch_input = {
+        "email_address": candidate['email'],
+        **content
+    }
+    return mock_dispatch_agent(dispatch_input)
+
+def _failure_status(candidate: Dict[str, Any], error: Exception) -> str:
+    logger.error(f"---AGENT: Email for {candidate.get('email')} failed: {error}---")
+    return f"❌ Could not process email for {candidate.get('email')}: {error}"
 
-def email_orchestrator(state: EmailAgentState) -> Dict[str, List[str]]:
+def candidate_email_agent(state: CandidateEmailState) -> Dict[str, List[str]]:
     """
-    Orchestrates the entire email generation and dispatch process.
-    Iterates through positive and negative candidate lists and processes them.
+    Produces and dispatches the email for one candidate, either by rendering the shared
+    template or, in personalized mode, with its own LLM call. A failure only affects
+    this candidate.
     """
-    logger.info("---ORCHESTRATOR: Starting email generation process---")
-    
-    job_title = state['job_title']
-    positive_candidates = state.get('positive_candidates', [])
-    negative_candidates = state.get('negative_candidates', [])
-    
-    all_status_updates = []
-
-    # Process positive candidates
-    for candidate in positive_candidates:
-        logger.info(f"Processing positive candidate: {candidate['full_name']}")
-        content_input = {
-            "candidate_name": candidate['full_name'],
-            "job_title": job_title,
-            "disposition": "positive"
-        }
-        generated_content = email_content_generator_agent(content_input)
-        
-        dispatch_input = {
-            "email_address": candidate['email'],
-            **generated_content
-        }
-        status = mock_dispatch_agent(dispatch_input)
-        all_status_updates.append(status)
-
-    # Process negative candidates
-    for candidate in negative_candidates:
-        logger.info(f"Processing negative candidate: {candidate['full_name']}")
-        content_input = {
-            "candidate_name": candidate['full_name'],
-            "job_title": job_title,
-            "disposition": "negative"
-        }
-        generated_content = email_content_generator_agent(content_input)
-        
-        dispatch_input = {
-            "email_address": candidate['email'],
-            **generated_content
-        }
-        status = mock_dispatch_agent(dispatch_input)
-        all_status_updates.append(status)
-        
-    logger.info("---ORCHESTRATOR: Email process complete---")
-    return {"processed_emails": all_status_updates}
-
-def create_email_workflow():
-    """Creates the LangGraph workflow for sending emails."""
+    candidate = state['candidate']
+    try:
+        if state.get('template') is not None:
+            content = _render(state)
+        else:
+            logger.info(f"Processing {state['disposition']} candidate: {candidate['full_name']}")
+            content = email_content_generator_agent({
+                "candidate_name": candidate['full_name'],
+                "job_title": state['job_title'],
+                "disposition": state['disposition']
+            })
+        status = _dispatch(candidate, content)
+    except Exception as e:
+        status = _failure_status(candidate, e)
+    return {"processed_emails": [status]}
+
+async def acandidate_email_agent(state: CandidateEmailState) -> Dict[str, List[str]]:
+    """Async variant of `candidate_email_agent` using `ainvoke` for personalized emails."""
+    candidate = state['candidate']
+    try:
+        if state.get('template') is not None:
+            content = _render(state)
+        else:
+            logger.info(f"Processing {state['disposition']} candidate: {candidate['full_name']}")
+            content = await aemail_content_generator_agent({
+                "candidate_name": candidate['full_name'],
+                "job_title": state['job_title'],
+                "disposition": state['disposition']
+            })
+        status = _dispatch(candidate, content)
+    except Exception as e:
+        status = _failure_status(candidate, e)
+    return {"processed_emails": [status]}
+
+def _build_email_workflow(template_agent, email_agent, max_concurrency: Optional[int]):
     workflow = StateGraph(EmailAgentState)
-    
-    workflow.add_node("orchestrator", email_orchestrator)
-    workflow.set_entry_point("orchestrator")
-    workflow.add_edge("orchestrator", END)
-    
-    return workflow.compile()
\ No newline at end of file
+
+    workflow.add_node("email_template_agent", traced_node("email", "email_template_agent", template_agent))
+    workflow.add_node("candidate_email_agent", traced_node("email", "candidate_email_agent", email_agent))
+
+    workflow.set_entry_point("email_template_agent")
+    workflow.add_conditional_edges("email_template_agent", fan_out_candidates, ["candidate_email_agent", END])
+    workflow.add_edge("candidate_email_agent", END)
+
+    if max_concurrency is None:
+        max_concurrency = MAX_CONCURRENT_EMAILS
+    return workflow.compile().with_config(max_concurrency=max(1, int(max_concurrency)))
+
+def create_email_workflow(max_concurrency: Optional[int] = None):
+    """
+    Creates the LangGraph workflow for sending emails.
+
+    The graph is a map-reduce: templates are prepared once, then each candidate is
+    handled in its own parallel branch, with at most `max_concurrency` branches
+    (default MAX_CONCURRENT_EMAILS) running at a time. Use `stream(..., stream_mode="updates")`
+    to receive each candidate's status as soon as it completes.
+    """
+    return _build_email_workflow(email_template_agent, candidate_email_agent, max_concurrency)
+
+def create_async_email_workflow(max_concurrency: Optional[int] = None):
+    """Creates the async LangGraph workflow for sending emails. Invoke it with `ainvoke`/`astream`."""
+    return _build_email_workflow(aemail_template_agent, acandidate_email_agent, max_concurrency)
@@ -3,6 +3,9 @@ from langgraph.graph import StateGraph, END
 import logging
 
 from src.agents import ingestion_agent, extraction_agent, standardization_agent, relevancy_analysis_agent, database_agent
+from src.agents import compaction_agent, prescreening_agent, dedup_agent
+from src.agents import aingestion_agent, adedup_agent, aextraction_agent, arelevancy_analysis_agent, adatabase_agent
+from src.tracing import traced_node
 
 logger = logging.getLogger(__name__)
 
@@ -17,87 +20,250 @@ class AgentState(TypedDict):
         file_path (str): The path to the uploaded resume PDF file.
         job_description (Optional[str]): The job description provided by the user, if any.
         raw_text (str): The raw text extracted from the PDF.
+        pdf_hash (str): SHA-256 digest of the PDF bytes, used as the extraction cache key.
+        compacted_text (str): The raw text after compaction; this is what the extraction LLM sees.
+        compaction_fingerprint (str): The compaction settings, part of the extraction cache key.
+        raw_token_count (int): Estimated tokens in 'raw_text'.
+        compacted_token_count (int): Estimated tokens in 'compacted_text'.
         extracted_json (Dict[str, Any]): The initial structured data extracted by the LLM.
         final_report (Dict[str, Any]): The standardized and final structured data.
+        prescreen_score (Optional[float]): The local keyword match score (0-100).
+        run_analysis (Optional[bool]): Whether the resume passed the pre-screen and gets the LLM analysis.
         match_score (Optional[int]): The compatibility score of the resume against the job description (0-100).
         match_summary (Optional[str]): A summary explaining the match score.
+        task_id (Optional[int]): The queue task being processed, if any; marked done when the result is saved.
+        minhash_signature (bytes): MinHash signature of the raw text, saved to the duplicate index.
+        contact_email (Optional[str]): The first email address found in the raw text.
+        contact_phone (Optional[str]): The first phone number found in the raw text (last 10 digits).
+        duplicate_of (Optional[int]): The stored candidate this resume duplicates; its report is reused.
+        duplicate_similarity (Optional[float]): Estimated similarity to that candidate's resume.
     """
     file_path: str
     job_description: Optional[str]
     job_id: Optional[int] 
     candidate_id: Optional[int] 
     raw_text: str
+    pdf_hash: str
+    compacted_text: str
+    compaction_fingerprint: str
+    raw_token_count: int
+    compacted_token_count: int
     extracted_json: Dict[str, Any]
     final_report: Dict[str, Any]
+    prescreen_score: Optional[float]
+    run_analysis: Optional[bool]
     match_score: Optional[int]
     match_summary: Optional[str]
-    
+    task_id: Optional[int]
+    minhash_signature: bytes
+    contact_email: Optional[str]
+    contact_phone: Optional[str]
+    duplicate_of: Optional[int]
+    duplicate_similarity: Optional[float]
+
 
 def should_run_analysis(state):
     """
     Conditional Edge Function: Determines whether to run the relevancy analysis agent.
 
     This function is used by LangGraph to decide the next step in the workflow
-    based on the presence of a job description in the current state.
+    based on the presence of a job description in the current state and on the
+    decision of the pre-screening agent.
 
     Args:
         state (AgentState): The current state of the agent workflow.
 
     Returns:
-        str: "run_analysis" if a job description is present, "skip_analysis" otherwise.
+        str: "run_analysis" if a job description is present and the resume was not
+             pre-screened out, "skip_analysis" otherwise.
     """
     # Using logging instead of print for better practice
     logger.info("---ROUTER: DECIDING NEXT STEP---")
-    if state.get("job_description") and state.get("job_description").strip():
-        logger.info("---ROUTER: Job description found. Proceeding to analysis.---")
-        return "run_analysis"
-    else:
+    if not (state.get("job_description") and state.get("job_description").strip()):
         logger.info("---ROUTER: No job description. Skipping analysis.---")
         return "skip_analysis"
+    if state.get("run_analysis") is False:
+        logger.info("---ROUTER: Resume pre-screened out. Skipping analysis.---")
+        return "skip_analysis"
+    logger.info("---ROUTER: Job description found. Proceeding to analysis.---")
+    return "run_analysis"
 
-def create_workflow():
+def should_extract(state):
     """
-    Creates the LangGraph workflow for processing resumes.
-
-    Defines the nodes (agents) and edges (transitions) of the state graph
-    that orchestrates the resume processing pipeline.
+    Conditional Edge Function: Skips extraction and standardization for a duplicate resume,
+    whose stored report the dedup agent has already put in the state.
 
     Returns:
-        CompiledGraph: The compiled LangGraph application ready for invocation.
+        str: "duplicate" if the resume duplicates a stored one, "extract" otherwise.
     """
-    workflow = StateGraph(AgentState)
+    if state.get("duplicate_of") is not None and state.get("final_report"):
+        logger.info("---ROUTER: Duplicate resume. Skipping extraction.---")
+        return "duplicate"
+    return "extract"
 
-    # Add the nodes (our agents)
-    workflow.add_node("ingestion_agent", ingestion_agent)
-    workflow.add_node("extraction_agent", extraction_agent)
-    workflow.add_node("standardization_agent", standardization_agent)
-    workflow.add_node("relevancy_analysis_agent", relevancy_analysis_agent)
-    workflow.add_node("database_agent", database_agent) # <-- ADD THE NEW NODE
+def _add_traced_node(workflow, name, node):
+    """Adds a node wrapped by `tracing.traced_node`, so its runs show up in the pipeline metrics."""
+    workflow.add_node(name, traced_node("resume", name, node))
 
-    # Define the edges
-    workflow.set_entry_point("ingestion_agent")
-    workflow.add_edge("ingestion_agent", "extraction_agent")
-    workflow.add_edge("extraction_agent", "standardization_agent")
+def _add_analysis_path(workflow, prescreening, relevancy_analysis, database):
+    """Adds pre-screening -> (relevancy analysis) -> database, ending the graph."""
+    _add_traced_node(workflow, "prescreening_agent", prescreening)
+    _add_traced_node(workflow, "relevancy_analysis_agent", relevancy_analysis)
+    _add_traced_node(workflow, "database_agent", database)
 
     # Conditional branch for relevancy analysis
     workflow.add_conditional_edges(
-        "standardization_agent",
+        "prescreening_agent",
         should_run_analysis,
         {
             "run_analysis": "relevancy_analysis_agent",
             "skip_analysis": "database_agent"  # <-- Skip directly to saving
         }
     )
-    
+
     # Both paths now lead to the database agent
     workflow.add_edge("relevancy_analysis_agent", "database_agent")
-    
+
     # The final step is saving to the database
     workflow.add_edge("database_agent", END)
 
-    # Compile the graph
-    app = workflow.compile()
-    return app
+def _add_extraction_path(workflow, ingestion, dedup, extraction, standardization, next_node):
+    """
+    Adds ingestion -> dedup -> compaction -> extraction -> standardization, starting the
+    graph and continuing at `next_node`. Duplicates go from dedup straight to `next_node`.
+    """
+    _add_traced_node(workflow, "ingestion_agent", ingestion)
+    _add_traced_node(workflow, "dedup_agent", dedup)
+    _add_traced_node(workflow, "compaction_agent", compaction_agent)
+    _add_traced_node(workflow, "extraction_agent", extraction)
+    _add_traced_node(workflow, "standardization_agent", standardization)
+
+    workflow.set_entry_point("ingestion_agent")
+    workflow.add_edge("ingestion_agent", "dedup_agent")
+    workflow.add_conditional_edges(
+        "dedup_agent",
+        should_extract,
+        {
+            "extract": "compaction_agent",
+            "duplicate": next_node
+        }
+    )
+    workflow.add_edge("compaction_agent", "extraction_agent")
+    workflow.add_edge("extraction_agent", "standardization_agent")
+    workflow.add_edge("standardization_agent", next_node)
+
+def _build_workflow(ingestion, dedup, extraction, standardization, prescreening, relevancy_analysis, database, checkpointer=None):
+    """
+    Wires the given agent callables into the resume processing state graph.
+
+    Args:
+        checkpointer (Optional[BaseCheckpointSaver]): Saves the state after every node.
+
+    Returns:
+        CompiledGraph: The compiled LangGraph application.
+    """
+    workflow = StateGraph(AgentState)
+    _add_extraction_path(workflow, ingestion, dedup, extraction, standardization, "prescreening_agent")
+    _add_analysis_path(workflow, prescreening, relevancy_analysis, database)
+    return workflow.compile(checkpointer=checkpointer)
+
+def _build_extraction_workflow(ingestion, dedup, extraction, standardization):
+    workflow = StateGraph(AgentState)
+    _add_extraction_path(workflow, ingestion, dedup, extraction, standardization, END)
+    return workflow.compile()
+
+def _build_analysis_workflow(prescreening, relevancy_analysis, database):
+    workflow = StateGraph(AgentState)
+    _add_analysis_path(workflow, prescreening, relevancy_analysis, database)
+    workflow.set_entry_point("prescreening_agent")
+    return workflow.compile()
+
+def create_workflow(checkpointer=None):
+    """
+    Creates the LangGraph workflow for processing resumes.
+
+    Defines the nodes (agents) and edges (transitions) of the state graph
+    that orchestrates the resume processing pipeline.
+
+    Args:
+        checkpointer (Optional[BaseCheckpointSaver]): Saves the state after every node, so a
+            failed run can be resumed (see `checkpoints.ResumableWorkflow`). Every invoke
+            then needs a thread ID in its config.
+
+    Returns:
+        CompiledGraph: The compiled LangGraph application ready for invocation.
+    """
+    return _build_workflow(
+        ingestion_agent,
+        dedup_agent,
+        extraction_agent,
+        standardization_agent,
+        prescreening_agent,
+        relevancy_analysis_agent,
+        database_agent,
+        checkpointer,
+    )
+
+def create_async_workflow(checkpointer=None):
+    """
+    Creates the async variant of the resume processing workflow.
+
+    The graph has the same shape as `create_workflow()`, but its LLM nodes use
+    `ainvoke` and PDF/SQLite work is offloaded to worker threads. Invoke it with
+    `ainvoke`/`abatch`/`astream` to keep many resumes in flight on one event loop.
+
+    Args:
+        checkpointer (Optional[BaseCheckpointSaver]): See `create_workflow`.
+
+    Returns:
+        CompiledGraph: The compiled LangGraph application ready for async invocation.
+    """
+    return _build_workflow(
+        aingestion_agent,
+        adedup_agent,
+        aextraction_agent,
+        standardization_agent,
+        prescreening_agent,
+        arelevancy_analysis_agent,
+        adatabase_agent,
+        checkpointer,
+    )
+
+def create_extraction_workflow(use_async: bool = False):
+    """
+    Creates the first half of the resume workflow: ingestion, dedup, compaction, extraction
+    and standardization. Duplicates of stored resumes skip straight to the end with the
+    stored report.
+
+    Together with `create_analysis_workflow()` this lets a batch be split in two phases,
+    so that all resumes can be pre-screened at once (`prescreening.prescreen_states`)
+    before any LLM relevancy analysis is started.
+
+    Args:
+        use_async (bool): Build the graph from the async agents.
+
+    Returns:
+        CompiledGraph: The compiled LangGraph application. Its result contains 'final_report'.
+    """
+    if use_async:
+        return _build_extraction_workflow(aingestion_agent, adedup_agent, aextraction_agent, standardization_agent)
+    return _build_extraction_workflow(ingestion_agent, dedup_agent, extraction_agent, standardization_agent)
+
+def create_analysis_workflow(use_async: bool = False):
+    """
+    Creates the second half of the resume workflow: pre-screening, relevancy analysis and saving.
+
+    The input state must already contain 'final_report' and 'job_id'.
+
+    Args:
+        use_async (bool): Build the graph from the async agents.
+
+    Returns:
+        CompiledGraph: The compiled LangGraph application.
+    """
+    if use_async:
+        return _build_analysis_workflow(prescreening_agent, arelevancy_analysis_agent, adatabase_agent)
+    return _build_analysis_workflow(prescreening_agent, relevancy_analysis_agent, database_agent)
 
 # To test the graph directly
 if __name__ == '__main__':
@@ -0,0 +1,82 @@
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+logger = logging.getLogger(__name__)
+
+EXTRACTION_MODEL = "gemini-2.0-flash-001"
+EMAIL_MODEL = "gemini-1.5-flash"
+# Attempts made by the client itself. Retries and backoff are handled by src.rate_limit,
+# which shares them across all calls, so the client should not retry on its own as well.
+LLM_CLIENT_MAX_RETRIES = int(os.getenv("LLM_CLIENT_MAX_RETRIES", "1"))
+
+# Chat model used for each role. The relevancy analysis shares the extraction model.
+MODEL_NAMES = {
+    "extraction": EXTRACTION_MODEL,
+    "email": EMAIL_MODEL,
+}
+
+_lock = threading.Lock()
+_models: Dict[str, Any] = {}
+_structured: Dict[Tuple[str, type], Any] = {}
+
+def _create_chat_model(model_name: str):
+    # Imported here: langchain_google_genai and the google-genai SDK take most of a
+    # second to import, which processes that never call the LLM should not pay for.
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY is not set.")
+    logger.info(f"---LLM: Creating client for {model_name}---")
+    return ChatGoogleGenerativeAI(model=model_name, google_api_key=api_key, max_retries=LLM_CLIENT_MAX_RETRIES)
+
+def get_llm(role: str = "extraction"):
+    """
+    Returns the chat model for `role` ("extraction" or "email").
+
+    The client is created on first use and shared by all callers and threads.
+
+    Raises:
+        ValueError: If GEMINI_API_KEY is not set when the client is created.
+    """
+    model = _models.get(role)
+    if model is not None:
+        return model
+    with _lock:
+        if role not in _models:
+            _models[role] = _create_chat_model(MODEL_NAMES[role])
+        return _models[role]
+
+def get_structured_llm(schema: type, role: str = "extraction"):
+    """Returns `get_llm(role).with_structured_output(schema)`, built once per role and schema."""
+    key = (role, schema)
+    structured = _structured.get(key)
+    if structured is not None:
+        return structured
+    model = get_llm(role)
+    with _lock:
+        if key not in _structured:
+            _structured[key] = model.with_structured_output(schema)
+        return _structured[key]
+
+def set_llm(model: Optional[Any], role: str = "extraction"):
+    """
+    Replaces the chat model for `role`, e.g. with a fake in benchmarks.
+
+    Args:
+        model: Any object with `with_structured_output(schema)`. None drops the current
+               model, so the next `get_llm` creates a new client.
+        role (str): "extraction" or "email".
+    """
+    with _lock:
+        if model is None:
+            _models.pop(role, None)
+        else:
+            _models[role] = model
+        for key in [key for key in _structured if key[0] == role]:
+            del _structured[key]
@@ -0,0 +1,154 @@
+import os
+import atexit
+import hashlib
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, BinaryIO, Optional, Tuple, Union
+
+from src.tracing import record_retry
+
+logger = logging.getLogger(__name__)
+
+# Only the first pages of a resume are parsed; anything longer is almost always an
+# attachment (publications, certificates) that the extraction prompt does not need.
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+# Upper bound on the characters kept from one PDF.
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "100000"))
+# Worker processes for PDF parsing. Parsing is CPU-bound and holds the GIL, so threads
+# do not help; with 1 (or on a single core) PDFs are parsed in the calling thread.
+PDF_PARSE_PROCESSES = int(os.getenv("PDF_PARSE_PROCESSES", str(os.cpu_count() or 1)))
+
+# Separator placed between pages of the extracted text. A form feed keeps page
+# boundaries visible to later steps without adding visible text.
+PAGE_SEPARATOR = "\f"
+
+if TYPE_CHECKING:
+    import pymupdf
+
+PdfSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+def _open_document(source: PdfSource) -> "pymupdf.Document":
+    # Imported on first use: PyMuPDF takes ~0.2 s to load, and with the process pool
+    # only the worker processes ever parse.
+    import pymupdf
+
+    if isinstance(source, str):
+        return pymupdf.open(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pymupdf.open(stream=source, filetype="pdf")
+    return pymupdf.open(stream=source.read(), filetype="pdf")
+
+def extract_pdf_pages(
+    source: PdfSource,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> Tuple[str, int]:
+    """
+    Extracts the text of a PDF page by page, stopping at the page and character caps.
+
+    Args:
+        source: A file path, the PDF bytes, or a binary file object.
+        max_pages (Optional[int]): Maximum number of pages to read. Defaults to PDF_MAX_PAGES.
+        max_chars (Optional[int]): Maximum number of characters to return. Defaults to PDF_MAX_CHARS.
+
+    Returns:
+        tuple: (text, pages_read). Pages are joined with PAGE_SEPARATOR.
+
+    Raises:
+        ValueError: If the document has no pages.
+    """
+    if max_pages is None:
+        max_pages = PDF_MAX_PAGES
+    if max_chars is None:
+        max_chars = PDF_MAX_CHARS
+
+    with _open_document(source) as document:
+        page_count = document.page_count
+        if page_count == 0:
+            raise ValueError("Could not load any pages from the PDF.")
+
+        pages = []
+        total_chars = 0
+        for page_number in range(min(page_count, max_pages)):
+            text = document.load_page(page_number).get_text("text")
+            pages.append(text)
+            total_chars += len(text) + len(PAGE_SEPARATOR)
+            if total_chars >= max_chars:
+                break
+
+    if len(pages) < page_count:
+        logger.info(f"---PDF: Read {len(pages)} of {page_count} pages (page/character cap reached)---")
+    return PAGE_SEPARATOR.join(pages)[:max_chars], len(pages)
+
+def parse_pdf_file(file_path: str) -> Tuple[str, str]:
+    """
+    Reads a PDF once, hashing the bytes and parsing them from memory.
+
+    Args:
+        file_path (str): The path to the PDF file.
+
+    Returns:
+        tuple: (text, sha256 hex digest of the file).
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    text, _ = extract_pdf_pages(data)
+    return text, hashlib.sha256(data).hexdigest()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if PDF_PARSE_PROCESSES <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # Not forked: the pool is started from threaded code (Gradio, the LangGraph
+            # executor, the candidate writer), and a forked child can inherit a held lock.
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_PARSE_PROCESSES,
+                mp_context=multiprocessing.get_context(start_method),
+            )
+        return _pool
+
+def shutdown_parse_pool():
+    """Stops the PDF parsing worker processes, if they were started."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+atexit.register(shutdown_parse_pool)
+
+def submit_pdf_parse(file_path: str) -> Future:
+    """
+    Schedules `parse_pdf_file` on the shared process pool.
+
+    Returns:
+        Future: Resolves to (text, sha256 hex digest). When the pool is disabled the
+                file is parsed right away and an already completed Future is returned.
+    """
+    pool = _get_pool()
+    if pool is not None:
+        try:
+            return pool.submit(parse_pdf_file, file_path)
+        except BrokenProcessPool:
+            # A worker died (e.g. a malformed PDF crashed MuPDF); start a fresh pool.
+            logger.warning("---PDF: Parsing pool was broken; restarting it---")
+            record_retry()
+            shutdown_parse_pool()
+            return _get_pool().submit(parse_pdf_file, file_path)
+
+    future: Future = Future()
+    try:
+        future.set_result(parse_pdf_file(file_path))
+    except Exception as e:
+        future.set_exception(e)
+    return future
@@ -0,0 +1,199 @@
+import os
+import re
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Resumes scoring below this (0-100) are not sent to the LLM relevancy analysis.
+PRESCREEN_MIN_SCORE = float(os.getenv("PRESCREEN_MIN_SCORE", "5"))
+# When set, at most this many resumes per batch are sent to the LLM relevancy analysis.
+# 0 disables the cap.
+PRESCREEN_TOP_K = int(os.getenv("PRESCREEN_TOP_K", "0"))
+
+# Okapi BM25 parameters.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Term weights per resume field: a skill listed explicitly counts more than a word
+# that happens to appear in a job description paragraph.
+FIELD_WEIGHTS = {
+    "technical_skills": 3.0,
+    "title": 2.0,
+    "description": 1.0,
+}
+
+PRESCREEN_SKIP_SUMMARY = (
+    "Pre-screened out by the local keyword match (score {score:.0f}/100); "
+    "the LLM relevancy analysis was skipped."
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# Common English and job-ad filler words that carry no signal for matching.
+_STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could
+do does for from has have having he her his how i if in into is it its job looking
+may more most must of on or our over role should so some such than that the their them
+then there these they this those to under up us we well were what when where which while
+who will with within work working would you your years year experience team teams
+ability strong knowledge skills skill plus including etc good excellent required
+preferred responsibilities requirements candidate candidates join new using
+""".split())
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cases `text` and splits it into terms, keeping tokens like 'c++', 'c#' and 'node.js'."""
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def weighted_fields(report: Dict[str, Any]) -> Iterable[Tuple[List[str], float]]:
+    skills = report.get("technical_skills") or []
+    yield tokenize(" ".join(str(skill) for skill in skills)), FIELD_WEIGHTS["technical_skills"]
+    for experience in report.get("experience") or []:
+        yield tokenize(experience.get("title")), FIELD_WEIGHTS["title"]
+        yield tokenize(experience.get("description")), FIELD_WEIGHTS["description"]
+
+def _query_terms(job_description: str) -> Tuple[Dict[str, int], np.ndarray]:
+    counts: Dict[str, int] = {}
+    for token in tokenize(job_description):
+        if token not in _STOPWORDS and len(token) > 1:
+            counts[token] = counts.get(token, 0) + 1
+    index = {term: i for i, term in enumerate(counts)}
+    return index, np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+
+def score_resumes(reports: List[Dict[str, Any]], job_description: str) -> np.ndarray:
+    """
+    Scores standardized resumes against a job description with a field-weighted BM25.
+
+    The whole batch is scored at once: term frequencies are accumulated into a
+    (resumes x job-description terms) matrix and IDF, length normalization and the
+    final scores are computed with NumPy over that matrix. IDF is taken from the batch
+    itself, so terms that few resumes contain count for more.
+
+    Args:
+        reports (List[dict]): Standardized resumes ('final_report' values). None entries score 0.
+        job_description (str): The job description to match against.
+
+    Returns:
+        np.ndarray: One score per resume between 0 and 100. 100 means the resume
+                    covers every (IDF-weighted) job description term at least once.
+    """
+    n_docs = len(reports)
+    term_index, query_tf = _query_terms(job_description or "")
+    if n_docs == 0 or not term_index:
+        return np.zeros(n_docs)
+
+    rows: List[int] = []
+    cols: List[int] = []
+    weights: List[float] = []
+    doc_lengths = np.zeros(n_docs)
+    for doc, report in enumerate(reports):
+        if not report:
+            continue
+        for tokens, weight in weighted_fields(report):
+            doc_lengths[doc] += weight * len(tokens)
+            for token in tokens:
+                col = term_index.get(token)
+                if col is not None:
+                    rows.append(doc)
+                    cols.append(col)
+                    weights.append(weight)
+
+    tf = np.zeros((n_docs, len(term_index)))
+    np.add.at(tf, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), weights)
+
+    # Rare terms weigh up to a few times more than common ones, but a term that every
+    # resume contains still counts: the score is also compared against a fixed threshold.
+    # A single document says nothing about rarity, so all its terms weigh the same.
+    idf = np.ones(len(term_index))
+    if n_docs > 1:
+        df = np.count_nonzero(tf, axis=0)
+        idf += np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+    avg_length = doc_lengths.mean() or 1.0
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / avg_length)
+    saturated = tf * (BM25_K1 + 1) / (tf + length_norm[:, None])
+
+    query_weights = idf * query_tf
+    scores = saturated @ query_weights
+    # A resume of average length mentioning every term once scores sum(query_weights).
+    full_coverage = query_weights.sum()
+    if full_coverage <= 0:
+        return np.zeros(n_docs)
+    return np.clip(100.0 * scores / full_coverage, 0.0, 100.0)
+
+def select_for_analysis(
+    scores: np.ndarray,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Decides which resumes go on to the LLM relevancy analysis.
+
+    A resume is selected if its score is at least `min_score`; of those, only the
+    `top_k` best are kept when `top_k` is positive.
+
+    Args:
+        scores (np.ndarray): Scores from `score_resumes`.
+        top_k (Optional[int]): Maximum number of resumes to select. Defaults to PRESCREEN_TOP_K.
+        min_score (Optional[float]): Minimum score to be selected. Defaults to PRESCREEN_MIN_SCORE.
+
+    Returns:
+        np.ndarray: Boolean mask, True for resumes that should be analyzed.
+    """
+    if top_k is None:
+        top_k = PRESCREEN_TOP_K
+    if min_score is None:
+        min_score = PRESCREEN_MIN_SCORE
+
+    scores = np.asarray(scores, dtype=np.float64)
+    selected = scores >= min_score
+    if top_k and top_k > 0 and np.count_nonzero(selected) > top_k:
+        ranked = np.where(selected, scores, -np.inf)
+        keep = np.argpartition(-ranked, top_k - 1)[:top_k]
+        selected = np.zeros_like(selected)
+        selected[keep] = True
+    return selected
+
+def prescreen_updates(score: float, selected: bool) -> Dict[str, Any]:
+    """
+    Builds the state update for a pre-screened resume.
+
+    The local score is only kept as 'prescreen_score': it is not on the LLM's relevancy
+    scale, so skipped resumes get no 'match_score' and rank after every analyzed one.
+    """
+    update: Dict[str, Any] = {"prescreen_score": float(score), "run_analysis": bool(selected)}
+    if not selected:
+        update["match_score"] = None
+        update["match_summary"] = PRESCREEN_SKIP_SUMMARY.format(score=score)
+    return update
+
+def prescreen_states(
+    states: List[Dict[str, Any]],
+    job_description: str,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Pre-screens a whole batch of workflow states in one pass.
+
+    Args:
+        states (List[dict]): States that already contain a 'final_report'.
+        job_description (str): The job description to match against.
+        top_k (Optional[int]): See `select_for_analysis`.
+        min_score (Optional[float]): See `select_for_analysis`.
+
+    Returns:
+        List[dict]: New states with 'prescreen_score' and 'run_analysis' set, and no
+                    'match_score' for resumes that will not be analyzed.
+    """
+    scores = score_resumes([state.get("final_report") for state in states], job_description)
+    selected = select_for_analysis(scores, top_k=top_k, min_score=min_score)
+    logger.info(f"---PRESCREEN: {int(selected.sum())} of {len(states)} resume(s) selected for LLM analysis---")
+    return [
+        {**state, **prescreen_updates(score, keep)}
+        for state, score, keep in zip(states, scores, selected)
+    ]
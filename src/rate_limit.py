@@ -0,0 +1,364 @@
+import os
+import re
+import time
+import heapq
+import random
+import asyncio
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.exceptions import ModelAPIError, ModelConnectionError, ModelRateLimitError, ModelTimeoutError
+
+from src.compaction import estimate_tokens
+from src.tracing import llm_timer, record_queue_wait, record_retry
+
+logger = logging.getLogger(__name__)
+
+# Gemini quota of the API key, shared by every chain in the process.
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "300"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "1000000"))
+# Adaptive concurrency: starts at LLM_INITIAL_CONCURRENCY, grows by about one per round of
+# successful calls up to LLM_MAX_CONCURRENCY, and is halved on a 429.
+LLM_INITIAL_CONCURRENCY = int(os.getenv("LLM_INITIAL_CONCURRENCY", "4"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_MIN_CONCURRENCY = 1
+# Retries of a failed call (429, 5xx, timeouts), with full-jitter exponential backoff.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "60"))
+# Tokens reserved per call on top of the prompt: system prompt plus structured output.
+LLM_OVERHEAD_TOKENS = int(os.getenv("LLM_OVERHEAD_TOKENS", "700"))
+
+# Priority lanes. Waiting interactive calls are always granted before bulk ones.
+INTERACTIVE = "interactive"
+BULK = "bulk"
+_LANES = {INTERACTIVE: 0, BULK: 1}
+
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("cv_scout_llm_lane", default=INTERACTIVE)
+
+@contextmanager
+def llm_priority(lane: str):
+    """
+    Runs the LLM calls made inside the block (including graph nodes and tasks started
+    from it) in the given lane: INTERACTIVE (default) or BULK.
+    """
+    if lane not in _LANES:
+        raise ValueError(f"Unknown priority lane: {lane}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+_RETRY_AFTER = re.compile(r"retry(?:[ _-]?(?:in|after|delay))?\W{0,5}(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+def _status_code(error: BaseException) -> Optional[int]:
+    for attribute in ("code", "status_code"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for quota/throttling errors (HTTP 429, RESOURCE_EXHAUSTED)."""
+    if isinstance(error, ModelRateLimitError) or _status_code(error) == 429:
+        return True
+    message = str(error)
+    return "RESOURCE_EXHAUSTED" in message or "429" in message.split(" ", 1)[0]
+
+def is_retryable_error(error: BaseException) -> bool:
+    """True for errors worth retrying: throttling, 5xx, timeouts and connection errors."""
+    if is_rate_limit_error(error):
+        return True
+    if isinstance(error, (ModelAPIError, ModelConnectionError, ModelTimeoutError, TimeoutError, ConnectionError)):
+        return True
+    code = _status_code(error)
+    if code is not None:
+        return code >= 500
+    message = str(error)
+    return "UNAVAILABLE" in message or "DEADLINE_EXCEEDED" in message
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """The delay the API asked for ("Please retry in 21s", retryDelay '21s'), if any."""
+    match = _RETRY_AFTER.search(str(error))
+    return float(match.group(1)) if match else None
+
+def retry_delay(attempt: int, error: Optional[BaseException] = None) -> float:
+    """Full-jitter exponential backoff for retry `attempt` (0-based), at least the API's retry delay."""
+    delay = random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+    requested = retry_after_seconds(error) if error is not None else None
+    return max(delay, requested or 0.0)
+
+def estimate_request_tokens(inputs: Any) -> int:
+    """Tokens reserved for a call: the prompt variables plus LLM_OVERHEAD_TOKENS."""
+    if isinstance(inputs, dict):
+        text_size = sum(estimate_tokens(str(value)) for value in inputs.values())
+    else:
+        text_size = estimate_tokens(str(inputs))
+    return text_size + LLM_OVERHEAD_TOKENS
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` per second, holding at most one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class AdaptiveRateLimiter:
+    """
+    Process-wide admission control for LLM calls.
+
+    A call is admitted when it is first in line (interactive lane before bulk lane, then
+    first come first served), fewer than `limit` calls are in flight, the request and
+    token buckets allow it, and no 429 pause is active. `limit` follows AIMD: +1/limit
+    per successful call and halved on a 429, at most once per round of calls. Works for
+    threads and for coroutines. Only the first waiter in line can be admitted, so a state
+    change wakes just that one: a thread through the condition, a coroutine by resolving
+    its future on its event loop. A coroutine waiting for the buckets to refill or a
+    pause to end also sets a timer for that moment instead of polling.
+    """
+
+    def __init__(
+        self,
+        rpm: float = GEMINI_RPM,
+        tpm: float = GEMINI_TPM,
+        initial_concurrency: int = LLM_INITIAL_CONCURRENCY,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        min_concurrency: int = LLM_MIN_CONCURRENCY,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.in_flight = 0
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self._cond = threading.Condition()
+        self._queue: list = []
+        # Queue entry -> (event loop, future) of each waiting coroutine
+        self._async_waiters: Dict[Tuple[int, int], Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._sequence = itertools.count()
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+        self._counters = {"granted": 0, "throttled": 0, "failed": 0}
+
+    def _try_grant(self, entry: Tuple[int, int], tokens: float) -> Optional[float]:
+        """Under the lock: 0 if `entry` was admitted, else seconds to wait (None: until notified)."""
+        if self._queue[0] != entry or self.in_flight >= int(self.limit):
+            return None
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        wait = max(self._requests.wait_time(1, now), self._tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        self.in_flight += 1
+        self._counters["granted"] += 1
+        heapq.heappop(self._queue)
+        self._notify()
+        return 0.0
+
+    def _notify(self):
+        """Under the lock: wakes the waiting threads and the coroutine first in line, if any."""
+        self._cond.notify_all()
+        if self._queue:
+            waiter = self._async_waiters.get(self._queue[0])
+            if waiter is not None:
+                loop, future = waiter
+                loop.call_soon_threadsafe(_resolve, future)
+
+    def _enqueue(self, lane: str) -> Tuple[int, int]:
+        entry = (_LANES[lane], next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+        return entry
+
+    def _abandon(self, entry: Tuple[int, int]):
+        with self._cond:
+            if entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            self._notify()
+
+    def acquire(self, tokens: float, lane: str = INTERACTIVE) -> float:
+        """Blocks until a call may start. Returns the seconds waited."""
+        start = time.monotonic()
+        entry = self._enqueue(lane)
+        try:
+            with self._cond:
+                while True:
+                    wait = self._try_grant(entry, tokens)
+                    if wait == 0:
+                        return time.monotonic() - start
+                    self._cond.wait(timeout=1.0 if wait is None else wait)
+        except BaseException:
+            self._abandon(entry)
+            raise
+
+    async def aacquire(self, tokens: float, lane: str = INTERACTIVE) -> float:
+        """Async `acquire`: waits without blocking the event loop."""
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        entry = self._enqueue(lane)
+        try:
+            while True:
+                future = loop.create_future()
+                with self._cond:
+                    wait = self._try_grant(entry, tokens)
+                    if wait == 0:
+                        return time.monotonic() - start
+                    self._async_waiters[entry] = (loop, future)
+                timer = None if wait is None else loop.call_later(wait, _resolve, future)
+                try:
+                    await future
+                finally:
+                    if timer is not None:
+                        timer.cancel()
+                    with self._cond:
+                        self._async_waiters.pop(entry, None)
+        except BaseException:
+            self._abandon(entry)
+            raise
+
+    def release(self, started_at: float, throttled: bool = False, failed: bool = False, retry_after: Optional[float] = None):
+        """
+        Ends a call admitted at `started_at` (time.monotonic()) and adapts the limit.
+
+        Args:
+            started_at (float): When the call was admitted.
+            throttled (bool): The call was rejected with a 429.
+            failed (bool): The call failed for another reason; the limit is left as is.
+            retry_after (Optional[float]): Pause all calls for this long (from the 429).
+        """
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self._counters["throttled"] += 1
+                # Calls admitted before the last decrease saw the old limit; one cut per round.
+                if started_at >= self._last_decrease:
+                    self.limit = max(float(self.min_concurrency), self.limit / 2)
+                    self._last_decrease = now
+                    logger.warning(f"---RATE LIMIT: Throttled; LLM concurrency limit lowered to {int(self.limit)}---")
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif failed:
+                self._counters["failed"] += 1
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limit, calls in flight and waiting per lane, and counters since start."""
+        with self._cond:
+            waiting = {lane: sum(1 for priority, _ in self._queue if priority == rank) for lane, rank in _LANES.items()}
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": waiting,
+                "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 1),
+                **self._counters,
+            }
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+_limiter: Optional[AdaptiveRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Returns the process-wide limiter shared by all Gemini calls."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveRateLimiter()
+        return _limiter
+
+def set_rate_limiter(limiter: Optional[AdaptiveRateLimiter]):
+    """Replaces the process-wide limiter (None: a new one with the default settings on next use)."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
+
+def _after_failure(limiter: AdaptiveRateLimiter, started_at: float, error: Exception, attempt: int) -> float:
+    """Releases a failed call; returns the backoff before the retry, or re-raises if it should not be retried."""
+    throttled = is_rate_limit_error(error)
+    limiter.release(started_at, throttled=throttled, failed=not throttled, retry_after=retry_after_seconds(error))
+    if attempt >= LLM_MAX_RETRIES or not is_retryable_error(error):
+        raise error
+    delay = retry_delay(attempt, error)
+    record_retry()
+    logger.warning(f"---RATE LIMIT: LLM call failed ({type(error).__name__}); retry {attempt + 1} in {delay:.1f}s---")
+    return delay
+
+def invoke_llm(chain, inputs: Dict[str, Any], estimated_tokens: Optional[int] = None):
+    """
+    Invokes an LLM chain through the shared limiter, retrying throttled and transient failures.
+
+    Args:
+        chain: A runnable ending in a Gemini chat model.
+        inputs (dict): The chain's input.
+        estimated_tokens (Optional[int]): Tokens to reserve. Defaults to `estimate_request_tokens(inputs)`.
+
+    Returns:
+        The chain's output.
+
+    Raises:
+        Exception: The last error, when it is not retryable or LLM_MAX_RETRIES is exhausted.
+    """
+    limiter = get_rate_limiter()
+    tokens = estimated_tokens or estimate_request_tokens(inputs)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        record_queue_wait(limiter.acquire(tokens, _lane.get()))
+        started_at = time.monotonic()
+        try:
+            with llm_timer():
+                result = chain.invoke(inputs)
+        except Exception as e:
+            time.sleep(_after_failure(limiter, started_at, e, attempt))
+            continue
+        limiter.release(started_at)
+        return result
+
+async def ainvoke_llm(chain, inputs: Dict[str, Any], estimated_tokens: Optional[int] = None):
+    """Async counterpart of `invoke_llm`, using `ainvoke`."""
+    limiter = get_rate_limiter()
+    tokens = estimated_tokens or estimate_request_tokens(inputs)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        record_queue_wait(await limiter.aacquire(tokens, _lane.get()))
+        started_at = time.monotonic()
+        try:
+            with llm_timer():
+                result = await chain.ainvoke(inputs)
+        except asyncio.CancelledError:
+            limiter.release(started_at, failed=True)
+            raise
+        except Exception as e:
+            await asyncio.sleep(_after_failure(limiter, started_at, e, attempt))
+            continue
+        limiter.release(started_at)
+        return result
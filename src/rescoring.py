@@ -0,0 +1,172 @@
+import os
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src import database
+from src.batch import iter_batch_results, aiter_batch_results
+from src.graph import create_analysis_workflow
+from src.prescreening import prescreen_states
+from src.rate_limit import BULK, llm_priority
+from src.vector_index import find_matching_candidates
+
+logger = logging.getLogger(__name__)
+
+# Stored candidates loaded and pre-screened at a time when re-scoring.
+RESCORING_BATCH_SIZE = int(os.getenv("RESCORING_BATCH_SIZE", "1000"))
+
+_workflows: Dict[bool, Any] = {}
+
+def _get_workflow(use_async: bool):
+    if use_async not in _workflows:
+        _workflows[use_async] = create_analysis_workflow(use_async=use_async)
+    return _workflows[use_async]
+
+def prepare_rescoring(
+    job_id: int,
+    candidate_ids: Optional[Iterable[int]] = None,
+    talent_pool_top_k: Optional[int] = None,
+    prescreen_top_k: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Tuple[Iterator[List[Dict[str, Any]]], Dict[str, int]]:
+    """
+    Builds the workflow states for scoring stored candidates against a job.
+
+    Candidates are taken from `candidate_ids` or, when it is None, from the
+    `talent_pool_top_k` best vector index matches for the job description. Candidates
+    the LLM has already scored for this job are skipped; requested candidates that were
+    pre-screened out are screened again.
+
+    Otherwise every stored candidate whose outcome for the job is not known yet is
+    scored. Candidates pre-screened out before are then skipped too: a job's description
+    never changes, so screening them again would give the same result.
+
+    Reports are loaded and pre-screened `batch_size` candidates at a time, as the
+    batches are consumed, so memory does not grow with the talent pool.
+
+    Args:
+        job_id (int): The job to score candidates against.
+        candidate_ids (Optional[Iterable[int]]): The candidates to score.
+        talent_pool_top_k (Optional[int]): Score the best talent pool matches instead.
+        prescreen_top_k (Optional[int]): Passed to `prescreening.prescreen_states` for each batch.
+        batch_size (Optional[int]): Candidates per batch. Defaults to RESCORING_BATCH_SIZE.
+
+    Returns:
+        tuple: (batches, stats). Each batch is a list of states that start the analysis
+               workflow with a known 'candidate_id' and 'final_report', so nothing is
+               re-ingested or re-extracted. 'to_analyze', 'prescreened_out' and 'missing'
+               in stats are filled in as the batches are consumed.
+
+    Raises:
+        ValueError: If the job does not exist.
+    """
+    job_description = database.get_job_description(job_id)
+    if job_description is None:
+        raise ValueError(f"Job {job_id} does not exist.")
+    batch_size = batch_size or RESCORING_BATCH_SIZE
+
+    if candidate_ids is None and talent_pool_top_k:
+        matches = find_matching_candidates(job_description, top_k=talent_pool_top_k)
+        candidate_ids = [match["candidate_id"] for match in matches]
+
+    stats = {"to_analyze": 0, "prescreened_out": 0}
+    if candidate_ids is None:
+        already_scored, already_prescreened_out = database.count_decided_candidates(job_id)
+        stats.update(
+            requested=database.count_candidates(),
+            already_scored=already_scored,
+            already_prescreened_out=already_prescreened_out,
+        )
+        reports = database.iter_candidate_reports(batch_size, undecided_for_job=job_id)
+        chunks = (dict(chunk) for chunk in _chunked(reports, batch_size))
+    else:
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        already_scored = database.get_scored_candidate_ids(job_id)
+        pending = [candidate_id for candidate_id in candidate_ids if candidate_id not in already_scored]
+        stats.update(requested=len(candidate_ids), already_scored=len(candidate_ids) - len(pending))
+        chunks = (database.get_candidate_reports(chunk) for chunk in _chunked(pending, batch_size))
+
+    def batches() -> Iterator[List[Dict[str, Any]]]:
+        loaded = 0
+        for reports in chunks:
+            states = [
+                {
+                    "job_id": job_id,
+                    "job_description": job_description,
+                    "candidate_id": candidate_id,
+                    "final_report": report,
+                }
+                for candidate_id, report in reports.items()
+            ]
+            states = prescreen_states(states, job_description, top_k=prescreen_top_k)
+            to_analyze = sum(1 for state in states if state["run_analysis"])
+            loaded += len(states)
+            stats["to_analyze"] += to_analyze
+            stats["prescreened_out"] += len(states) - to_analyze
+            yield states
+        decided = stats["already_scored"] + stats.get("already_prescreened_out", 0)
+        stats["missing"] = stats["requested"] - decided - loaded
+        logger.info(f"---RESCORING: Job {job_id}: {stats}---")
+
+    return batches(), stats
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _collect(stats: Dict[str, int], inputs, result_state, error):
+    if error is not None or not result_state or result_state.get("candidate_id") is None:
+        logger.error(f"---RESCORING: Could not score candidate {inputs.get('candidate_id')}: {error}---")
+        stats["failed"] += 1
+    else:
+        stats["saved"] += 1
+
+def rescore_candidates(
+    job_id: int,
+    candidate_ids: Optional[Iterable[int]] = None,
+    talent_pool_top_k: Optional[int] = None,
+    prescreen_top_k: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Scores stored candidates against a job without re-ingesting their PDFs.
+
+    Only pre-screening, relevancy analysis and saving the application are run.
+    See `prepare_rescoring` for how candidates are selected.
+
+    Returns:
+        dict: Counts of requested, already scored, missing, analyzed, pre-screened out,
+              saved and failed candidates.
+    """
+    batches, stats = prepare_rescoring(job_id, candidate_ids, talent_pool_top_k, prescreen_top_k)
+    stats.update(saved=0, failed=0)
+    states = (state for batch in batches for state in batch)
+    with llm_priority(BULK):
+        for inputs, result_state, error in iter_batch_results(_get_workflow(False), states, max_in_flight=max_in_flight):
+            _collect(stats, inputs, result_state, error)
+    return stats
+
+async def arescore_candidates(
+    job_id: int,
+    candidate_ids: Optional[Iterable[int]] = None,
+    talent_pool_top_k: Optional[int] = None,
+    prescreen_top_k: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Dict[str, int]:
+    """Async counterpart of `rescore_candidates`, using the async analysis workflow."""
+    batches, stats = await asyncio.to_thread(
+        prepare_rescoring, job_id, candidate_ids, talent_pool_top_k, prescreen_top_k
+    )
+    stats.update(saved=0, failed=0)
+    with llm_priority(BULK):
+        # Loading and pre-screening a batch reads SQLite, so it runs off the event loop.
+        while (states := await asyncio.to_thread(next, batches, None)) is not None:
+            async for inputs, result_state, error in aiter_batch_results(_get_workflow(True), states, max_in_flight=max_in_flight):
+                _collect(stats, inputs, result_state, error)
+    return stats
@@ -69,4 +69,8 @@ class StandardizationError(CVScoutError):
  
 class RelevancyAnalysisError(CVScoutError):
     """Exception raised for errors during relevancy analysis."""
-    pass
\ No newline at end of file
+    pass
+
+class EmailGenerationError(CVScoutError):
+    """Exception raised when an email or email template could not be generated."""
+    pass
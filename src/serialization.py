@@ -0,0 +1,96 @@
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+# Experience descriptions longer than this are cut (at a word boundary) in the
+# relevancy prompt. 0 keeps them whole.
+RESUME_DESCRIPTION_MAX_CHARS = int(os.getenv("RESUME_DESCRIPTION_MAX_CHARS", "600"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+def _clean(value: Any) -> str:
+    if value is None:
+        return ""
+    return _WHITESPACE.sub(" ", str(value)).strip()
+
+def _join(parts: Iterable[Any], separator: str = " | ") -> str:
+    return separator.join(part for part in (_clean(p) for p in parts) if part)
+
+def _truncate(text: str, max_chars: int) -> str:
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut.rstrip(",.;:") + "…"
+
+def serialize_resume(
+    report: Dict[str, Any],
+    description_max_chars: Optional[int] = None,
+    include_contact: bool = False,
+) -> str:
+    """
+    Serializes a standardized resume (a `Resume` dict) into a terse, line-oriented text.
+
+    One line per fact with short keys (name, skills, lang, edu, exp), empty fields
+    dropped, and experience descriptions indented under their role. The output only
+    depends on the report's content, so it is stable across runs. Compared with the
+    str() of the dict this roughly halves the prompt size, since keys, quotes and
+    None fields are not repeated.
+
+    Example:
+        name: Jane Doe
+        skills: Python, SQL, Docker
+        lang: English, German
+        yoe: 5.5
+        edu: B.Sc. Computer Science | TU Berlin | 2014-2018 | gpa 3.7
+        exp: Backend Engineer @ Acme | 2019-03..present | Berlin
+          Built the billing platform ...
+
+    Args:
+        report (dict): The standardized resume.
+        description_max_chars (Optional[int]): Maximum characters per experience description.
+                                               Defaults to RESUME_DESCRIPTION_MAX_CHARS.
+        include_contact (bool): Include email, phone and profile links. They do not
+                                help the relevancy analysis, so they are left out by default.
+
+    Returns:
+        str: The serialized resume.
+    """
+    if description_max_chars is None:
+        description_max_chars = RESUME_DESCRIPTION_MAX_CHARS
+
+    lines: List[str] = []
+
+    def add(key: str, value: str):
+        if value:
+            lines.append(f"{key}: {value}")
+
+    add("name", _clean(report.get("full_name")))
+    if include_contact:
+        add("contact", _join([report.get("mail"), report.get("phone_number"), report.get("github"), report.get("linkedin")]))
+    add("skills", _join(report.get("technical_skills") or [], ", "))
+    add("lang", _join(report.get("languages") or [], ", "))
+    if report.get("total_experience_years") is not None:
+        add("yoe", _clean(report["total_experience_years"]))
+
+    for education in report.get("education") or []:
+        gpa = _clean(education.get("gpa"))
+        add("edu", _join([
+            education.get("degree"),
+            education.get("institution"),
+            education.get("years"),
+            f"gpa {gpa}" if gpa else None,
+            education.get("location"),
+        ]))
+
+    for experience in report.get("experience") or []:
+        role = _join([experience.get("title"), experience.get("company")], " @ ")
+        # Prefer the ISO dates added by the standardization agent
+        start = experience.get("start_date") or experience.get("start")
+        end = "present" if experience.get("is_current") else experience.get("end_date") or experience.get("end")
+        period = _join([start, end], "..")
+        add("exp", _join([role, period, experience.get("location")]))
+        description = _truncate(_clean(experience.get("description")), description_max_chars)
+        if description:
+            lines.append(f"  {description}")
+
+    return "\n".join(lines)
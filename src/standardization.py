@@ -0,0 +1,439 @@
+import re
+import logging
+from collections import deque
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Canonical skill name -> aliases (matched case-insensitively on word boundaries).
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "JavaScript": ["javascript", "js", "java script", "ecmascript", "es6"],
+    "TypeScript": ["typescript", "ts"],
+    "Python": ["python", "python3", "python 3", "py"],
+    "Java": ["java"],
+    "C": ["c"],
+    "C++": ["c++", "cpp", "cplusplus"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Go": ["go", "golang"],
+    "Rust": ["rust"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "Scala": ["scala"],
+    "R": ["r"],
+    "MATLAB": ["matlab"],
+    "SQL": ["sql"],
+    "PL/SQL": ["pl/sql", "plsql"],
+    "Bash": ["bash", "shell scripting", "shell script"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "React": ["react", "react.js", "reactjs"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "Node.js": ["node", "node.js", "nodejs"],
+    "Next.js": ["next.js", "nextjs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi", "fast api"],
+    "Spring": ["spring", "spring boot", "springboot"],
+    ".NET": [".net", "dotnet", "asp.net", ".net core"],
+    "PostgreSQL": ["postgresql", "postgres", "psql"],
+    "MySQL": ["mysql"],
+    "SQLite": ["sqlite", "sqlite3"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "AWS": ["aws", "amazon web services"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Azure": ["azure", "microsoft azure"],
+    "Git": ["git"],
+    "Linux": ["linux"],
+    "CI/CD": ["ci/cd", "cicd", "ci cd"],
+    "REST": ["rest", "restful", "rest api", "rest apis", "restful api"],
+    "GraphQL": ["graphql"],
+    "gRPC": ["grpc"],
+    "TCP/IP": ["tcp/ip"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning", "dl"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision", "cv"],
+    "TensorFlow": ["tensorflow", "tensor flow"],
+    "PyTorch": ["pytorch", "torch"],
+    "scikit-learn": ["scikit-learn", "scikit learn", "sklearn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "LangChain": ["langchain"],
+    "LangGraph": ["langgraph"],
+    "OpenCV": ["opencv"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "Airflow": ["airflow", "apache airflow"],
+}
+
+# Canonical language name -> aliases.
+LANGUAGE_ALIASES: Dict[str, List[str]] = {
+    "English": ["english", "en", "eng", "ingilizce"],
+    "German": ["german", "deutsch", "de", "almanca"],
+    "French": ["french", "français", "francais", "fr", "fransızca"],
+    "Spanish": ["spanish", "español", "espanol", "es", "ispanyolca"],
+    "Italian": ["italian", "italiano", "it"],
+    "Portuguese": ["portuguese", "português", "pt"],
+    "Dutch": ["dutch", "nederlands", "nl"],
+    "Turkish": ["turkish", "türkçe", "turkce", "tr"],
+    "Arabic": ["arabic", "ar", "arapça"],
+    "Russian": ["russian", "русский", "ru", "rusça"],
+    "Chinese": ["chinese", "mandarin", "zh"],
+    "Japanese": ["japanese", "ja", "japonca"],
+    "Korean": ["korean", "ko"],
+    "Hindi": ["hindi", "hi"],
+    "Polish": ["polish", "pl"],
+    "Ukrainian": ["ukrainian", "uk"],
+    "Greek": ["greek", "el"],
+    "Swedish": ["swedish", "sv"],
+}
+
+# Short or ambiguous aliases that only count when they are the whole entry, never as a
+# match inside a longer one ("C" in "C level", "Go" in "go-to", "IT" in "IT support").
+_EXACT_ONLY_ALIASES = frozenset({"c", "r", "go", "py", "ts", "js", "ml", "dl", "cv", "rest", "node", "spring",
+                                 "en", "eng", "de", "fr", "es", "it", "pt", "nl", "tr", "ar", "ru", "zh",
+                                 "ja", "ko", "hi", "pl", "uk", "el", "sv"})
+
+_ENTRY_SEPARATORS = re.compile(r"\s*[,;|•]\s*")
+_SLASH = re.compile(r"\s*/\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class AliasMatcher:
+    """
+    Aho-Corasick automaton over a set of aliases.
+
+    The automaton is built once, so finding every alias in an entry takes a single
+    pass over its characters, however many aliases there are. Matches must start and
+    end on word boundaries, and overlapping matches resolve to the longest one.
+    """
+
+    def __init__(self, aliases: Dict[str, List[str]], exact_only: Iterable[str] = ()):
+        exact_only = set(exact_only)
+        self.exact: Dict[str, str] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+        for canonical, names in aliases.items():
+            for alias in [canonical.lower(), *names]:
+                alias = alias.lower()
+                self.exact[alias] = canonical
+                if alias not in exact_only:
+                    self._add(alias, canonical)
+        self._build_failure_links()
+
+    def _add(self, alias: str, canonical: str):
+        node = 0
+        for ch in alias:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                nxt = len(self._goto) - 1
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._output[node].append((len(alias), canonical))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[str]:
+        """Returns the canonical names of all aliases found in `text`, in order of appearance."""
+        return [canonical for _, _, canonical in self._find_spans(text)]
+
+    def _find_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """(start, end, canonical name) of each non-overlapping match, in order of appearance."""
+        text = text.lower()
+        matches = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, canonical in self._output[node]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    matches.append((start, end, canonical))
+
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        found, last_end = [], 0
+        for start, end, canonical in matches:
+            if start >= last_end:
+                found.append((start, end, canonical))
+                last_end = end
+        return found
+
+    def _split_entry(self, entry: str) -> List[str]:
+        """
+        Splits an entry into its items on commas, semicolons, bullets and slashes.
+
+        A slash inside a known alias ("CI/CD", "PL/SQL") does not split it.
+        """
+        parts = []
+        for part in _ENTRY_SEPARATORS.split(entry):
+            if not part or part.lower() in self.exact:
+                parts.append(part)
+                continue
+            spans = self._find_spans(part)
+            start = 0
+            for match in _SLASH.finditer(part):
+                if not any(s <= match.start() < e for s, e, _ in spans):
+                    parts.append(part[start:match.start()])
+                    start = match.end()
+            parts.append(part[start:])
+        return [part for part in parts if part]
+
+    def canonicalize(self, entries: Iterable[Any]) -> List[str]:
+        """
+        Maps free-form entries to canonical names, de-duplicated in order.
+
+        Entries are split into items on commas, semicolons, bullets and slashes, so
+        "Go, Rust" and "Kubernetes / Helm" yield both. An item that is exactly an alias
+        maps to it; otherwise every alias found in the item is used ("Python 3 scripting"
+        yields Python). Items without any known alias are kept, with whitespace cleaned up.
+        """
+        result: Dict[str, str] = {}
+        for entry in entries:
+            if entry is None:
+                continue
+            entry = _WHITESPACE.sub(" ", str(entry)).strip()
+            if not entry:
+                continue
+            exact = self.exact.get(entry.lower())
+            parts = [entry] if exact is not None else self._split_entry(entry)
+            for part in parts:
+                exact = self.exact.get(part.lower())
+                names = [exact] if exact is not None else (self.find(part) or [part])
+                for name in names:
+                    result.setdefault(name.lower(), name)
+        return list(result.values())
+
+
+_skill_matcher: Optional[AliasMatcher] = None
+_language_matcher: Optional[AliasMatcher] = None
+
+def get_skill_matcher() -> AliasMatcher:
+    global _skill_matcher
+    if _skill_matcher is None:
+        _skill_matcher = AliasMatcher(SKILL_ALIASES, _EXACT_ONLY_ALIASES)
+    return _skill_matcher
+
+def get_language_matcher() -> AliasMatcher:
+    global _language_matcher
+    if _language_matcher is None:
+        _language_matcher = AliasMatcher(LANGUAGE_ALIASES, _EXACT_ONLY_ALIASES)
+    return _language_matcher
+
+
+# --- Dates ---
+
+PRESENT = "present"
+
+_MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+}
+_PRESENT_PATTERN = re.compile(r"\b(?:present|current|currently|now|today|ongoing|to date|halen|devam)\b")
+_YEAR_MONTH = re.compile(r"\b((?:19|20)\d{2})[-./](\d{1,2})\b")
+_MONTH_YEAR = re.compile(r"\b(\d{1,2})[-./]((?:19|20)\d{2})\b")
+_MONTH_NAME_YEAR = re.compile(r"\b([a-z]{3,9})\.?,?\s+((?:19|20)\d{2})\b")
+_YEAR = re.compile(r"\b((?:19|20)\d{2})\b")
+_RANGE_SEPARATOR = re.compile(r"\s*(?:–|—|\s-\s|\bto\b|\buntil\b|\btill\b)\s*")
+
+@lru_cache(maxsize=4096)
+def parse_date(text: Optional[str]) -> Union[Tuple[int, Optional[int]], str, None]:
+    """
+    Parses a free-form resume date.
+
+    Returns:
+        (year, month) where month may be None for a bare year, PRESENT for
+        "Present"/"Current"/..., or None if no date was found.
+    """
+    if not text:
+        return None
+    text = text.strip().lower()
+    if _PRESENT_PATTERN.search(text):
+        return PRESENT
+    match = _YEAR_MONTH.search(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return int(match.group(1)), int(match.group(2))
+    match = _MONTH_YEAR.search(text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return int(match.group(2)), int(match.group(1))
+    for match in _MONTH_NAME_YEAR.finditer(text):
+        month = _MONTHS.get(match.group(1))
+        if month:
+            return int(match.group(2)), month
+    match = _YEAR.search(text)
+    if match:
+        return int(match.group(1)), None
+    return None
+
+@lru_cache(maxsize=4096)
+def split_date_range(text: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Splits "2019 – 2024", "Sep 2019 to Present" or "2019-2024" into its two ends."""
+    if not text:
+        return None, None
+    parts = _RANGE_SEPARATOR.split(text.strip(), maxsplit=1)
+    if len(parts) == 1 and re.fullmatch(r"\s*(?:19|20)\d{2}\s*-\s*(?:(?:19|20)\d{2}|present)\s*", text, re.IGNORECASE):
+        parts = text.split("-", 1)
+    if len(parts) == 2:
+        return parts[0].strip() or None, parts[1].strip() or None
+    return None, text.strip() or None
+
+def _iso(parsed, default_month: int) -> Optional[str]:
+    if parsed is None or parsed == PRESENT:
+        return None
+    year, month = parsed
+    return f"{year:04d}-{(month or default_month):02d}"
+
+def _month_index(parsed, default_month: int, today_index: int) -> Optional[int]:
+    """Months since year 0; PRESENT is today. Future dates are capped at today."""
+    if parsed is None:
+        return None
+    if parsed == PRESENT:
+        return today_index
+    year, month = parsed
+    return min(year * 12 + (month or default_month) - 1, today_index)
+
+def total_experience_years(
+    doc_index: np.ndarray,
+    start_months: np.ndarray,
+    end_months: np.ndarray,
+    n_docs: int,
+) -> np.ndarray:
+    """
+    Computes years of experience per document from (start, end) month intervals.
+
+    Overlapping roles are only counted once. All intervals of the batch are processed
+    together: sorted by (document, start), a running maximum of the end month per
+    document gives the part of each interval not already covered.
+
+    Args:
+        doc_index (np.ndarray): Document of each interval.
+        start_months (np.ndarray): Inclusive start month of each interval (months since year 0).
+        end_months (np.ndarray): Inclusive end month of each interval.
+        n_docs (int): Number of documents in the batch.
+
+    Returns:
+        np.ndarray: Years of experience per document, rounded to one decimal.
+    """
+    if len(doc_index) == 0:
+        return np.zeros(n_docs)
+    order = np.lexsort((start_months, doc_index))
+    docs, starts = doc_index[order], start_months[order].astype(np.int64)
+    ends = end_months[order].astype(np.int64) + 1  # exclusive end
+
+    # Offsetting each document by a large constant lets one global running maximum
+    # act as a per-document running maximum.
+    offset = docs.astype(np.int64) * 10**7
+    covered_until = np.maximum.accumulate(ends + offset) - offset
+    previous = np.empty_like(covered_until)
+    previous[0] = np.iinfo(np.int64).min
+    previous[1:] = covered_until[:-1]
+    first_of_doc = np.ones(len(docs), dtype=bool)
+    first_of_doc[1:] = docs[1:] != docs[:-1]
+    previous[first_of_doc] = np.iinfo(np.int64).min
+
+    new_months = np.clip(ends - np.maximum(starts, previous), 0, None)
+    months = np.bincount(docs, weights=new_months, minlength=n_docs)
+    return np.round(months / 12.0, 1)
+
+def standardize_reports(reports: List[Dict[str, Any]], today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Standardizes a batch of extracted resumes.
+
+    Adds ISO year-month 'start_date'/'end_date' (and 'is_current') to every experience
+    and education entry, 'total_experience_years' to each report, and replaces
+    'technical_skills' and 'languages' with their canonical names. The original date
+    strings are kept.
+
+    Args:
+        reports (List[dict]): Resume dicts as produced by the extraction agent.
+        today (Optional[date]): Reference date for "Present". Defaults to today.
+
+    Returns:
+        List[dict]: New, standardized report dicts in the same order.
+    """
+    today = today or date.today()
+    today_index = today.year * 12 + today.month - 1
+    skills, languages = get_skill_matcher(), get_language_matcher()
+
+    standardized = []
+    doc_index: List[int] = []
+    start_months: List[int] = []
+    end_months: List[int] = []
+    for doc, report in enumerate(reports):
+        report = dict(report)
+        report["technical_skills"] = skills.canonicalize(report.get("technical_skills") or [])
+        report["languages"] = languages.canonicalize(report.get("languages") or [])
+
+        experiences = []
+        for experience in report.get("experience") or []:
+            experience = dict(experience)
+            start, end = parse_date(experience.get("start")), parse_date(experience.get("end"))
+            if start == PRESENT:
+                start = None
+            experience["start_date"] = _iso(start, 1)
+            experience["end_date"] = _iso(end, 12)
+            experience["is_current"] = end == PRESENT
+            start_index = _month_index(start, 1, today_index)
+            end_index = _month_index(end, 12, today_index)
+            if start_index is not None and end_index is not None and end_index >= start_index:
+                doc_index.append(doc)
+                start_months.append(start_index)
+                end_months.append(end_index)
+            experiences.append(experience)
+        report["experience"] = experiences
+
+        educations = []
+        for education in report.get("education") or []:
+            education = dict(education)
+            start_text, end_text = split_date_range(education.get("years"))
+            start, end = parse_date(start_text), parse_date(end_text)
+            education["start_date"] = _iso(start, 9) if start != PRESENT else None
+            education["end_date"] = _iso(end, 6)
+            education["is_current"] = end == PRESENT
+            educations.append(education)
+        report["education"] = educations
+
+        standardized.append(report)
+
+    years = total_experience_years(
+        np.asarray(doc_index, dtype=np.int64),
+        np.asarray(start_months, dtype=np.int64),
+        np.asarray(end_months, dtype=np.int64),
+        len(reports),
+    )
+    for report, total in zip(standardized, years):
+        report["total_experience_years"] = float(total)
+    return standardized
+
+def standardize_report(report: Dict[str, Any], today: Optional[date] = None) -> Dict[str, Any]:
+    """Standardizes a single resume; see `standardize_reports`."""
+    return standardize_reports([report], today=today)[0]
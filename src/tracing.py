@@ -0,0 +1,381 @@
+import os
+import time
+import atexit
+import inspect
+import logging
+import functools
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src import database
+
+# numpy is imported inside the functions that aggregate, keeping the import of this
+# module (every agent module needs it) cheap.
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to run the workflows without the node wrappers.
+PIPELINE_TRACING = os.getenv("PIPELINE_TRACING", "1") != "0"
+# Recent runs kept in memory per node for the live percentiles.
+TRACE_WINDOW = int(os.getenv("TRACE_WINDOW", "2048"))
+# Runs are written to the node_metrics table in batches of this size...
+TRACE_FLUSH_SIZE = int(os.getenv("TRACE_FLUSH_SIZE", "100"))
+# ...or when the oldest unwritten run is this old.
+TRACE_FLUSH_SECONDS = float(os.getenv("TRACE_FLUSH_SECONDS", "5"))
+# Stored runs older than this are deleted.
+TRACE_RETENTION_DAYS = float(os.getenv("TRACE_RETENTION_DAYS", "7"))
+
+# Key of a state or Send payload holding the time.monotonic() at which it was queued.
+QUEUED_AT_KEY = "queued_at"
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Timings exported per node: name -> (run attribute, help text)
+_TIMINGS = {
+    "duration": ("wall_ms", "Wall time of the node"),
+    "llm": ("llm_ms", "Time spent waiting for LLM calls inside the node"),
+    "queue_wait": ("queue_ms", "Time the node's work spent queued (writer queue, concurrency limits, rate limits)"),
+}
+_THROUGHPUT_WINDOW_SECONDS = 60
+
+class NodeRun:
+    """Measurements of one execution of one node."""
+
+    __slots__ = ("workflow", "node", "started_at", "wall_ms", "llm_ms", "queue_ms", "retries",
+                 "input_chars", "output_chars", "error")
+
+    def __init__(self, workflow: str, node: str):
+        self.workflow = workflow
+        self.node = node
+        self.started_at = time.time()
+        self.wall_ms = 0.0
+        self.llm_ms = 0.0
+        self.queue_ms = 0.0
+        self.retries = 0
+        self.input_chars = 0
+        self.output_chars = 0
+        self.error: Optional[str] = None
+
+    def as_row(self) -> Tuple:
+        return (self.workflow, self.node, self.started_at, self.wall_ms, self.llm_ms, self.queue_ms,
+                self.retries, self.input_chars, self.output_chars, self.error)
+
+_current_run: contextvars.ContextVar[Optional[NodeRun]] = contextvars.ContextVar("cv_scout_node_run", default=None)
+
+def payload_size(value: Any, depth: int = 0) -> int:
+    """Approximate size of a node input or output: the characters of the strings it contains."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if depth >= 4:
+        return 0
+    if isinstance(value, dict):
+        return sum(payload_size(v, depth + 1) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(v, depth + 1) for v in value)
+    if hasattr(value, "__dict__"):  # pydantic models, Send
+        return payload_size(vars(value), depth + 1)
+    return 0
+
+# --- Hooks called from inside nodes; no-ops outside a traced node ---
+
+@contextmanager
+def llm_timer():
+    """Adds the time spent in the `with` block to the current node's LLM time."""
+    run = _current_run.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if run is not None:
+            run.llm_ms += (time.perf_counter() - start) * 1000
+
+def record_retry(count: int = 1):
+    """Counts a retry (e.g. of an LLM call or a restarted worker pool) for the current node."""
+    run = _current_run.get()
+    if run is not None:
+        run.retries += count
+
+def record_queue_wait(seconds: float):
+    """Adds time the current node's work spent waiting in a queue."""
+    run = _current_run.get()
+    if run is not None and seconds > 0:
+        run.queue_ms += seconds * 1000
+
+
+class MetricsRegistry:
+    """
+    Collects NodeRuns: recent timings per node for live percentiles, running totals,
+    and a buffer of runs that is written to SQLite in batches.
+
+    `record` only buffers; the batches are written by a background thread, so a node
+    (possibly running on an event loop) never waits for SQLite.
+    """
+
+    def __init__(self, window: int = TRACE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._timings: Dict[Tuple[str, str], Dict[str, Deque[float]]] = {}
+        self._finished_at: Dict[Tuple[str, str], Deque[float]] = {}
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._pending: List[Tuple] = []
+        self._pending_since = 0.0
+        self._flush_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def record(self, run: NodeRun):
+        key = (run.workflow, run.node)
+        with self._lock:
+            if key not in self._timings:
+                self._timings[key] = {name: deque(maxlen=self.window) for name in _TIMINGS}
+                self._finished_at[key] = deque(maxlen=self.window)
+                self._totals[key] = dict.fromkeys(
+                    ("calls", "errors", "retries", "wall_ms", "llm_ms", "queue_ms", "input_chars", "output_chars"), 0
+                )
+            for name, (attribute, _) in _TIMINGS.items():
+                self._timings[key][name].append(getattr(run, attribute))
+            self._finished_at[key].append(time.monotonic())
+            totals = self._totals[key]
+            totals["calls"] += 1
+            totals["errors"] += run.error is not None
+            for attribute in ("retries", "wall_ms", "llm_ms", "queue_ms", "input_chars", "output_chars"):
+                totals[attribute] += getattr(run, attribute)
+
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(run.as_row())
+            if len(self._pending) >= TRACE_FLUSH_SIZE:
+                self._flush_requested.set()
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, name="cv-scout-metrics-flusher", daemon=True)
+                self._flusher.start()
+
+    def _run_flusher(self):
+        """Flushes when TRACE_FLUSH_SIZE runs are buffered, or the oldest is TRACE_FLUSH_SECONDS old."""
+        while True:
+            with self._lock:
+                age = time.monotonic() - self._pending_since if self._pending else 0.0
+            self._flush_requested.wait(max(0.05, TRACE_FLUSH_SECONDS - age))
+            self._flush_requested.clear()
+            with self._lock:
+                due = self._pending and (
+                    len(self._pending) >= TRACE_FLUSH_SIZE
+                    or time.monotonic() - self._pending_since >= TRACE_FLUSH_SECONDS
+                )
+            if due:
+                self.flush()
+
+    def flush(self):
+        """Writes the buffered runs to the node_metrics table and prunes old rows."""
+        # Only one flush at a time; a concurrent caller leaves its runs for the next one.
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return
+            try:
+                database.save_node_metrics(rows, prune_before=time.time() - TRACE_RETENTION_DAYS * 86400)
+            except Exception as e:
+                logger.warning(f"---TRACING: Could not store {len(rows)} node run(s): {e}---")
+        finally:
+            self._flush_lock.release()
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._finished_at.clear()
+            self._totals.clear()
+            self._pending = []
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Per-node statistics over the recent runs, sorted by workflow and node.
+
+        Each dict has the call, error and retry counts, throughput over the last minute,
+        p50/p95/p99 of the wall time, p50/p95 of the LLM time and queue wait (in ms),
+        and the average input and output size (in characters).
+        """
+        import numpy as np
+        now = time.monotonic()
+        with self._lock:
+            snapshot = {
+                key: (
+                    {name: np.fromiter(samples, dtype=float) for name, samples in timings.items()},
+                    sum(1 for finished in self._finished_at[key] if now - finished <= _THROUGHPUT_WINDOW_SECONDS),
+                    dict(self._totals[key]),
+                )
+                for key, timings in self._timings.items()
+            }
+        rows = []
+        for (workflow, node), (timings, recent, totals) in sorted(snapshot.items()):
+            wall = np.percentile(timings["duration"], [50, 95, 99])
+            llm = np.percentile(timings["llm"], [50, 95])
+            queue_wait = np.percentile(timings["queue_wait"], [50, 95])
+            calls = totals["calls"]
+            rows.append({
+                "workflow": workflow,
+                "node": node,
+                "calls": int(calls),
+                "errors": int(totals["errors"]),
+                "retries": int(totals["retries"]),
+                "per_min": recent * 60 / _THROUGHPUT_WINDOW_SECONDS,
+                "p50_ms": round(wall[0], 1),
+                "p95_ms": round(wall[1], 1),
+                "p99_ms": round(wall[2], 1),
+                "llm_p50_ms": round(llm[0], 1),
+                "llm_p95_ms": round(llm[1], 1),
+                "queue_p50_ms": round(queue_wait[0], 1),
+                "queue_p95_ms": round(queue_wait[1], 1),
+                "avg_input_chars": round(totals["input_chars"] / calls),
+                "avg_output_chars": round(totals["output_chars"] / calls),
+            })
+        return rows
+
+    def prometheus_text(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format (as summaries)."""
+        import numpy as np
+        with self._lock:
+            snapshot = {
+                key: ({name: list(samples) for name, samples in timings.items()}, dict(self._totals[key]))
+                for key, timings in self._timings.items()
+            }
+        lines = []
+        for name, (attribute, help_text) in _TIMINGS.items():
+            metric = f"cvscout_node_{name}_seconds"
+            lines += [f"# HELP {metric} {help_text}.", f"# TYPE {metric} summary"]
+            for (workflow, node), (timings, totals) in sorted(snapshot.items()):
+                labels = f'workflow="{workflow}",node="{node}"'
+                values = np.quantile(np.asarray(timings[name]) / 1000, QUANTILES)
+                for quantile, value in zip(QUANTILES, values):
+                    lines.append(f'{metric}{{{labels},quantile="{quantile}"}} {value:.6f}')
+                lines.append(f"{metric}_sum{{{labels}}} {totals[attribute] / 1000:.6f}")
+                lines.append(f"{metric}_count{{{labels}}} {int(totals['calls'])}")
+        for name, help_text in (
+            ("errors", "Node runs that raised an exception"),
+            ("retries", "Retries inside node runs"),
+            ("input_chars", "Characters in node inputs"),
+            ("output_chars", "Characters in node outputs"),
+        ):
+            metric = f"cvscout_node_{name}_total"
+            lines += [f"# HELP {metric} {help_text}.", f"# TYPE {metric} counter"]
+            for (workflow, node), (_, totals) in sorted(snapshot.items()):
+                lines.append(f'{metric}{{workflow="{workflow}",node="{node}"}} {int(totals[name])}')
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+atexit.register(_registry.flush)
+
+def get_registry() -> MetricsRegistry:
+    """Returns the process-wide MetricsRegistry."""
+    return _registry
+
+def traced_node(workflow: str, node: str, fn: Callable) -> Callable:
+    """
+    Wraps a LangGraph node function so that every run is measured.
+
+    The wrapper keeps the function's name, annotations (LangGraph infers the node's input
+    schema from them) and sync/async nature. Records wall time, the LLM time and retries
+    reported through `llm_timer`/`record_retry`, queue wait, and the size of the input
+    state and of the returned update. Returns `fn` unchanged when PIPELINE_TRACING is off.
+
+    Args:
+        workflow (str): Label of the workflow, e.g. "resume" or "email".
+        node (str): The node name.
+        fn (Callable): The node function.
+
+    Returns:
+        Callable: The wrapped node.
+    """
+    if not PIPELINE_TRACING:
+        return fn
+
+    def _start(state) -> Tuple[NodeRun, float]:
+        run = NodeRun(workflow, node)
+        queued_at = state.get(QUEUED_AT_KEY) if isinstance(state, dict) else None
+        if queued_at:
+            run.queue_ms += max(0.0, time.monotonic() - queued_at) * 1000
+        return run, time.perf_counter()
+
+    def _end(run: NodeRun, start: float, state, output):
+        run.wall_ms = (time.perf_counter() - start) * 1000
+        run.input_chars = payload_size(state)
+        run.output_chars = payload_size(output)
+        _registry.record(run)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state):
+            run, start = _start(state)
+            token = _current_run.set(run)
+            output = None
+            try:
+                output = await fn(state)
+                return output
+            except Exception as e:
+                run.error = type(e).__name__
+                raise
+            finally:
+                _current_run.reset(token)
+                _end(run, start, state, output)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        run, start = _start(state)
+        token = _current_run.set(run)
+        output = None
+        try:
+            output = fn(state)
+            return output
+        except Exception as e:
+            run.error = type(e).__name__
+            raise
+        finally:
+            _current_run.reset(token)
+            _end(run, start, state, output)
+    return wrapper
+
+def pipeline_health() -> List[Dict[str, Any]]:
+    """Live per-node statistics; see `MetricsRegistry.summary`."""
+    return _registry.summary()
+
+def prometheus_metrics() -> str:
+    """The live metrics in the Prometheus text exposition format."""
+    return _registry.prometheus_text()
+
+def stored_pipeline_health(since_seconds: float = 86400) -> List[Dict[str, Any]]:
+    """
+    Per-node percentiles computed from the runs stored in SQLite, e.g. across restarts.
+
+    Args:
+        since_seconds (float): Only use runs started within this many seconds.
+
+    Returns:
+        List[dict]: One dict per node with calls, errors, retries and p50/p95/p99 wall time (ms).
+    """
+    import numpy as np
+    _registry.flush()
+    rows = database.get_node_metrics(since=time.time() - since_seconds)
+    grouped: Dict[Tuple[str, str], List[Tuple]] = {}
+    for row in rows:
+        grouped.setdefault((row[0], row[1]), []).append(row)
+    summary = []
+    for (workflow, node), runs in sorted(grouped.items()):
+        wall = np.percentile([run[2] for run in runs], [50, 95, 99])
+        summary.append({
+            "workflow": workflow,
+            "node": node,
+            "calls": len(runs),
+            "errors": sum(1 for run in runs if run[5] is not None),
+            "retries": sum(run[4] for run in runs),
+            "p50_ms": round(wall[0], 1),
+            "p95_ms": round(wall[1], 1),
+            "p99_ms": round(wall[2], 1),
+            "llm_p95_ms": round(float(np.percentile([run[3] for run in runs], 95)), 1),
+        })
+    return summary
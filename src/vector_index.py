@@ -0,0 +1,334 @@
+import os
+import zlib
+import struct
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within one process.
+    fcntl = None
+
+import numpy as np
+
+from src import database
+from src.prescreening import tokenize, weighted_fields
+
+logger = logging.getLogger(__name__)
+
+# Dimension of the hashed embedding vectors. Changing it invalidates an existing index file,
+# which is then rebuilt from the candidates table.
+VECTOR_INDEX_DIM = int(os.getenv("VECTOR_INDEX_DIM", "512"))
+# Index file location. Defaults to a file next to the SQLite database.
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH")
+
+_MAGIC = b"CVSV"
+_FORMAT_VERSION = 1
+# magic, format version, vector dimension, padding to 16 bytes
+_HEADER = struct.Struct("<4sII4x")
+
+def default_index_path() -> str:
+    """Returns VECTOR_INDEX_PATH, or `<database name>.vectors` next to the SQLite database."""
+    if VECTOR_INDEX_PATH:
+        return VECTOR_INDEX_PATH
+    return os.path.splitext(database.DB_PATH)[0] + ".vectors"
+
+def _bucket(term: str) -> int:
+    # crc32 is stable across processes, unlike the built-in (salted) str hash.
+    return zlib.crc32(term.encode("utf-8"))
+
+def _hashed_vector(weighted_terms: Iterable[Tuple[List[str], float]], dim: int) -> np.ndarray:
+    """Feature-hashes weighted terms (unigrams and bigrams) into an L2-normalized float32 vector."""
+    buckets: List[int] = []
+    weights: List[float] = []
+    for tokens, weight in weighted_terms:
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for term in terms:
+            h = _bucket(term)
+            buckets.append(h % dim)
+            # The top bit picks the sign so that colliding terms tend to cancel out.
+            weights.append(weight if h & 0x80000000 else -weight)
+
+    vector = np.zeros(dim, dtype=np.float64)
+    if buckets:
+        np.add.at(vector, np.asarray(buckets, dtype=np.intp), weights)
+        # Sublinear term frequency, so one skill repeated many times cannot dominate.
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+    return vector.astype(np.float32)
+
+def embed_report(report: Dict[str, Any], dim: Optional[int] = None) -> np.ndarray:
+    """Embeds a standardized resume (skills, job titles and descriptions) as a hashed vector."""
+    return _hashed_vector(weighted_fields(report), dim or VECTOR_INDEX_DIM)
+
+def embed_text(text: str, dim: Optional[int] = None) -> np.ndarray:
+    """Embeds free text, such as a job description, in the same space as `embed_report`."""
+    return _hashed_vector([(tokenize(text), 1.0)], dim or VECTOR_INDEX_DIM)
+
+
+class CandidateVectorIndex:
+    """
+    Append-only, memory-mapped index of candidate embedding vectors.
+
+    The file holds a small header followed by fixed-size (candidate_id, vector) records.
+    Adding a candidate appends a record, so updates are cheap and never rewrite the file.
+    When a candidate is indexed more than once, the latest record wins. Searches are an
+    exact brute-force dot product over the memory-mapped matrix, which takes
+    milliseconds even for tens of thousands of candidates.
+
+    Writers (possibly in several worker processes) serialize on an exclusive lock of the
+    `<path>.lock` file, see `write_lock`. Readers need no lock: records are only ever
+    appended, and a rebuild atomically replaces the file.
+    """
+
+    def __init__(self, path: str, dim: int = VECTOR_INDEX_DIM):
+        self.path = path
+        self.dim = dim
+        self.record_dtype = np.dtype([("candidate_id", "<i8"), ("vector", "<f4", (dim,))])
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._lock_file = None
+        self._mapped_key: Optional[Tuple[int, int, int]] = None
+        self._records: Optional[np.ndarray] = None
+        self._latest: Optional[np.ndarray] = None
+
+    def exists(self) -> bool:
+        """Whether the index file exists and was written with this vector dimension."""
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(_HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) < _HEADER.size:
+            return False
+        magic, version, dim = _HEADER.unpack(header)
+        return magic == _MAGIC and version == _FORMAT_VERSION and dim == self.dim
+
+    @contextmanager
+    def write_lock(self) -> Iterator[None]:
+        """
+        Holds the index exclusively for creating, appending to or rebuilding the file.
+
+        Reentrant within a thread. Across processes it is an `fcntl.flock` on the sidecar
+        lock file, which the OS releases if the holder dies.
+        """
+        with self._write_lock:
+            if self._write_depth == 0:
+                lock_file = open(self.path + ".lock", "a")
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                except BaseException:
+                    lock_file.close()
+                    raise
+                self._lock_file = lock_file
+            self._write_depth += 1
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    # Closing the file releases the flock.
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def add(self, candidate_id: int, vector: np.ndarray):
+        """Appends (or replaces) the vector of one candidate."""
+        self.add_many([(candidate_id, vector)])
+
+    def add_many(self, entries: Iterable[Tuple[int, np.ndarray]]):
+        """Appends the vectors of many candidates in a single write."""
+        records = self._to_records(entries)
+        if len(records) == 0:
+            return
+        with self.write_lock():
+            if not self.exists():
+                self._write_new_file(self.path, records)
+            else:
+                with open(self.path, "ab") as f:
+                    f.write(records.tobytes())
+
+    def rebuild(self, entries: Iterable[Tuple[int, np.ndarray]], chunk_size: int = 1000):
+        """
+        Replaces the whole index with `entries`, writing to a temporary file first.
+
+        The write lock is held throughout, so no other writer can append a record to the
+        old file that the new one would then lose.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with self.write_lock():
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, self.dim))
+                    chunk: List[Tuple[int, np.ndarray]] = []
+                    for entry in entries:
+                        chunk.append(entry)
+                        if len(chunk) >= chunk_size:
+                            f.write(self._to_records(chunk).tobytes())
+                            chunk = []
+                    f.write(self._to_records(chunk).tobytes())
+                with self._lock:
+                    os.replace(tmp_path, self.path)
+                    self._mapped_key = None
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def __len__(self) -> int:
+        records, latest = self._load()
+        return 0 if latest is None else int(latest.sum())
+
+    def search(self, query: np.ndarray, top_k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Finds the candidates whose vectors are most similar to `query`.
+
+        Args:
+            query (np.ndarray): A normalized query vector of this index's dimension.
+            top_k (int): Number of results to return.
+
+        Returns:
+            List[Tuple[int, float]]: (candidate_id, cosine similarity), best first.
+        """
+        records, latest = self._load()
+        if records is None or len(records) == 0 or top_k <= 0:
+            return []
+
+        scores = records["vector"] @ np.asarray(query, dtype=np.float32)
+        scores[~latest] = -np.inf
+        k = min(top_k, int(latest.sum()))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(records["candidate_id"][i]), float(scores[i])) for i in best]
+
+    def _to_records(self, entries: Iterable[Tuple[int, np.ndarray]]) -> np.ndarray:
+        entries = list(entries)
+        records = np.zeros(len(entries), dtype=self.record_dtype)
+        for i, (candidate_id, vector) in enumerate(entries):
+            records[i]["candidate_id"] = candidate_id
+            records[i]["vector"] = vector
+        return records
+
+    def _write_new_file(self, path: str, records: np.ndarray):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, self.dim))
+            f.write(records.tobytes())
+
+    def _load(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Maps the file (again, if it has changed) and marks the latest record of each candidate."""
+        with self._lock:
+            if not self.exists():
+                self._mapped_key, self._records, self._latest = None, None, None
+                return None, None
+            stat = os.stat(self.path)
+            key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if key != self._mapped_key:
+                n_records = (stat.st_size - _HEADER.size) // self.record_dtype.itemsize
+                if n_records == 0:
+                    records = np.zeros(0, dtype=self.record_dtype)
+                else:
+                    records = np.memmap(self.path, dtype=self.record_dtype, mode="r",
+                                        offset=_HEADER.size, shape=(n_records,))
+                ids = np.asarray(records["candidate_id"])
+                # Index of the last record per candidate: first occurrence in the reversed array.
+                _, first_in_reversed = np.unique(ids[::-1], return_index=True)
+                latest = np.zeros(n_records, dtype=bool)
+                latest[n_records - 1 - first_in_reversed] = True
+                self._records, self._latest, self._mapped_key = records, latest, key
+            return self._records, self._latest
+
+
+_indexes: Dict[str, CandidateVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_vector_index(path: Optional[str] = None) -> CandidateVectorIndex:
+    """Returns the shared index for `path` (default: `default_index_path()`)."""
+    path = path or default_index_path()
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None or index.dim != VECTOR_INDEX_DIM:
+            index = _indexes[path] = CandidateVectorIndex(path, VECTOR_INDEX_DIM)
+        return index
+
+def index_candidate(candidate_id: int, report: Dict[str, Any]):
+    """
+    Adds or refreshes one stored candidate in the vector index.
+
+    If there is no index yet, it is built from all stored candidates instead, so
+    candidates saved before the index existed are not left out.
+    """
+    index = get_vector_index()
+    # Held across the "does the index exist yet?" check, so two processes do not both
+    # build it and no candidate is appended to a file that is about to be replaced.
+    with index.write_lock():
+        if not index.exists():
+            _rebuild(index)
+            return
+        index.add(candidate_id, embed_report(report, index.dim))
+
+def rebuild_vector_index() -> int:
+    """
+    Rebuilds the vector index from every candidate stored in the database.
+
+    Returns:
+        int: The number of candidates indexed.
+    """
+    index = get_vector_index()
+    with index.write_lock():
+        return _rebuild(index)
+
+def _rebuild(index: CandidateVectorIndex) -> int:
+    count = 0
+
+    def entries():
+        nonlocal count
+        for candidate_id, report in database.iter_candidate_reports():
+            count += 1
+            yield candidate_id, embed_report(report, index.dim)
+
+    index.rebuild(entries())
+    logger.info(f"--- VECTOR INDEX: Rebuilt index with {count} candidate(s) at {index.path} ---")
+    return count
+
+def find_matching_candidates(job_description: str, top_k: int = 20) -> List[Dict[str, Any]]:
+    """
+    Retrieves the stored candidates that best match a job description, without any LLM call.
+
+    The index is built from the candidates table on first use (for example after upgrading
+    or deleting the index file) and is kept up to date by the database agent afterwards.
+
+    Args:
+        job_description (str): The job description to search with.
+        top_k (int): Maximum number of candidates to return.
+
+    Returns:
+        List[dict]: Candidate details ('candidate_id', 'full_name', 'email', 'phone_number')
+                    with a 'similarity' between -1 and 1, best match first.
+    """
+    if not job_description or not job_description.strip():
+        return []
+
+    index = get_vector_index()
+    # Searches only lock when the index has to be built; the check is repeated under the
+    # lock in case another thread or process built it in the meantime.
+    if not index.exists() and database.count_candidates() > 0:
+        with index.write_lock():
+            if not index.exists():
+                _rebuild(index)
+
+    matches = index.search(embed_text(job_description, index.dim), top_k)
+    details = database.get_candidates_by_ids([candidate_id for candidate_id, _ in matches])
+    return [
+        {**details[candidate_id], "similarity": round(similarity, 4)}
+        for candidate_id, similarity in matches
+        if candidate_id in details
+    ]
@@ -0,0 +1,243 @@
+"""
+Worker processes for the durable task queue in the `tasks` table.
+
+Each worker claims queued resumes with a lease, runs the full resume workflow on them
+and keeps the leases alive with a heartbeat while they run. The database agent marks a
+task done in the same transaction that saves its application; a failed run is retried
+with exponential backoff until it runs out of attempts. When a worker dies, its leases
+expire and any other worker picks the tasks up again. Extraction and relevancy results
+are cached by PDF hash, and every run is checkpointed (src.checkpoints), so a retried
+task resumes from the last node that completed instead of paying for it again.
+
+The LLM rate limiter (src.rate_limit) is per process: with N worker processes sharing
+one API key, set GEMINI_RPM and GEMINI_TPM to 1/N of the key's quota.
+
+Run from the repository root:
+    python -m src.cli resumes/ --job-description job.txt --enqueue    # fill the queue
+    python -m src.worker --processes 4 --max-in-flight 8              # drain it
+    python -m src.worker --status
+"""
+import os
+import sys
+import json
+import uuid
+import signal
+import socket
+import logging
+import argparse
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Optional
+
+from src import database
+from src.batch import MAX_CONCURRENT_RESUMES
+
+logger = logging.getLogger(__name__)
+
+# A task whose worker has not sent a heartbeat for this long is requeued.
+WORKER_LEASE_SECONDS = float(os.getenv("WORKER_LEASE_SECONDS", "120"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "1"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+# Delay before retry n of a failed task: TASK_RETRY_BASE_SECONDS * 2 ** (n - 1)
+TASK_RETRY_BASE_SECONDS = float(os.getenv("TASK_RETRY_BASE_SECONDS", "30"))
+
+def new_worker_id() -> str:
+    """A worker ID that is unique across hosts, containers and processes."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LeaseHeartbeat:
+    """
+    Context manager that extends the leases of all tasks held by `worker_id` every third
+    of the lease, from a background thread, until the block exits.
+    """
+
+    def __init__(self, worker_id: str, lease_seconds: float = WORKER_LEASE_SECONDS):
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.lease_seconds / 3):
+                try:
+                    database.heartbeat_tasks(self.worker_id, self.lease_seconds)
+                except Exception as e:
+                    logger.warning(f"---WORKER: Heartbeat failed: {e}---")
+        finally:
+            database.close_connection()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="cv-scout-heartbeat", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def _retry_delay(attempts: int) -> float:
+    return TASK_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1)
+
+def _finish_task(task: Dict[str, Any], worker_id: str, result_state: Optional[Dict[str, Any]], error: Optional[BaseException], stats: Dict[str, int]):
+    """Records the outcome of a run. Successful saves were already marked done by the database agent."""
+    if error is None and result_state.get("candidate_id") is not None:
+        stats["done"] += 1
+        return
+    if error is None and not result_state.get("final_report"):
+        # Nothing could be extracted; running the same file again will not change that.
+        status = database.fail_task(task["id"], worker_id, "No data could be extracted from the resume.")
+    else:
+        message = f"{type(error).__name__}: {error}" if error is not None else "The result could not be saved."
+        status = database.fail_task(task["id"], worker_id, message, retry_delay=_retry_delay(task["attempts"]))
+    stats["retried" if status == "queued" else "failed"] += 1
+    logger.warning(f"---WORKER: Task {task['id']} ({task['file_path']}) failed on attempt {task['attempts']}; {status or 'lease lost'}---")
+
+def run_worker(
+    worker_id: Optional[str] = None,
+    max_in_flight: int = MAX_CONCURRENT_RESUMES,
+    lease_seconds: float = WORKER_LEASE_SECONDS,
+    poll_seconds: float = WORKER_POLL_SECONDS,
+    exit_when_idle: bool = False,
+    stop_event: Optional[threading.Event] = None,
+) -> Dict[str, int]:
+    """
+    Processes queued tasks until `stop_event` is set (or the queue is drained).
+
+    Args:
+        worker_id (Optional[str]): Defaults to `new_worker_id()`.
+        max_in_flight (int): Tasks processed concurrently by this worker.
+        lease_seconds (float): Lease length; heartbeats renew it every third of that.
+        poll_seconds (float): How often to look for new tasks and expired leases.
+        exit_when_idle (bool): Return once no task is queued or running anywhere.
+        stop_event (Optional[threading.Event]): Stop claiming tasks once set; tasks
+            already claimed are finished first.
+
+    Returns:
+        dict: Counts of claimed, done, retried and failed tasks.
+    """
+    # Imported here so `--status` and argument errors do not wait for LangGraph.
+    from src.checkpoints import create_resumable_workflow
+    from src.db_writer import get_candidate_writer
+    from src.tracing import get_registry
+
+    worker_id = worker_id or new_worker_id()
+    stop_event = stop_event or threading.Event()
+    max_in_flight = max(1, int(max_in_flight))
+    graph_app = create_resumable_workflow()
+    job_descriptions: Dict[int, Optional[str]] = {}
+    stats = {"claimed": 0, "done": 0, "retried": 0, "failed": 0}
+    logger.info(f"---WORKER: {worker_id} started---")
+
+    def task_inputs(task):
+        if task["job_id"] not in job_descriptions:
+            job_descriptions[task["job_id"]] = database.get_job_description(task["job_id"])
+        return {
+            "file_path": task["file_path"],
+            "job_description": job_descriptions[task["job_id"]],
+            "job_id": task["job_id"],
+            "task_id": task["id"],
+        }
+
+    try:
+        with LeaseHeartbeat(worker_id, lease_seconds), \
+                ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="cv-scout-worker") as executor:
+            pending = {}
+            while pending or not stop_event.is_set():
+                if not stop_event.is_set() and len(pending) < max_in_flight:
+                    database.requeue_expired_tasks()
+                    for task in database.claim_tasks(worker_id, max_in_flight - len(pending), lease_seconds):
+                        stats["claimed"] += 1
+                        future = executor.submit(contextvars.copy_context().run, graph_app.invoke, task_inputs(task))
+                        pending[future] = task
+
+                if not pending:
+                    if exit_when_idle:
+                        counts = database.get_task_counts()
+                        if not counts["queued"] and not counts["running"]:
+                            break
+                    stop_event.wait(poll_seconds)
+                    continue
+
+                done, _ = wait(pending, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = pending.pop(future)
+                    error = future.exception()
+                    _finish_task(task, worker_id, None if error else future.result(), error, stats)
+    finally:
+        get_candidate_writer().close()
+        get_registry().flush()
+        database.close_connection()
+    logger.info(f"---WORKER: {worker_id} stopped: {stats}---")
+    return stats
+
+def _worker_process(db_path: Optional[str], options: Dict[str, Any], results):
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"), stream=sys.stderr)
+    stop_event = threading.Event()
+    # Finish the tasks in flight on SIGTERM/SIGINT; unfinished leases expire otherwise.
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop_event.set())
+    database.init_db(db_path)
+    results.put(run_worker(stop_event=stop_event, **options))
+
+def run_workers(processes: int, db_path: Optional[str] = None, **options) -> Dict[str, int]:
+    """Runs `run_worker` in `processes` separate processes and sums their counts."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(target=_worker_process, args=(db_path, options, results), name=f"cv-scout-worker-{i}")
+        for i in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    totals = {"claimed": 0, "done": 0, "retried": 0, "failed": 0}
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        # The children received the same SIGINT and finish their tasks in flight.
+        for process in workers:
+            process.join()
+    while not results.empty():
+        for key, value in results.get().items():
+            totals[key] += value
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m src.worker", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--processes", type=int, default=1, help="worker processes")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_CONCURRENT_RESUMES, help="tasks per process")
+    parser.add_argument("--lease-seconds", type=float, default=WORKER_LEASE_SECONDS)
+    parser.add_argument("--exit-when-idle", action="store_true", help="stop once no task is queued or running")
+    parser.add_argument("--db", help="SQLite database file (default: DB_PATH)")
+    parser.add_argument("--checkpoint-db", help="SQLite file for run checkpoints (default: CHECKPOINT_DB_PATH)")
+    parser.add_argument("--status", action="store_true", help="print the task counts and exit")
+    parser.add_argument("--retry-failed", action="store_true", help="requeue failed tasks and exit")
+    parser.add_argument("--job-id", type=int, help="limit --status and --retry-failed to one job")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"), stream=sys.stderr)
+    database.init_db(args.db)
+    if args.status:
+        print(json.dumps(database.get_task_counts(args.job_id)))
+        sys.exit(0)
+    if args.retry_failed:
+        print(json.dumps({"requeued": database.retry_failed_tasks(args.job_id)}))
+        sys.exit(0)
+    database.close_connection()
+    if args.checkpoint_db:
+        # Read by the spawned worker processes when src.checkpoints is imported.
+        os.environ["CHECKPOINT_DB_PATH"] = args.checkpoint_db
+
+    totals = run_workers(
+        max(1, args.processes), args.db,
+        max_in_flight=args.max_in_flight, lease_seconds=args.lease_seconds, exit_when_idle=args.exit_when_idle,
+    )
+    print(json.dumps(totals))
@@ -0,0 +1,169 @@
+"""
+Micro-benchmark for the SQLite layer in src/database.py.
+
+Compares the previous connection-per-call pattern (default rollback journal, a fresh
+`sqlite3.connect` for every operation) against the pooled, WAL-mode connection layer
+and the group-commit writer used by `database_agent`.
+Reports single-threaded and multi-threaded write throughput, the number of
+"database is locked" failures, and ranking query latency.
+
+Run from the repository root:
+    python -m tests.db_benchmark --candidates 2000 --threads 8
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from src import database
+from src.db_writer import get_candidate_writer
+
+
+def _legacy_connect(path):
+    return sqlite3.connect(path)
+
+def _legacy_add_candidate_and_application(path, job_id, report, score, summary):
+    conn = _legacy_connect(path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM candidates WHERE email = ?", (report["mail"],))
+    data = cursor.fetchone()
+    if data:
+        candidate_id = data[0]
+        cursor.execute(
+            "UPDATE candidates SET full_name = ?, phone_number = ?, full_report_json = ? WHERE id = ?",
+            (report["full_name"], report["phone_number"], json.dumps(report), candidate_id)
+        )
+    else:
+        cursor.execute(
+            "INSERT INTO candidates(full_name, email, phone_number, full_report_json) VALUES(?,?,?,?)",
+            (report["full_name"], report["mail"], report["phone_number"], json.dumps(report))
+        )
+        candidate_id = cursor.lastrowid
+    conn.commit()
+    conn.close()
+
+    conn = _legacy_connect(path)
+    conn.execute(
+        "INSERT OR REPLACE INTO applications(job_id, candidate_id, match_score, match_summary) VALUES(?,?,?,?)",
+        (job_id, candidate_id, score, summary)
+    )
+    conn.commit()
+    conn.close()
+
+def _legacy_ranked_query(path, job_id):
+    import pandas as pd
+    conn = _legacy_connect(path)
+    try:
+        return pd.read_sql_query(
+            """
+            SELECT c.full_name, c.email, a.match_score, a.match_summary, a.status, c.id as candidate_id
+            FROM applications a JOIN candidates c ON a.candidate_id = c.id
+            WHERE a.job_id = ? ORDER BY a.match_score DESC;
+            """,
+            conn, params=(job_id,)
+        )
+    finally:
+        conn.close()
+
+def _pooled_add_candidate_and_application(path, job_id, report, score, summary):
+    candidate_id = database.add_or_update_candidate(report)
+    database.add_application(job_id, candidate_id, score, summary)
+
+def _group_commit_add_candidate_and_application(path, job_id, report, score, summary):
+    get_candidate_writer().submit(job_id, report, score, summary).result()
+
+def _pooled_ranked_query(path, job_id):
+    return database.get_ranked_candidates_for_job(job_id)
+
+
+def _make_report(i):
+    return {
+        "full_name": f"Candidate {i}",
+        "mail": f"candidate{i}@example.com",
+        "phone_number": f"+1-555-{i:07d}",
+        "technical_skills": ["Python", "SQL", "Docker"],
+        "experience": [{"company": "Acme", "title": "Engineer", "description": "Built things. " * 20}],
+    }
+
+def _fresh_db(directory, name, journal_mode):
+    path = os.path.join(directory, name)
+    database.DB_PATH = path
+    database.create_tables()
+    database.close_connection()
+    # create_tables() switches the file to WAL; put the legacy database back into the
+    # default rollback journal so it matches the previous behaviour.
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    job_id = conn.execute("INSERT INTO jobs(description) VALUES('benchmark job')").lastrowid
+    conn.commit()
+    conn.close()
+    return path, job_id
+
+def _run_writes(write_fn, path, job_id, n_candidates, n_threads):
+    errors = []
+    per_thread = n_candidates // n_threads
+
+    def worker(offset):
+        for i in range(offset, offset + per_thread):
+            try:
+                write_fn(path, job_id, _make_report(i), i % 101, "benchmark summary")
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+        database.close_connection()
+
+    threads = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    written = per_thread * n_threads - len(errors)
+    return {
+        "writes_per_sec": round(written / elapsed, 1),
+        "elapsed_s": round(elapsed, 3),
+        "locked_errors": len(errors),
+    }
+
+def _run_queries(query_fn, path, job_id, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        query_fn(path, job_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "query_p50_ms": round(statistics.median(latencies), 3),
+        "query_max_ms": round(max(latencies), 3),
+    }
+
+def run_benchmark(n_candidates, n_threads, query_repeats):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        variants = [
+            ("legacy", "DELETE", _legacy_add_candidate_and_application, _legacy_ranked_query),
+            ("pooled_wal", "WAL", _pooled_add_candidate_and_application, _pooled_ranked_query),
+            ("group_commit", "WAL", _group_commit_add_candidate_and_application, _pooled_ranked_query),
+        ]
+        for name, journal_mode, write_fn, query_fn in variants:
+            path, job_id = _fresh_db(directory, f"{name}.db", journal_mode)
+            single = _run_writes(write_fn, path, job_id, n_candidates, 1)
+            path, job_id = _fresh_db(directory, f"{name}_mt.db", journal_mode)
+            multi = _run_writes(write_fn, path, job_id, n_candidates, n_threads)
+            queries = _run_queries(query_fn, path, job_id, query_repeats)
+            results[name] = {"single_thread": single, f"{n_threads}_threads": multi, **queries}
+            database.close_connection()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--query-repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.candidates, args.threads, args.query_repeats), indent=2))
@@ -0,0 +1,113 @@
+"""
+Benchmark of the duplicate resume index (src.dedup) at import scale.
+
+Fills a fresh SQLite database with the signatures of `--resumes` synthetic resumes
+(tests.synthetic_resumes), in batches as the candidate writer would save them, then looks
+up `--queries` lightly edited copies of indexed resumes and as many resumes that were
+never indexed. Reports the signature and lookup throughput, how many edited copies were
+recognized and how many unseen resumes were wrongly matched. No LLM calls are made.
+
+Run from the repository root:
+    python -m tests.dedup_benchmark --resumes 20000 --queries 500
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from src import database, dedup
+from tests.synthetic_resumes import resume_text
+
+def edit_text(text: str, rng: random.Random, n_edits: int) -> str:
+    """Replaces `n_edits` random words, as when an applicant touches up a resume."""
+    words = text.split(" ")
+    for _ in range(n_edits):
+        words[rng.randrange(len(words))] = rng.choice(["improved", "led", "Rust", "2023", "scalable"])
+    return " ".join(words)
+
+def run_benchmark(args):
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        database.init_db(os.path.join(directory, "dedup.db"))
+        conn = database.get_connection()
+
+        start = time.perf_counter()
+        signing_s = 0.0
+        for batch_start in range(0, args.resumes, args.batch_size):
+            entries = []
+            for index in range(batch_start, min(batch_start + args.batch_size, args.resumes)):
+                text = resume_text(index, args.seed)[0]
+                t0 = time.perf_counter()
+                if args.lookup_on_insert:
+                    result = dedup.find_duplicate(text)
+                else:
+                    email, phone = dedup.detect_contacts(text)
+                    result = {"minhash_signature": dedup.minhash_signature(text).tobytes(), "contact_email": email, "contact_phone": phone}
+                signing_s += time.perf_counter() - t0
+                entries.append((index + 1, dedup.index_entry(result)))
+            with conn:
+                database._save_resume_signatures(conn.cursor(), entries)
+        build_s = time.perf_counter() - start
+
+        queries = rng.sample(range(args.resumes), min(args.queries, args.resumes))
+        found, similarities, latencies = 0, [], []
+        for index in queries:
+            text = edit_text(resume_text(index, args.seed)[0], rng, args.edits)
+            t0 = time.perf_counter()
+            result = dedup.find_duplicate(text)
+            latencies.append(time.perf_counter() - t0)
+            signature = np.frombuffer(result["minhash_signature"], dtype=np.uint32)
+            original = dedup.minhash_signature(resume_text(index, args.seed)[0])
+            similarities.append(float(dedup.similarity(signature, original[None, :])[0]))
+            found += result.get("duplicate_of") == index + 1
+
+        false_matches = 0
+        for index in range(args.resumes, args.resumes + len(queries)):
+            t0 = time.perf_counter()
+            result = dedup.find_duplicate(resume_text(index, args.seed)[0])
+            latencies.append(time.perf_counter() - t0)
+            false_matches += result.get("duplicate_of") is not None
+
+        buckets = conn.execute("SELECT COUNT(*) FROM resume_lsh_buckets").fetchone()[0]
+        database.close_connection()
+
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        "config": vars(args),
+        "index_build_s": round(build_s, 2),
+        "resumes_indexed_per_sec": round(args.resumes / build_s, 1),
+        # Signature only, or signature plus lookup with --lookup-on-insert.
+        "per_resume_ms": round(signing_s / args.resumes * 1000, 3),
+        "lsh_bucket_rows": buckets,
+        "lookup_p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "lookup_p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "edited_copies": len(queries),
+        "edited_similarity_p50": round(float(np.median(similarities)), 3),
+        "edited_above_threshold": sum(s >= dedup.DEDUP_SIMILARITY_THRESHOLD for s in similarities),
+        "edited_found": found,
+        "unseen_resumes": len(queries),
+        "unseen_false_matches": false_matches,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=20000, help="resumes in the index")
+    parser.add_argument("--queries", type=int, default=500, help="edited copies (and unseen resumes) to look up")
+    parser.add_argument("--edits", type=int, default=1, help="words replaced in each edited copy")
+    parser.add_argument("--batch-size", type=int, default=64, help="signatures saved per transaction")
+    parser.add_argument("--lookup-on-insert", action="store_true", help="also look every resume up before indexing it, as the pipeline does")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
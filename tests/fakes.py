@@ -0,0 +1,203 @@
+"""
+Deterministic stand-ins for the Gemini chat models, for offline benchmarks.
+
+`install_fake_llms()` registers a `FakeChatModel` for the extraction and email roles
+through `src.llm.set_llm`. The agents only use `with_structured_output`, so that is all
+the fake implements. Its answers
+depend only on the prompt, and its latency is `latency_ms` plus a jitter of up to
+`jitter_ms` in either direction, also derived from the prompt and the seed, so two
+runs with the same settings see identical responses and delays.
+
+Resumes from `tests.synthetic_resumes` are read back field by field; for any other
+text a plausible resume is derived from the text's hash.
+
+To exercise rate limiting, the fake can also behave like a quota-limited endpoint:
+with `throttle_rpm` and/or `max_concurrent` set, calls over the limit fail with a
+`FakeRateLimitError` (HTTP 429, RESOURCE_EXHAUSTED) instead of being answered.
+"""
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Optional
+
+from langchain_core.exceptions import ModelRateLimitError
+from langchain_core.runnables import RunnableLambda
+
+from src.llm import set_llm
+from src.schemas import GeneratedEmail, RelevancyAnalysis, Resume
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_ROLE = re.compile(r"^(?P<title>.+?) @ (?P<org>.+?) \| (?P<start>.+?) - (?P<end>.+)$")
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+def _prompt_text(prompt: Any) -> str:
+    """The human message of a formatted chat prompt (or the input itself as text)."""
+    if hasattr(prompt, "to_messages"):
+        messages = prompt.to_messages()
+        return str(messages[-1].content) if messages else ""
+    return str(prompt)
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+def fake_resume(text: str) -> Resume:
+    """Builds a Resume from the synthetic resume layout, falling back to hash-derived values."""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    email = _EMAIL.search(text)
+    digest = _digest(text)
+    section, education, experience, skills, languages = None, [], [], [], []
+    for i, line in enumerate(lines):
+        if line in ("Experience", "Education"):
+            section = line
+            continue
+        if line.startswith("Skills:"):
+            skills = [skill.strip() for skill in line[len("Skills:"):].split(",") if skill.strip()]
+            continue
+        if line.startswith("Languages:"):
+            languages = [language.strip() for language in line[len("Languages:"):].split(",") if language.strip()]
+            continue
+        role = _ROLE.match(line)
+        if role and section == "Experience":
+            description = lines[i + 1] if i + 1 < len(lines) and not _ROLE.match(lines[i + 1]) else ""
+            experience.append({
+                "company": role["org"], "title": role["title"], "start": role["start"],
+                "end": role["end"], "location": None, "description": description,
+            })
+        elif role and section == "Education":
+            education.append({
+                "institution": role["org"], "degree": role["title"], "gpa": None,
+                "years": f"{role['start']} - {role['end']}", "location": None,
+            })
+    return Resume(
+        full_name=lines[0] if lines else f"Candidate {digest % 100000}",
+        mail=email.group(0) if email else f"candidate{digest % 10**9}@example.com",
+        phone_number=None,
+        github=None,
+        linkedin=None,
+        education=education,
+        experience=experience,
+        technical_skills=skills or ["Python"],
+        languages=languages or ["English"],
+    )
+
+def fake_relevancy(text: str) -> RelevancyAnalysis:
+    """Scores by word overlap between the resume and the job description in the prompt."""
+    resume, _, job_description = text.partition("---JOB DESCRIPTION---")
+    overlap = set(_WORD.findall(resume.lower())) & set(_WORD.findall(job_description.lower()))
+    score = min(100, 20 + 5 * len(overlap) + _digest(text) % 10)
+    return RelevancyAnalysis(score=score, summary=f"Matches {len(overlap)} term(s) of the job description.")
+
+def fake_email(text: str) -> GeneratedEmail:
+    from src.email_agents import CANDIDATE_NAME_PLACEHOLDER
+    return GeneratedEmail(
+        subject="Your application",
+        body=f"Dear {CANDIDATE_NAME_PLACEHOLDER},\n\nThank you for your application.\n\nBest regards",
+    )
+
+_RESPONDERS = {Resume: fake_resume, RelevancyAnalysis: fake_relevancy, GeneratedEmail: fake_email}
+
+
+class FakeRateLimitError(ModelRateLimitError):
+    """What the Gemini client raises on HTTP 429."""
+
+    code = 429
+
+
+class FakeChatModel:
+    """
+    Offline replacement for `ChatGoogleGenerativeAI`.
+
+    Args:
+        latency_ms (float): Mean latency of a call.
+        jitter_ms (float): Maximum deviation from the mean latency.
+        seed (int): Seed for the per-prompt jitter.
+        throttle_rpm (Optional[float]): Reject calls beyond this many per sliding minute.
+        max_concurrent (Optional[int]): Reject calls while this many are already running.
+        retry_after_s (Optional[float]): Retry delay suggested in the 429 message.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: int = 0,
+        throttle_rpm: Optional[float] = None,
+        max_concurrent: Optional[int] = None,
+        retry_after_s: Optional[float] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.seed = seed
+        self.throttle_rpm = throttle_rpm
+        self.max_concurrent = max_concurrent
+        self.retry_after_s = retry_after_s
+        self.calls: Counter = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._accepted = deque()
+        self._lock = threading.Lock()
+
+    def delay_seconds(self, text: str) -> float:
+        jitter = random.Random(_digest(text) ^ self.seed).uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def _admit(self):
+        """Starts a call, or raises FakeRateLimitError if it is over the quota."""
+        with self._lock:
+            now = time.monotonic()
+            while self._accepted and now - self._accepted[0] >= 60:
+                self._accepted.popleft()
+            over_rpm = self.throttle_rpm is not None and len(self._accepted) >= self.throttle_rpm
+            over_concurrency = self.max_concurrent is not None and self.in_flight >= self.max_concurrent
+            if over_rpm or over_concurrency:
+                self.calls["throttled"] += 1
+                hint = f" Please retry in {self.retry_after_s}s." if self.retry_after_s else ""
+                raise FakeRateLimitError(f"429 RESOURCE_EXHAUSTED. Quota exceeded.{hint}")
+            self._accepted.append(now)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _finish(self, schema):
+        with self._lock:
+            self.in_flight -= 1
+            self.calls[schema.__name__] += 1
+
+    def with_structured_output(self, schema, **kwargs) -> RunnableLambda:
+        respond = _RESPONDERS[schema]
+
+        def invoke(prompt):
+            text = _prompt_text(prompt)
+            self._admit()
+            try:
+                time.sleep(self.delay_seconds(text))
+            finally:
+                self._finish(schema)
+            return respond(text)
+
+        async def ainvoke(prompt):
+            text = _prompt_text(prompt)
+            self._admit()
+            try:
+                await asyncio.sleep(self.delay_seconds(text))
+            finally:
+                self._finish(schema)
+            return respond(text)
+
+        return RunnableLambda(invoke, afunc=ainvoke, name=f"Fake{schema.__name__}")
+
+
+def install_fake_llms(latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0, model: Optional[FakeChatModel] = None) -> FakeChatModel:
+    """
+    Replaces the Gemini models used by the agents with one shared FakeChatModel.
+
+    Returns:
+        FakeChatModel: The installed model; its `calls` counts calls per output schema.
+    """
+    model = model or FakeChatModel(latency_ms, jitter_ms, seed)
+    set_llm(model, role="extraction")
+    set_llm(model, role="email")
+    return model
@@ -0,0 +1,89 @@
+"""
+Startup (import time) benchmark.
+
+Imports each entry module in a fresh interpreter with `python -X importtime`, takes the
+best cumulative time of several runs, and compares it with a target. It also checks
+that lightweight entry points do not pull in heavy dependencies they never use, e.g.
+that a process which only queries the database does not load LangGraph, PyMuPDF or the
+Gemini SDK, and that importing anything does not create the database file.
+
+Exits with status 1 if a target is missed or a forbidden module is imported.
+
+Run from the repository root:
+    python -m tests.import_benchmark --runs 5
+    python -m tests.import_benchmark --scale 2   # slower machine: double every target
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> (target in ms, modules it must not import)
+TARGETS = {
+    "src.database": (100, ["langgraph", "langchain_core", "langchain_google_genai", "pymupdf", "numpy"]),
+    "src.pdf_parsing": (150, ["langgraph", "langchain_core", "langchain_google_genai", "pymupdf"]),
+    "src.llm": (100, ["langchain_google_genai", "google.genai"]),
+    "src.agents": (1500, ["langchain_google_genai", "google.genai", "pymupdf", "gradio"]),
+    "src.graph": (2000, ["langchain_google_genai", "google.genai", "pymupdf", "gradio"]),
+    "src.email_graph": (2000, ["langchain_google_genai", "google.genai", "pymupdf", "gradio"]),
+    "app": (8000, ["langchain_google_genai", "google.genai", "pymupdf"]),
+}
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+def measure(module, forbidden):
+    """Imports `module` in a new interpreter; returns (cumulative ms, forbidden modules loaded, files created)."""
+    code = (
+        "import sys, json\n"
+        f"import {module}\n"
+        f"print(json.dumps([name for name in {forbidden!r} if name in sys.modules]))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    env.pop("GEMINI_API_KEY", None)  # importing must not need the key
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=cwd, env=env, capture_output=True, text=True, check=True,
+        )
+        created = sorted(os.listdir(cwd))
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and match.group(2) == module:
+            cumulative_us = int(match.group(1))
+    return cumulative_us / 1000, json.loads(result.stdout.strip().splitlines()[-1]), created
+
+def run_benchmark(runs, scale, modules):
+    report, failed = {}, False
+    for module in modules:
+        target_ms, forbidden = TARGETS[module]
+        measurements = [measure(module, forbidden) for _ in range(runs)]
+        best_ms = min(ms for ms, _, _ in measurements)
+        _, loaded, created = measurements[-1]
+        ok = best_ms <= target_ms * scale and not loaded and not created
+        failed |= not ok
+        report[module] = {
+            "best_ms": round(best_ms, 1),
+            "target_ms": target_ms * scale,
+            "forbidden_imported": loaded,
+            "files_created": created,
+            "ok": ok,
+        }
+    return report, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="imports per module; the fastest counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every target")
+    parser.add_argument("modules", nargs="*", default=list(TARGETS), help="modules to measure (default: all)")
+    args = parser.parse_args()
+
+    report, failed = run_benchmark(args.runs, args.scale, args.modules)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
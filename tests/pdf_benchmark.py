@@ -0,0 +1,96 @@
+"""
+Benchmark for PDF ingestion.
+
+Compares the previous LangChain `PyMuPDFLoader` path (one `Document` per page, parsed on
+the calling thread) with the direct page-by-page parser in src/pdf_parsing.py, both
+inline and through the process pool. Reports pages/sec on data/cv.pdf and on
+synthetic multi-page PDFs.
+
+Run from the repository root:
+    python -m tests.pdf_benchmark --files 32 --pages 10 --processes 4
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pymupdf
+
+from src import pdf_parsing
+
+SAMPLE_PDF = os.path.join("data", "cv.pdf")
+
+_PARAGRAPH = (
+    "Senior software engineer with eight years of experience building data platforms in "
+    "Python, Go and SQL. Led the migration of batch pipelines to streaming, reduced cloud "
+    "costs by a third and mentored a team of five engineers. "
+)
+
+def make_synthetic_pdf(path, n_pages):
+    document = pymupdf.open()
+    for page_number in range(n_pages):
+        page = document.new_page()
+        page.insert_textbox(pymupdf.Rect(50, 50, 550, 800), f"Page {page_number + 1}\n" + _PARAGRAPH * 12, fontsize=9)
+    document.save(path)
+    document.close()
+
+def _legacy_parse(path):
+    from langchain_community.document_loaders import PyMuPDFLoader
+    documents = PyMuPDFLoader(path).load()
+    return "\n".join(doc.page_content for doc in documents), len(documents)
+
+def _direct_parse(path):
+    with open(path, "rb") as f:
+        return pdf_parsing.extract_pdf_pages(f.read(), max_pages=10**6, max_chars=10**9)
+
+def _measure(name, paths, parse, processes=None):
+    start = time.perf_counter()
+    if processes:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(parse, paths))
+    else:
+        results = [parse(path) for path in paths]
+    elapsed = time.perf_counter() - start
+    pages = sum(n_pages for _, n_pages in results)
+    return name, {
+        "files": len(paths),
+        "pages": pages,
+        "elapsed_s": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 1),
+    }
+
+def run_benchmark(n_files, n_pages, processes, repeats):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic = []
+        for i in range(n_files):
+            path = os.path.join(directory, f"synthetic_{i}.pdf")
+            make_synthetic_pdf(path, n_pages)
+            synthetic.append(path)
+
+        corpora = {"synthetic": synthetic}
+        if os.path.exists(SAMPLE_PDF):
+            corpora["data/cv.pdf"] = [SAMPLE_PDF] * repeats
+
+        for corpus, paths in corpora.items():
+            variants = [
+                _measure("langchain_loader", paths, _legacy_parse),
+                _measure("direct", paths, _direct_parse),
+            ]
+            if processes > 1:
+                variants.append(_measure(f"direct_{processes}_processes", paths, _direct_parse, processes))
+            results[corpus] = dict(variants)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeats", type=int, default=50, help="times data/cv.pdf is parsed")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.files, args.pages, args.processes, args.repeats), indent=2))
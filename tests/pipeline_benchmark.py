@@ -0,0 +1,201 @@
+"""
+Offline end-to-end benchmark of the resume and email pipelines.
+
+Generates a synthetic resume corpus (tests.synthetic_resumes), replaces the Gemini
+models with deterministic fakes (tests.fakes), and runs everything against a fresh
+SQLite database in a temporary directory:
+
+1. the resume workflow (`create_workflow`, or `create_async_workflow` with --async) over
+   the corpus with bounded concurrency, including the database writer and vector index;
+2. the dashboard query (`get_ranked_candidates_page`) over all applications;
+3. the email workflow for every applicant, split into positive/negative by score.
+
+Reports throughput per phase, per-node latency percentiles (from src.tracing) and peak
+memory as JSON, so results can be stored and compared across commits. No network
+access or API key is needed.
+
+Run from the repository root:
+    python -m tests.pipeline_benchmark --resumes 200 --latency-ms 300 --jitter-ms 100 --max-in-flight 16
+    python -m tests.pipeline_benchmark --async --output benchmark.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src import database, tracing
+from src.batch import aiter_batch_results, iter_batch_results
+from src.db_writer import get_candidate_writer
+from src.email_graph import create_async_email_workflow, create_email_workflow
+from src.graph import create_async_workflow, create_workflow
+from tests.fakes import install_fake_llms
+from tests.synthetic_resumes import generate_corpus
+
+JOB_DESCRIPTION = (
+    "We are hiring a Backend Engineer with strong Python, PostgreSQL, Docker and Kubernetes "
+    "experience. Knowledge of Kafka, AWS and FastAPI is a plus."
+)
+POSITIVE_SCORE = 50
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(max(peak, children) / 2**20, 1)
+
+def _run_resumes(paths, job_id, max_in_flight, use_async):
+    inputs = [{"file_path": path, "job_description": JOB_DESCRIPTION, "job_id": job_id} for path in paths]
+    errors = 0
+    if use_async:
+        async def run():
+            failed = 0
+            async for _, _, error in aiter_batch_results(create_async_workflow(), inputs, max_in_flight=max_in_flight):
+                failed += error is not None
+            return failed
+        errors = asyncio.run(run())
+    else:
+        for _, _, error in iter_batch_results(create_workflow(), inputs, max_in_flight=max_in_flight):
+            errors += error is not None
+    return errors
+
+def _run_emails(job_id, max_concurrency, personalize, use_async):
+    contacts = database.get_applicant_contacts_for_job(job_id)
+    scores = {}
+    rows, cursor = database.get_ranked_candidates_page(job_id, page_size=500)
+    while rows:
+        scores.update({row["candidate_id"]: row["match_score"] for row in rows})
+        if cursor is None:
+            break
+        rows, cursor = database.get_ranked_candidates_page(job_id, page_size=500, cursor=cursor)
+
+    positive = [c for c in contacts if (scores.get(c["candidate_id"]) or 0) >= POSITIVE_SCORE]
+    negative = [c for c in contacts if (scores.get(c["candidate_id"]) or 0) < POSITIVE_SCORE]
+    state = {
+        "job_title": "Backend Engineer",
+        "positive_candidates": positive,
+        "negative_candidates": negative,
+        "personalize": personalize,
+        "tone": "professional",
+        "templates": {},
+        "processed_emails": [],
+    }
+    if use_async:
+        result = asyncio.run(create_async_email_workflow(max_concurrency).ainvoke(state))
+    else:
+        result = create_email_workflow(max_concurrency).invoke(state)
+    return len(contacts), len(positive), len(result["processed_emails"])
+
+def _page_through_dashboard(job_id, page_size=50):
+    pages, rows_read = 0, 0
+    rows, cursor = database.get_ranked_candidates_page(job_id, page_size=page_size)
+    while rows:
+        pages += 1
+        rows_read += len(rows)
+        if cursor is None:
+            break
+        rows, cursor = database.get_ranked_candidates_page(job_id, page_size=page_size, cursor=cursor)
+    return pages, rows_read
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def run_benchmark(args):
+    model = install_fake_llms(args.latency_ms, args.jitter_ms, args.seed)
+    tracing.get_registry().reset()
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths, corpus_s = _timed(generate_corpus, os.path.join(directory, "resumes"), args.resumes, args.seed, args.pages)
+
+        database.init_db(os.path.join(directory, "benchmark.db"))
+        job_id = database.add_job(JOB_DESCRIPTION)
+
+        resume_errors, resumes_s = _timed(_run_resumes, paths, job_id, args.max_in_flight, args.use_async)
+        get_candidate_writer().close()
+        (pages, rows_read), dashboard_s = _timed(_page_through_dashboard, job_id)
+        (applicants, positive, emails), emails_s = _timed(
+            _run_emails, job_id, args.max_in_flight, args.personalize, args.use_async
+        )
+        tracing.get_registry().flush()
+        database.close_connection()
+
+    nodes = {
+        f"{row['workflow']}.{row['node']}": {
+            key: row[key]
+            for key in ("calls", "errors", "retries", "p50_ms", "p95_ms", "p99_ms", "llm_p95_ms", "queue_p95_ms")
+        }
+        for row in tracing.pipeline_health()
+    }
+    memory = {"peak_rss_mb": _peak_rss_mb()}
+    if args.tracemalloc:
+        memory["python_heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+
+    return {
+        "config": {
+            "resumes": args.resumes,
+            "pages": args.pages,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "max_in_flight": args.max_in_flight,
+            "async": args.use_async,
+            "personalize": args.personalize,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "phases": {
+            "corpus": {"elapsed_s": round(corpus_s, 3)},
+            "resumes": {
+                "elapsed_s": round(resumes_s, 3),
+                "resumes_per_sec": round(args.resumes / resumes_s, 2),
+                "errors": resume_errors,
+            },
+            "dashboard": {"elapsed_s": round(dashboard_s, 4), "pages": pages, "rows": rows_read},
+            "emails": {
+                "elapsed_s": round(emails_s, 3),
+                "applicants": applicants,
+                "positive": positive,
+                "sent": emails,
+                "emails_per_sec": round(emails / emails_s, 2) if emails_s else None,
+            },
+        },
+        "llm_calls": dict(model.calls),
+        "nodes": nodes,
+        "memory": memory,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=1, help="pages per synthetic resume")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="mean fake LLM latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="maximum deviation from the mean latency")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="concurrent resumes / email branches")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use the async workflows")
+    parser.add_argument("--personalize", action="store_true", help="one LLM call per email instead of templates")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report the Python heap peak (slower)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,108 @@
+"""
+Throughput and crash-recovery benchmark of the durable task queue (src.worker).
+
+Enqueues a synthetic resume corpus (tests.synthetic_resumes) for one job in a fresh
+SQLite database, then drains the queue with `--processes` worker processes that use the
+fake LLMs (tests.fakes). With `--kill-after`, one worker is killed with SIGKILL after that
+many seconds, as if its container died; its leases expire after `--lease-seconds` and the
+surviving workers finish its tasks.
+
+Reports the elapsed time, the final task counts, and whether every resume ended up with
+exactly one application. No network access or API key is needed.
+
+Run from the repository root:
+    python -m tests.queue_benchmark --resumes 200 --processes 2
+    python -m tests.queue_benchmark --resumes 200 --processes 2 --kill-after 3 --lease-seconds 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+
+from src import database
+from tests.synthetic_resumes import generate_corpus
+
+JOB_DESCRIPTION = "Backend Engineer: Python, PostgreSQL, Docker, Kubernetes, AWS."
+
+def _worker(db_path, latency_ms, lease_seconds, max_in_flight, results):
+    from src.worker import run_worker
+    from tests.fakes import install_fake_llms
+
+    model = install_fake_llms(latency_ms, latency_ms / 4)
+    database.init_db(db_path)
+    stats = run_worker(
+        max_in_flight=max_in_flight, lease_seconds=lease_seconds, poll_seconds=0.2, exit_when_idle=True,
+    )
+    results.put({**stats, "llm_calls": sum(model.calls.values())})
+
+def run_benchmark(args):
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generate_corpus(os.path.join(directory, "resumes"), args.resumes, args.seed, 1)
+        db_path = os.path.join(directory, "queue.db")
+        # Inherited by the spawned workers, so the benchmark leaves no checkpoints behind.
+        os.environ["CHECKPOINT_DB_PATH"] = os.path.join(directory, "checkpoints.db")
+        database.init_db(db_path)
+        job_id = database.add_job(JOB_DESCRIPTION)
+        database.enqueue_tasks(job_id, paths, max_attempts=args.max_attempts)
+        database.close_connection()
+
+        results = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(db_path, args.latency_ms, args.lease_seconds, args.max_in_flight, results))
+            for _ in range(args.processes)
+        ]
+        start = time.perf_counter()
+        for process in workers:
+            process.start()
+        killed = None
+        if args.kill_after is not None:
+            time.sleep(args.kill_after)
+            killed = database.get_task_counts(job_id)
+            os.kill(workers[0].pid, signal.SIGKILL)
+        finished = [results.get() for _ in range(args.processes - (killed is not None))]
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        counts = database.get_task_counts(job_id)
+        applications = database.count_applications_for_job(job_id)
+        done_without_candidate = database.get_connection().execute(
+            "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND status = 'done' AND candidate_id IS NULL", (job_id,)
+        ).fetchone()[0]
+        database.close_connection()
+
+    return {
+        "config": vars(args),
+        "elapsed_s": round(elapsed, 2),
+        "resumes_per_sec": round(args.resumes / elapsed, 2),
+        "tasks_at_kill": killed,
+        "tasks": counts,
+        "applications": applications,
+        "all_saved_once": applications == args.resumes and counts["done"] == args.resumes and not done_without_candidate,
+        "workers": finished,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--max-in-flight", type=int, default=8, help="tasks per worker process")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="mean fake LLM latency")
+    parser.add_argument("--lease-seconds", type=float, default=5.0)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--kill-after", type=float, help="SIGKILL the first worker after this many seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
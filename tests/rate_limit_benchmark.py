@@ -0,0 +1,182 @@
+"""
+Benchmark of the shared LLM rate limiter (src.rate_limit) against a throttling endpoint.
+
+A `FakeChatModel` stands in for Gemini and rejects calls with HTTP 429 once more than
+`--quota-concurrency` calls are running or more than `--quota-rpm` were accepted in the
+last minute. Three scenarios run against it:
+
+1. unlimited: `--calls` calls from `--workers` threads, straight to the model, no retries;
+2. limited: the same calls through `invoke_llm`, i.e. the token buckets, AIMD concurrency
+   and jittered retries shared by the whole process;
+3. priority: a bulk batch through `invoke_llm` in the BULK lane while `--interactive`
+   single calls are made one after another in the INTERACTIVE lane, to measure how long
+   an interactive user waits behind the batch.
+
+No network access or API key is needed.
+
+Run from the repository root:
+    python -m tests.rate_limit_benchmark --calls 300 --workers 32 --quota-concurrency 8
+    python -m tests.rate_limit_benchmark --latency-ms 100 --output rate_limit.json
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src import rate_limit
+from src.rate_limit import BULK, INTERACTIVE, AdaptiveRateLimiter, invoke_llm, llm_priority, set_rate_limiter
+from src.schemas import RelevancyAnalysis
+from tests.fakes import FakeChatModel
+
+def _inputs(index):
+    return {"resume": f"Candidate {index}: python docker", "job_description": "---JOB DESCRIPTION--- python"}
+
+def _percentile_ms(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(1000 * values[min(len(values) - 1, int(q * len(values)))], 1)
+
+def _new_model(args):
+    return FakeChatModel(
+        args.latency_ms, args.jitter_ms, args.seed,
+        throttle_rpm=args.quota_rpm, max_concurrent=args.quota_concurrency,
+    )
+
+def _new_limiter(args):
+    return AdaptiveRateLimiter(
+        rpm=args.quota_rpm, tpm=args.tpm,
+        initial_concurrency=args.initial_concurrency, max_concurrency=args.workers,
+    )
+
+def _run_calls(call, n, workers):
+    """Runs call(i) for i < n on `workers` threads; returns (latencies of successes, failures, elapsed)."""
+    latencies, failures, lock = [], [0], threading.Lock()
+
+    def timed(index):
+        start = time.perf_counter()
+        try:
+            call(index)
+        except Exception:
+            with lock:
+                failures[0] += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(timed, range(n)))
+    return latencies, failures[0], time.perf_counter() - start
+
+def _summary(model, latencies, failures, elapsed, limiter=None):
+    result = {
+        "succeeded": len(latencies),
+        "failed": failures,
+        "throttled_429": model.calls["throttled"],
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_sec": round(len(latencies) / elapsed, 2),
+        "p50_ms": _percentile_ms(latencies, 0.5),
+        "p95_ms": _percentile_ms(latencies, 0.95),
+        "peak_in_flight": model.peak_in_flight,
+    }
+    if limiter is not None:
+        stats = limiter.stats()
+        result["final_limit"] = stats["limit"]
+        result["retries"] = stats["throttled"] + stats["failed"]
+    return result
+
+def run_unlimited(args):
+    model = _new_model(args)
+    chain = model.with_structured_output(RelevancyAnalysis)
+    latencies, failures, elapsed = _run_calls(lambda i: chain.invoke(_inputs(i)), args.calls, args.workers)
+    return _summary(model, latencies, failures, elapsed)
+
+def run_limited(args):
+    model = _new_model(args)
+    chain = model.with_structured_output(RelevancyAnalysis)
+    limiter = _new_limiter(args)
+    set_rate_limiter(limiter)
+    latencies, failures, elapsed = _run_calls(lambda i: invoke_llm(chain, _inputs(i)), args.calls, args.workers)
+    return _summary(model, latencies, failures, elapsed, limiter)
+
+def run_priority(args):
+    model = _new_model(args)
+    chain = model.with_structured_output(RelevancyAnalysis)
+    limiter = _new_limiter(args)
+    set_rate_limiter(limiter)
+
+    def bulk_call(index):
+        with llm_priority(BULK):
+            invoke_llm(chain, _inputs(index))
+
+    bulk_result = {}
+    batch = threading.Thread(target=lambda: bulk_result.update(zip(
+        ("latencies", "failures", "elapsed"), _run_calls(bulk_call, args.calls, args.workers)
+    )))
+    batch.start()
+    time.sleep(args.interactive_delay_s)  # let the batch fill the queue first
+
+    interactive = []
+    with llm_priority(INTERACTIVE):
+        for i in range(args.interactive):
+            start = time.perf_counter()
+            invoke_llm(chain, _inputs(args.calls + i))
+            interactive.append(time.perf_counter() - start)
+    batch.join()
+
+    return {
+        "bulk": _summary(model, bulk_result["latencies"], bulk_result["failures"], bulk_result["elapsed"], limiter),
+        "interactive": {
+            "calls": len(interactive),
+            "p50_ms": _percentile_ms(interactive, 0.5),
+            "max_ms": _percentile_ms(interactive, 1.0),
+            "mean_ms": round(1000 * statistics.mean(interactive), 1) if interactive else None,
+        },
+    }
+
+def run_benchmark(args):
+    rate_limit.LLM_RETRY_BASE_SECONDS = args.retry_base_s
+    rate_limit.LLM_MAX_RETRIES = args.max_retries
+    try:
+        return {
+            "config": {
+                key: getattr(args, key) for key in (
+                    "calls", "workers", "latency_ms", "jitter_ms", "quota_rpm", "quota_concurrency",
+                    "tpm", "initial_concurrency", "retry_base_s", "max_retries", "interactive", "seed",
+                )
+            },
+            "unlimited": run_unlimited(args),
+            "limited": run_limited(args),
+            "priority": run_priority(args),
+        }
+    finally:
+        set_rate_limiter(None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="calls per batch")
+    parser.add_argument("--workers", type=int, default=32, help="threads issuing calls (and maximum concurrency)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="mean fake LLM latency")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="maximum deviation from the mean latency")
+    parser.add_argument("--quota-rpm", type=float, default=6000, help="requests per minute the fake accepts")
+    parser.add_argument("--quota-concurrency", type=int, default=8, help="concurrent calls the fake accepts")
+    parser.add_argument("--tpm", type=float, default=10_000_000, help="token budget per minute of the limiter")
+    parser.add_argument("--initial-concurrency", type=int, default=4)
+    parser.add_argument("--retry-base-s", type=float, default=0.05, help="base of the exponential backoff")
+    parser.add_argument("--max-retries", type=int, default=8)
+    parser.add_argument("--interactive", type=int, default=5, help="interactive calls made during the bulk batch")
+    parser.add_argument("--interactive-delay-s", type=float, default=0.2, help="start of the interactive calls")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,76 @@
+"""
+Token comparison for the resume text sent to the relevancy prompt.
+
+Compares the previous format (the str() of the `final_report` dict, which is what the
+prompt template rendered), JSON, and the compact serializer in src/serialization.py
+on sample resumes of different sizes. Tokens are estimated at four characters each.
+
+Run from the repository root:
+    python -m tests.serialization_tokens
+"""
+import argparse
+import json
+
+from src.compaction import estimate_tokens
+from src.schemas import Resume
+from src.serialization import serialize_resume
+
+_DESCRIPTION = (
+    "Designed and operated event-driven services in Python and Go on Kubernetes, "
+    "cut p99 latency by 40%, introduced contract testing and mentored junior engineers. "
+)
+
+def sample_resume(n_jobs, n_degrees, description_repeats):
+    resume = Resume(
+        full_name="Jane Doe",
+        mail="jane.doe@example.com",
+        phone_number="+49 30 1234567",
+        github=None,
+        linkedin="linkedin.com/in/janedoe",
+        education=[
+            {"institution": f"Technical University {i}", "degree": "M.Sc. Computer Science",
+             "gpa": None, "years": "2012-2014", "location": None}
+            for i in range(n_degrees)
+        ],
+        experience=[
+            {"company": f"Company {i}", "title": "Senior Backend Engineer", "start": "2019-03",
+             "end": "Present", "location": "Berlin, Germany", "description": _DESCRIPTION * description_repeats}
+            for i in range(n_jobs)
+        ],
+        technical_skills=["Python", "Go", "PostgreSQL", "Kafka", "Kubernetes", "Terraform", "AWS", "gRPC"],
+        languages=["English", "German"],
+    )
+    return resume.model_dump()
+
+SAMPLES = {
+    "junior": (1, 1, 1),
+    "mid": (3, 2, 2),
+    "senior": (6, 2, 4),
+}
+
+def compare(description_max_chars=None):
+    results = {}
+    for name, shape in SAMPLES.items():
+        report = sample_resume(*shape)
+        formats = {
+            "python_dict": str(report),
+            "json": json.dumps(report),
+            "compact": serialize_resume(report, description_max_chars=description_max_chars),
+        }
+        baseline = estimate_tokens(formats["python_dict"])
+        results[name] = {
+            fmt: {"tokens": estimate_tokens(text), "vs_python_dict": f"{estimate_tokens(text) / baseline:.0%}"}
+            for fmt, text in formats.items()
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--description-max-chars", type=int, default=None,
+                        help="override RESUME_DESCRIPTION_MAX_CHARS (0 = no truncation)")
+    args = parser.parse_args()
+
+    print(json.dumps(compare(args.description_max_chars), indent=2))
+    print("\nCompact format (mid sample):\n")
+    print(serialize_resume(sample_resume(*SAMPLES["mid"]), description_max_chars=args.description_max_chars))
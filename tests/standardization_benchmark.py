@@ -0,0 +1,79 @@
+"""
+Throughput of the standardization engine in src/standardization.py.
+
+Standardizes synthetic resumes (varied date formats, skill spellings and languages)
+one at a time, as the standardization agent does, and as whole batches, and reports
+resumes per second. The automaton is built before timing starts.
+
+Run from the repository root:
+    python -m tests.standardization_benchmark --resumes 20000 --batch-size 1000
+"""
+import argparse
+import json
+import random
+import time
+
+from src.standardization import get_language_matcher, get_skill_matcher, standardize_report, standardize_reports
+
+_DATES = ["2019-03", "03/2019", "Mar 2019", "March 2019", "2019", "Sept. 2020", "2021.11", "Jan 2018"]
+_ENDS = ["Present", "Current", "2022-06", "12/2023", "Dec 2022", "2023", "now"]
+_YEARS = ["2012-2016", "2014 – 2018", "Sep 2016 - Jun 2020", "2019 to Present", "2020"]
+_SKILLS = [
+    "python", "Python 3", "JS", "reactjs", "Node.js", "postgres", "k8s", "Docker", "AWS",
+    "Python/Django", "C++", "golang", "Machine Learning, NLP", "sklearn", "PyTorch", "CI/CD",
+    "Terraform", "Excel", "Project management", "REST APIs", "TypeScript", "Kafka",
+]
+_LANGUAGES = ["English (C1)", "german", "Türkçe", "Spanish - native", "French B2", "Mandarin"]
+
+def sample_reports(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "full_name": f"Candidate {i}",
+            "mail": f"candidate{i}@example.com",
+            "education": [
+                {"institution": "University", "degree": "B.Sc.", "gpa": None, "years": rng.choice(_YEARS), "location": None}
+                for _ in range(rng.randint(1, 2))
+            ],
+            "experience": [
+                {"company": f"Company {j}", "title": "Engineer", "start": rng.choice(_DATES),
+                 "end": rng.choice(_ENDS), "location": None, "description": "..."}
+                for j in range(rng.randint(1, 6))
+            ],
+            "technical_skills": rng.sample(_SKILLS, rng.randint(4, 12)),
+            "languages": rng.sample(_LANGUAGES, rng.randint(1, 3)),
+        }
+        for i in range(n)
+    ]
+
+def benchmark(n_resumes, batch_size):
+    reports = sample_reports(n_resumes)
+    get_skill_matcher(), get_language_matcher()
+
+    start = time.perf_counter()
+    for report in reports:
+        standardize_report(report)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for batch_start in range(0, n_resumes, batch_size):
+        standardize_reports(reports[batch_start:batch_start + batch_size])
+    batched = time.perf_counter() - start
+
+    return {
+        "resumes": n_resumes,
+        "batch_size": batch_size,
+        "one_at_a_time_resumes_per_sec": round(n_resumes / single),
+        "batched_resumes_per_sec": round(n_resumes / batched),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.resumes, args.batch_size), indent=2))
+    print("\nExample:\n")
+    print(json.dumps(standardize_report(sample_reports(1, seed=1)[0]), indent=2, ensure_ascii=False))
@@ -0,0 +1,52 @@
+"""
+Checks of the skill and language canonicalization in src/standardization.py.
+
+Each case maps the entries an extraction might return to the canonical names expected
+after standardization. Mixed entries ("Go, Rust", "Kubernetes / Helm") must keep every
+item, including unknown ones and aliases that only count as a whole item. Exits with a
+non-zero status and lists the failing cases if any output differs.
+
+Run from the repository root:
+    python -m tests.standardization_check
+"""
+import sys
+
+from src.standardization import get_language_matcher, get_skill_matcher
+
+SKILL_CASES = [
+    (["Go, Rust"], ["Go", "Rust"]),
+    (["Java, Spring"], ["Java", "Spring"]),
+    (["Kubernetes / Helm"], ["Kubernetes", "Helm"]),
+    (["Python/Django"], ["Python", "Django"]),
+    (["C/C++"], ["C", "C++"]),
+    (["CI/CD", "PL/SQL", "TCP/IP"], ["CI/CD", "PL/SQL", "TCP/IP"]),
+    (["GitHub Actions; Docker"], ["GitHub Actions", "Docker"]),
+    (["node.js • Express"], ["Node.js", "Express"]),
+    (["Python 3 scripting", "python"], ["Python"]),
+    (["JS", "ECMAScript", "React.js"], ["JavaScript", "React"]),
+    (["go-to person", "Go"], ["go-to person", "Go"]),
+    (["  Apache   Kafka  ", None, ""], ["Kafka"]),
+]
+
+LANGUAGE_CASES = [
+    (["English, Klingon"], ["English", "Klingon"]),
+    (["Deutsch (fluent)", "EN"], ["German", "English"]),
+    (["Türkçe / English"], ["Turkish", "English"]),
+]
+
+def run_checks():
+    failures = []
+    for matcher, cases in ((get_skill_matcher(), SKILL_CASES), (get_language_matcher(), LANGUAGE_CASES)):
+        for entries, expected in cases:
+            result = matcher.canonicalize(entries)
+            if result != expected:
+                failures.append(f"{entries!r}: expected {expected!r}, got {result!r}")
+    return len(SKILL_CASES) + len(LANGUAGE_CASES), failures
+
+
+if __name__ == "__main__":
+    total, failures = run_checks()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{total - len(failures)}/{total} canonicalization checks passed")
+    sys.exit(1 if failures else 0)
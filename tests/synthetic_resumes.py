@@ -0,0 +1,98 @@
+"""
+Synthetic resume corpus for the offline benchmarks.
+
+Every resume is generated from its index and a seed, so a corpus is identical across
+runs and machines. The text follows a fixed layout that `tests.fakes` can read back
+into a `Resume` without an LLM:
+
+    Jane Doe
+    jane.doe.17@example.com | +49 30 5550017
+    Experience
+    Backend Engineer @ Acme 3 | Mar 2019 - Present
+    <description>
+    Education
+    B.Sc. Computer Science @ University 2 | 2012 - 2016
+    Skills: Python, Docker, ...
+    Languages: English, German
+
+Generate a corpus on disk:
+    python -m tests.synthetic_resumes --resumes 100 --output /tmp/resumes
+"""
+import argparse
+import os
+import random
+from typing import List
+
+import pymupdf
+
+FIRST_NAMES = ["Jane", "John", "Ayse", "Mehmet", "Maria", "Luca", "Chen", "Priya", "Omar", "Sofia", "Noah", "Elif"]
+LAST_NAMES = ["Doe", "Smith", "Yilmaz", "Kaya", "Garcia", "Rossi", "Wang", "Patel", "Haddad", "Novak", "Berg", "Demir"]
+TITLES = ["Backend Engineer", "Data Scientist", "Frontend Developer", "DevOps Engineer", "ML Engineer", "Software Engineer"]
+DEGREES = ["B.Sc. Computer Science", "M.Sc. Data Science", "B.Eng. Software Engineering", "M.Sc. Electrical Engineering"]
+SKILLS = [
+    "Python", "Go", "Java", "TypeScript", "React", "Django", "FastAPI", "PostgreSQL", "Redis", "Kafka",
+    "Docker", "Kubernetes", "Terraform", "AWS", "GCP", "PyTorch", "scikit-learn", "Pandas", "SQL", "Git",
+]
+LANGUAGES = ["English", "German", "Turkish", "Spanish", "French"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+_DESCRIPTION = (
+    "Designed, built and operated services used by millions of users. Improved latency and "
+    "reliability, automated deployments, reviewed code and mentored junior engineers. "
+)
+
+def resume_text(index: int, seed: int = 0, n_pages: int = 1) -> List[str]:
+    """Returns the text of synthetic resume `index`, one string per page."""
+    rng = random.Random(seed * 1_000_003 + index)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}.{index}@example.com | +49 30 555{index:04d}",
+        "Experience",
+    ]
+    year = 2024
+    for job in range(rng.randint(1, 4)):
+        end = "Present" if job == 0 else f"{rng.choice(MONTHS)} {year}"
+        year -= rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)} @ Company {rng.randint(1, 500)} | {rng.choice(MONTHS)} {year} - {end}")
+        lines.append(_DESCRIPTION * rng.randint(1, 3))
+    lines.append("Education")
+    lines.append(f"{rng.choice(DEGREES)} @ University {rng.randint(1, 50)} | {year - 4} - {year}")
+    lines.append("Skills: " + ", ".join(rng.sample(SKILLS, rng.randint(4, 10))))
+    lines.append("Languages: " + ", ".join(rng.sample(LANGUAGES, rng.randint(1, 3))))
+
+    pages = ["\n".join(lines)]
+    for page in range(1, n_pages):
+        pages.append(f"Projects (page {page + 1})\n" + _DESCRIPTION * 8)
+    return pages
+
+def make_resume_pdf(path: str, index: int, seed: int = 0, n_pages: int = 1):
+    """Writes synthetic resume `index` to `path`."""
+    document = pymupdf.open()
+    for text in resume_text(index, seed, n_pages):
+        page = document.new_page()
+        page.insert_textbox(pymupdf.Rect(50, 50, 550, 800), text, fontsize=9)
+    document.save(path)
+    document.close()
+
+def generate_corpus(directory: str, n_resumes: int, seed: int = 0, n_pages: int = 1) -> List[str]:
+    """Writes `n_resumes` synthetic resume PDFs into `directory` and returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index in range(n_resumes):
+        path = os.path.join(directory, f"resume_{index:05d}.pdf")
+        make_resume_pdf(path, index, seed, n_pages)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="directory to write the PDFs to")
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.output, args.resumes, args.seed, args.pages)
+    print(f"Wrote {len(paths)} resume(s) to {args.output}")